@@ -204,6 +204,7 @@ def download(config_path: str, validity: int | None):
                 import logging
 
                 logging.getLogger("eumdac_fetch").removeHandler(log_handler)
+                log_handler.close()
 
     except KeyboardInterrupt:
         console.print("\n[yellow]Download interrupted.[/yellow]")
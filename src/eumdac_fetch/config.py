@@ -38,28 +38,65 @@ else:
 ENV_VAR_PATTERN = re.compile(r"\$\{(\w+)}")
 
 
-def _interpolate_env_vars(value: str) -> str:
-    """Replace ${ENV_VAR} patterns with environment variable values."""
+def _interpolate_env_vars(value: str, env_cache: dict[str, str] | None = None) -> str:
+    """Replace ${ENV_VAR} patterns with environment variable values.
+
+    ``env_cache`` memoizes lookups across calls so a variable referenced many
+    times in one config is only read from ``os.environ`` once.
+    """
+    if env_cache is None:
+        env_cache = {}
+    environ = os.environ
 
     def replacer(match: re.Match) -> str:
         var_name = match.group(1)
-        env_val = os.environ.get(var_name, "")
-        if not env_val:
-            raise ValueError(f"Environment variable '{var_name}' is not set")
+        env_val = env_cache.get(var_name)
+        if env_val is None:
+            env_val = environ.get(var_name, "")
+            if not env_val:
+                raise ValueError(f"Environment variable '{var_name}' is not set")
+            env_cache[var_name] = env_val
         return env_val
 
     return ENV_VAR_PATTERN.sub(replacer, value)
 
 
-def _interpolate_recursive(obj: JSONPrimitive | JSONType) -> JSONPrimitive | JSONType:
-    """Recursively interpolate env vars in strings within dicts/lists."""
+def _interpolate_tree(obj: JSONPrimitive | JSONType) -> JSONPrimitive | JSONType:
+    """Return a copy of ``obj`` with env vars interpolated in every string.
+
+    The caller's dicts and lists are left untouched. Walks the tree with an
+    explicit stack rather than recursion; only strings containing ``${`` are
+    passed to the regex. A container reachable from several places (YAML
+    anchors and aliases) is copied and interpolated once, and the copy is
+    shared the same way. Env lookups are shared across the whole walk.
+    """
+    env_cache: dict[str, str] = {}
     if isinstance(obj, str):
-        return _interpolate_env_vars(obj)
-    if isinstance(obj, dict):
-        return {k: _interpolate_recursive(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [_interpolate_recursive(item) for item in obj]
-    return obj
+        return _interpolate_env_vars(obj, env_cache) if "${" in obj else obj
+    if not isinstance(obj, (dict, list)):
+        return obj
+
+    copies: dict[int, dict | list] = {}
+    stack: list[dict | list] = []
+
+    def copy_of(node: dict | list) -> dict | list:
+        copy = copies.get(id(node))
+        if copy is None:
+            copy = copies[id(node)] = dict(node) if isinstance(node, dict) else list(node)
+            stack.append(copy)
+        return copy
+
+    root = copy_of(obj)
+    while stack:
+        node = stack.pop()
+        items = node.items() if isinstance(node, dict) else enumerate(node)
+        for k, v in items:
+            if isinstance(v, str):
+                if "${" in v:
+                    node[k] = _interpolate_env_vars(v, env_cache)
+            elif isinstance(v, (dict, list)):
+                node[k] = copy_of(v)
+    return root
 
 
 def _parse_datetime(value: str) -> datetime:
@@ -186,6 +223,18 @@ def _parse_job(data: dict, base_dir: Path) -> JobConfig:
     return job
 
 
+def _load_yaml(config_path: Path) -> dict:
+    """Read a YAML config file and check that its top level is a mapping."""
+    if not config_path.exists():
+        raise FileNotFoundError(f"Config file not found: {config_path}")
+
+    raw = yaml.safe_load(config_path.read_bytes())
+
+    if not isinstance(raw, dict):
+        raise ValueError("Config file must be a YAML mapping")
+    return raw
+
+
 def load_config(path: str | Path) -> AppConfig:
     """Load and validate a YAML configuration file.
 
@@ -200,18 +249,30 @@ def load_config(path: str | Path) -> AppConfig:
         ValueError: If config is invalid.
     """
     config_path = Path(path)
-    if not config_path.exists():
-        raise FileNotFoundError(f"Config file not found: {config_path}")
+    raw = _load_yaml(config_path)
+    return load_config_from_dict(raw, base_dir=config_path.parent.resolve())
 
-    base_dir = config_path.parent.resolve()
 
-    with open(config_path) as f:
-        raw = yaml.safe_load(f)
+def load_config_from_dict(raw: dict, base_dir: str | Path | None = None) -> AppConfig:
+    """Build an AppConfig from an already-parsed config mapping.
 
-    if not isinstance(raw, dict):
-        raise ValueError("Config file must be a YAML mapping")
+    This is the schema-mapping half of :func:`load_config`; ``raw`` has the
+    same shape as the YAML document and is left unmodified.
 
-    data = _interpolate_recursive(raw)
+    Args:
+        raw: Config mapping, e.g. the result of parsing a YAML config file.
+        base_dir: Directory that relative paths are resolved against.
+            Defaults to the current working directory.
+
+    Returns:
+        Parsed AppConfig.
+
+    Raises:
+        ValueError: If config is invalid.
+    """
+    base_dir = Path.cwd() if base_dir is None else Path(base_dir)
+
+    data = _interpolate_tree(raw)
 
     if "credentials" in data:
         raise ValueError(
@@ -228,6 +289,11 @@ def load_config(path: str | Path) -> AppConfig:
             file=log_data.get("file"),
         )
 
+    if "parallel_jobs" in data:
+        app_config.parallel_jobs = int(data["parallel_jobs"])
+        if app_config.parallel_jobs < 1:
+            raise ValueError(f"'parallel_jobs' must be at least 1, got {app_config.parallel_jobs}")
+
     if "jobs" in data:
         if not isinstance(data["jobs"], list):
             raise ValueError("'jobs' must be a list")
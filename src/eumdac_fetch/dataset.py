@@ -25,17 +25,30 @@ Typical usage::
     dataset = RemoteDataset({"VIS06": "https://…", "IR105": "https://…"})
     with dataset["VIS06"] as f:
         ds = xr.open_dataset(f, engine="h5netcdf")
+
+    # Several entries at once — opens overlap instead of running back to back
+    with dataset.open_all(["VIS06", "IR105"]) as handles:
+        vis = xr.open_dataset(handles["VIS06"], engine="h5netcdf")
 """
 
 from __future__ import annotations
 
+import contextlib
 import fnmatch
-from collections.abc import Iterator
+import functools
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import quote
 
 from eumdac_fetch.auth import get_token
 from eumdac_fetch.remote import TokenRefreshingHTTPFileSystem
 
+# Per-entry read defaults for RemoteDataset.  h5netcdf walks HDF5 metadata and
+# chunks with many small reads; a 1 MiB read-ahead window coalesces them into
+# far fewer Range GETs.
+DEFAULT_BLOCK_SIZE = 1 << 20
+DEFAULT_CACHE_TYPE = "readahead"
+
 # ---------------------------------------------------------------------------
 # RemoteData — single-URL context manager
 # ---------------------------------------------------------------------------
@@ -63,6 +76,18 @@ class RemoteData:
         to reuse.  When provided ``token_manager`` and ``**kwargs`` are
         ignored.  :class:`RemoteDataset` uses this to share one filesystem
         across all its entries.
+    block_size:
+        Read-ahead block size in bytes for the opened file.  ``None`` keeps
+        the filesystem default.  Larger blocks mean fewer, bigger ``Range``
+        GETs when h5netcdf walks HDF5 chunks.
+    cache_type:
+        fsspec cache strategy for the opened file (e.g. ``"blockcache"``,
+        ``"background"``).  ``None`` keeps the filesystem default.
+    persistent:
+        Keep the handle open between ``with`` blocks.  Re-entering then
+        reuses the same handle (rewound to offset 0) together with its read
+        cache instead of re-opening the URL.  Call :meth:`close` to release
+        it.
     **kwargs:
         Forwarded verbatim to
         :class:`~eumdac_fetch.remote.TokenRefreshingHTTPFileSystem` when
@@ -74,14 +99,31 @@ class RemoteData:
 
         with RemoteData(url) as f:
             ds = xr.open_dataset(f, engine="h5netcdf")
+
+        # Large sequential HDF5 chunk reads
+        with RemoteData(url, block_size=8 * 2**20, cache_type="background") as f:
+            ds = xr.open_dataset(f, engine="h5netcdf")
+
+        # Several passes over the same entry
+        rd = RemoteData(url, persistent=True)
+        for region in regions:
+            with rd as f:
+                ...
+        rd.close()
     """
 
+    # A dataset may hold hundreds of entries; slots drop the per-instance __dict__.
+    __slots__ = ("_fs", "_handle", "_open_kwargs", "_persistent", "_url")
+
     def __init__(
         self,
         url: str,
         token_manager=None,
         *,
         fs: TokenRefreshingHTTPFileSystem | None = None,
+        block_size: int | None = None,
+        cache_type: str | None = None,
+        persistent: bool = False,
         **kwargs,
     ) -> None:
         if fs is not None:
@@ -92,19 +134,60 @@ class RemoteData:
             self._fs = TokenRefreshingHTTPFileSystem(token_obj=token_manager, **kwargs)
         self._url = url
         self._handle = None
+        self._persistent = persistent
+        self._open_kwargs = {}
+        if block_size is not None:
+            self._open_kwargs["block_size"] = block_size
+        if cache_type is not None:
+            self._open_kwargs["cache_type"] = cache_type
 
     def open(self):
         """Open and return the file handle without the context-manager protocol."""
-        return self._fs.open(self._url)
+        return self._fs.open(self._url, **self._open_kwargs)
+
+    def read_ranges(self, offsets: Sequence[int], lengths: Sequence[int]) -> list[bytes]:
+        """Fetch several byte ranges of this file concurrently.
+
+        Each ``(offset, length)`` pair becomes its own ``Range`` GET; the
+        requests are gathered on the filesystem's event loop over the shared
+        session, so they overlap instead of running one after another.  Token
+        refresh on 401 applies to every range.
+
+        Parameters
+        ----------
+        offsets:
+            Start byte of each range.
+        lengths:
+            Number of bytes to read for each range.
+
+        Returns
+        -------
+        list[bytes]
+            One ``bytes`` object per range, in input order.
+        """
+        if len(offsets) != len(lengths):
+            raise ValueError("offsets and lengths must have the same length")
+        starts = list(offsets)
+        ends = [start + length for start, length in zip(starts, lengths, strict=True)]
+        return self._fs.cat_ranges([self._url] * len(starts), starts, ends, on_error="raise")
+
+    def close(self) -> None:
+        """Close the held handle, if any (needed only with ``persistent=True``)."""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
 
     def __enter__(self):
-        self._handle = self.open()
+        # A caller may have closed the handle inside the previous block
+        if self._persistent and self._handle is not None and not self._handle.closed:
+            self._handle.seek(0)
+        else:
+            self._handle = self.open()
         return self._handle
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        if self._handle is not None:
-            self._handle.close()
-            self._handle = None
+        if not self._persistent:
+            self.close()
         return False
 
     def __repr__(self) -> str:
@@ -132,6 +215,12 @@ class RemoteDataset:
         Any object with a synchronous ``.access_token`` property.  Defaults
         to :func:`~eumdac_fetch.auth.get_token` called with the
         bootstrapped credentials from :data:`~eumdac_fetch.env.ENV`.
+    block_size, cache_type, persistent:
+        Applied to every entry; see :class:`RemoteData`.  Unlike a bare
+        :class:`RemoteData`, reads default to :data:`DEFAULT_BLOCK_SIZE` /
+        :data:`DEFAULT_CACHE_TYPE`; pass ``None`` to fall back to the
+        filesystem defaults.  With ``persistent=True`` call :meth:`close`
+        when done.
     **kwargs:
         Forwarded verbatim to
         :class:`~eumdac_fetch.remote.TokenRefreshingHTTPFileSystem`.
@@ -152,12 +241,22 @@ class RemoteDataset:
         self,
         entries: dict[str, str],
         token_manager=None,
+        *,
+        block_size: int | None = DEFAULT_BLOCK_SIZE,
+        cache_type: str | None = DEFAULT_CACHE_TYPE,
+        persistent: bool = False,
         **kwargs,
     ) -> None:
         if token_manager is None:
             token_manager = get_token()
         shared_fs = TokenRefreshingHTTPFileSystem(token_obj=token_manager, **kwargs)
-        self._entries: dict[str, RemoteData] = {name: RemoteData(url, fs=shared_fs) for name, url in entries.items()}
+        # Bind the per-entry constant arguments once; products can carry hundreds of entries.
+        make_entry = functools.partial(
+            RemoteData, fs=shared_fs, block_size=block_size, cache_type=cache_type, persistent=persistent
+        )
+        self._entries: dict[str, RemoteData] = {name: make_entry(url) for name, url in entries.items()}
+        # The mapping is fixed after construction, so the name sequence is built once.
+        self._names: tuple[str, ...] = tuple(self._entries)
 
     # ------------------------------------------------------------------
     # Mapping-like interface
@@ -177,13 +276,150 @@ class RemoteDataset:
 
     @property
     def entries(self) -> list[str]:
-        """Names of all available entries."""
-        return list(self._entries.keys())
+        """Names of all available entries, in insertion order.
+
+        Each access returns a new list copied from the cached name tuple, so
+        callers may modify it freely.
+        """
+        return list(self._names)
+
+    # ------------------------------------------------------------------
+    # Bulk access
+    # ------------------------------------------------------------------
+
+    def close(self) -> None:
+        """Close every handle held open by persistent entries."""
+        for remote in self._entries.values():
+            remote.close()
+
+    @contextlib.contextmanager
+    def open_all(
+        self,
+        names: Iterable[str] | None = None,
+        max_workers: int = 8,
+        prefetch: int = 0,
+    ) -> Iterator[dict]:
+        """Open several entries concurrently and yield ``{entry_name: handle}``.
+
+        Each :meth:`RemoteData.open` call waits on HTTP round-trips (the
+        initial ``HEAD``/metadata request), so opening entries one after the
+        other costs the sum of their latencies.  The opens are fanned out over
+        a thread pool instead; all threads share this dataset's single
+        filesystem and therefore its connection pool.
+
+        Every handle is closed when the context exits.  If any open fails,
+        the handles that did open are closed and the first error is raised.
+
+        Parameters
+        ----------
+        names:
+            Entry names to open.  ``None`` opens every entry.
+        max_workers:
+            Maximum number of concurrent opens.  Tune down for endpoints
+            that throttle parallel requests.
+        prefetch:
+            Number of leading bytes to read from each handle inside the
+            worker, then rewind.  The HDF5 superblock and root-group metadata
+            live at the start of the file, so e.g. ``prefetch=65536`` lands
+            them in each handle's read cache concurrently and the following
+            ``xr.open_dataset`` calls start from cached bytes.  ``0``
+            disables prefetching.
+
+        Examples
+        --------
+        ::
+
+            with dataset.open_all() as handles:
+                for name, f in handles.items():
+                    ds = xr.open_dataset(f, engine="h5netcdf")
+        """
+        selected = {name: self._entries[name] for name in (self._entries if names is None else names)}
+        with contextlib.ExitStack() as stack:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(selected)))) as pool:
+                futures = {name: pool.submit(_open_prefetched, rd, prefetch) for name, rd in selected.items()}
+
+            handles: dict = {}
+            error: Exception | None = None
+            for name, future in futures.items():
+                try:
+                    handle = future.result()
+                except Exception as exc:
+                    error = error or exc
+                    continue
+                stack.callback(handle.close)
+                handles[name] = handle
+            if error is not None:
+                raise error
+            yield handles
+
+    def gather_slices(
+        self,
+        requests: dict[str, tuple[str, dict]],
+        n_threads: int = 4,
+        engine: str = "h5netcdf",
+    ) -> dict:
+        """Read one variable slice from each of several entries on worker threads.
+
+        h5py releases the GIL around libhdf5 calls (range reads and chunk
+        decompression), so slices from different entries genuinely overlap
+        instead of being read one after another on the calling thread.
+
+        Requires :mod:`xarray` and the chosen engine's backend.
+
+        Parameters
+        ----------
+        requests:
+            Mapping of ``{entry_name: (variable_name, indexers)}`` where
+            ``indexers`` is passed to :meth:`xarray.DataArray.isel`, e.g.
+            ``{"x": slice(0, 64), "y": slice(0, 64)}``.
+        n_threads:
+            Number of worker threads.
+        engine:
+            xarray backend used to open each entry.
+
+        Returns
+        -------
+        dict
+            ``{entry_name: numpy.ndarray}`` in the order of ``requests``.
+
+        Examples
+        --------
+        ::
+
+            arrays = dataset.gather_slices(
+                {"VIS06": ("effective_radiance", {"x": slice(0, 64)}),
+                 "IR105": ("effective_radiance", {"x": slice(0, 64)})},
+            )
+        """
+        import xarray as xr
+
+        def _read(remote: RemoteData, variable: str, indexers: dict):
+            # Own handle per call rather than the context-manager slot on RemoteData.
+            with contextlib.closing(remote.open()) as f, xr.open_dataset(f, engine=engine) as ds:
+                return ds[variable].isel(**indexers).values
+
+        selected = {name: self._entries[name] for name in requests}
+        with ThreadPoolExecutor(max_workers=max(1, min(n_threads, len(selected)))) as pool:
+            futures = {name: pool.submit(_read, remote, *requests[name]) for name, remote in selected.items()}
+        return {name: future.result() for name, future in futures.items()}
 
     def __repr__(self) -> str:
         return f"RemoteDataset({self.entries!r})"
 
 
+def _open_prefetched(remote: RemoteData, prefetch: int):
+    """Open *remote* and, if *prefetch* is positive, warm the handle's read cache."""
+    handle = remote.open()
+    if prefetch > 0:
+        try:
+            handle.read(prefetch)
+            handle.seek(0)
+        except BaseException:
+            handle.close()
+            raise
+    return handle
+
+
 # ---------------------------------------------------------------------------
 # Factory
 # ---------------------------------------------------------------------------
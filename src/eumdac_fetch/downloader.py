@@ -7,7 +7,10 @@ import fnmatch
 import hashlib
 import http.client
 import logging
+import os
+import re
 import shutil
+from collections.abc import Callable
 from pathlib import Path
 from typing import Any
 
@@ -51,6 +54,24 @@ def _decode_entry_key(key: str) -> tuple[str, str | None]:
     return key, None
 
 
+def _entry_matcher(patterns: list[str]) -> Callable[[str], bool]:
+    """Return a predicate testing an entry name, or its basename, against any of ``patterns``.
+
+    The globs are translated into one alternation compiled once, so each entry
+    costs a single regex match rather than one ``fnmatch`` call per pattern.
+    Names and patterns are ``normcase``-d first, as :func:`fnmatch.fnmatch` does.
+    """
+    if not patterns:
+        return lambda _entry: False
+    regex = re.compile("|".join(fnmatch.translate(os.path.normcase(pat)) for pat in patterns))
+
+    def matches(entry: str) -> bool:
+        basename = entry.split("/")[-1]
+        return bool(regex.match(os.path.normcase(basename)) or regex.match(os.path.normcase(entry)))
+
+    return matches
+
+
 # Exception types that are considered transient and worth retrying.
 # requests.exceptions.RequestException covers HTTP-level errors raised by
 # the eumdac library (which uses requests internally).
@@ -100,7 +121,10 @@ class DownloadService:
             job_name: Name of the job for state tracking.
             collection: Collection ID.
         """
-        # Register products (or their entries) in state DB
+        # Collect the state rows to register: one per product, or one per matching entry
+        # (whole products map to the product, entries to None)
+        candidates: dict[str, object | None] = {}
+        entry_matches = _entry_matcher(self.entries) if self.entries is not None else None
         for product in products:
             product_id = str(product)
 
@@ -112,49 +136,38 @@ class DownloadService:
                 except Exception:
                     logger.warning("Could not list entries for %s, skipping", product_id)
                     continue
-                matching = [
-                    e
-                    for e in all_entries
-                    if any(fnmatch.fnmatch(e.split("/")[-1], pat) or fnmatch.fnmatch(e, pat) for pat in self.entries)
-                ]
+                matching = [e for e in all_entries if entry_matches(e)]
                 if not matching:
                     logger.warning("No entries matched patterns %s for %s", self.entries, product_id)
                     continue
                 for entry_name in matching:
-                    key = _encode_entry_key(product_id, entry_name)
-                    existing = self.state_db.get(key, job_name)
-                    if existing and existing.status in (ProductStatus.VERIFIED, ProductStatus.PROCESSED):
-                        logger.info("Skipping already verified/processed entry: %s", key)
-                        continue
-                    if not existing:
-                        self.state_db.upsert(
-                            ProductRecord(
-                                product_id=key,
-                                job_name=job_name,
-                                collection=collection,
-                                size_kb=0,  # Per-entry size not available from metadata
-                            )
-                        )
+                    candidates.setdefault(_encode_entry_key(product_id, entry_name), None)
             else:
                 # Whole-product mode: current behaviour
-                existing = self.state_db.get(product_id, job_name)
-                if existing and existing.status in (ProductStatus.VERIFIED, ProductStatus.PROCESSED):
-                    logger.info("Skipping already verified/processed: %s", product_id)
-                    continue
-                if not existing:
+                candidates.setdefault(product_id, product)
+
+        # Register new rows in one transaction; known rows keep their state
+        existing = self.state_db.get_many(candidates, job_name)
+        new_records = []
+        for key, product in candidates.items():
+            record = existing.get(key)
+            if record is None:
+                size_kb = 0  # Per-entry size not available from metadata
+                if product is not None:
                     # noinspection PyBroadException
                     try:
                         size_kb = product.size
                     except Exception:
                         size_kb = 0
-                    self.state_db.upsert(
-                        ProductRecord(
-                            product_id=product_id,
-                            job_name=job_name,
-                            collection=collection,
-                            size_kb=size_kb,
-                        )
-                    )
+                new_records.append(
+                    ProductRecord(product_id=key, job_name=job_name, collection=collection, size_kb=size_kb)
+                )
+            elif record.status in (ProductStatus.VERIFIED, ProductStatus.PROCESSED):
+                if self.entries is not None:
+                    logger.info("Skipping already verified/processed entry: %s", key)
+                else:
+                    logger.info("Skipping already verified/processed: %s", key)
+        self.state_db.upsert_many(new_records)
 
         # Get items to download
         to_download = self.state_db.get_resumable(job_name)
@@ -176,8 +189,6 @@ class DownloadService:
         # Map product objects by actual product ID (strips entry suffix if present)
         product_map = {str(p): p for p in products}
 
-        semaphore = asyncio.Semaphore(self.parallel)
-
         overall_progress = Progress(
             TextColumn("[bold blue]{task.fields[product_id]}"),
             BarColumn(),
@@ -195,22 +206,29 @@ class DownloadService:
         with Live(Group(overall_progress, download_progress)):
             overall_task = overall_progress.add_task("Overall", total=len(to_download), product_id="Overall")
 
-            tasks = []
+            jobs = []
             for record in to_download:
                 actual_product_id, entry_name = _decode_entry_key(record.product_id)
                 product = product_map.get(actual_product_id)
                 if product is None:
                     logger.warning("Product %s not found in search results, skipping", actual_product_id)
                     continue
-                tasks.append(
-                    self._download_one(semaphore, product, entry_name, record, progress, overall_progress, overall_task)
-                )
+                jobs.append((product, entry_name, record))
+
+            # A fixed pool of `parallel` workers drains one shared iterator, so
+            # in-flight state scales with `parallel` rather than with the job count
+            pending = iter(jobs)
 
-            await asyncio.gather(*tasks)
+            async def worker() -> None:
+                for product, entry_name, record in pending:
+                    await self._download_one(product, entry_name, record, progress, overall_progress, overall_task)
+
+            async with asyncio.TaskGroup() as tg:
+                for _ in range(min(self.parallel, len(jobs))):
+                    tg.create_task(worker())
 
     async def _download_one(
         self,
-        semaphore: asyncio.Semaphore,
         product: Any,
         entry_name: str | None,
         record: ProductRecord,
@@ -218,116 +236,115 @@ class DownloadService:
         overall_progress: Progress,
         overall_task: TaskID,
     ) -> None:
-        """Download a single product or entry with semaphore-controlled concurrency and retry."""
+        """Download a single product or entry, with retry; run by one of download_all's workers."""
         if self._shutdown.is_set():
             return
 
-        async with semaphore:
-            # noinspection GrazieInspection
-            db_key = record.product_id  # State DB key (may be encoded with entry suffix)
-            # Use entry filename for display and on-disk filename; fall back to product ID
-            filename = entry_name.split("/")[-1] if entry_name else db_key
-            total_bytes = int(record.size_kb * 1000)
-            # Seed the progress bar from already-downloaded bytes so a resumed
-            # download starts visually at the correct position, not at zero.
-            download_path = self.download_dir / filename
-            initial_bytes = download_path.stat().st_size if self.resume and download_path.exists() else 0
-            task_id = progress.add_task(
-                db_key,
-                total=total_bytes or None,
-                completed=initial_bytes,
-                product_id=filename[:40],
-            )
+        # noinspection GrazieInspection
+        db_key = record.product_id  # State DB key (may be encoded with entry suffix)
+        # Use entry filename for display and on-disk filename; fall back to product ID
+        filename = entry_name.split("/")[-1] if entry_name else db_key
+        total_bytes = int(record.size_kb * 1000)
+        # Seed the progress bar from already-downloaded bytes so a resumed
+        # download starts visually at the correct position, not at zero.
+        download_path = self.download_dir / filename
+        initial_bytes = download_path.stat().st_size if self.resume and download_path.exists() else 0
+        task_id = progress.add_task(
+            db_key,
+            total=total_bytes or None,
+            completed=initial_bytes,
+            product_id=filename[:40],
+        )
 
-            last_error = None
-            for attempt in range(self.max_retries + 1):
-                if self._shutdown.is_set():
-                    return
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            if self._shutdown.is_set():
+                return
 
-                try:
-                    self.state_db.update_status(db_key, record.job_name, ProductStatus.DOWNLOADING)
-
-                    download_path = self.download_dir / filename
-                    downloaded = await asyncio.wait_for(
-                        asyncio.to_thread(
-                            self._download_blocking, product, entry_name, download_path, record, progress, task_id
-                        ),
-                        timeout=self.timeout,
-                    )
+            try:
+                await self.state_db.aupdate_status(db_key, record.job_name, ProductStatus.DOWNLOADING)
+
+                download_path = self.download_dir / filename
+                downloaded = await asyncio.wait_for(
+                    asyncio.to_thread(
+                        self._download_blocking, product, entry_name, download_path, record, progress, task_id
+                    ),
+                    timeout=self.timeout,
+                )
 
-                    if downloaded:
-                        self.state_db.update_status(
-                            db_key,
-                            record.job_name,
-                            ProductStatus.DOWNLOADED,
-                            download_path=str(download_path),
-                            bytes_downloaded=download_path.stat().st_size,
-                        )
-
-                        # MD5 is a whole-product hash; skip verification for individual entries
-                        if self.verify_md5 and entry_name is None:
-                            verified = await asyncio.to_thread(self._verify_md5, product, download_path)
-                            if verified:
-                                self.state_db.update_status(db_key, record.job_name, ProductStatus.VERIFIED)
-                            else:
-                                self.state_db.update_status(
-                                    db_key,
-                                    record.job_name,
-                                    ProductStatus.FAILED,
-                                    error_message="MD5 verification failed",
-                                )
-                        else:
-                            self.state_db.update_status(db_key, record.job_name, ProductStatus.VERIFIED)
-
-                    # Success — break out of retry loop
-                    last_error = None
-                    break
-
-                except RETRYABLE_EXCEPTIONS as e:
-                    last_error = e
-                    if attempt < self.max_retries:
-                        wait = self.retry_backoff * (2**attempt)
-                        logger.warning(
-                            "Retryable error downloading %s (attempt %d/%d): %s. Retrying in %.1fs",
-                            filename,
-                            attempt + 1,
-                            self.max_retries + 1,
-                            e,
-                            wait,
-                        )
-                        await asyncio.sleep(wait)
-                        # Reset progress for retry
-                        progress.update(task_id, completed=0)
-                    # If last attempt, fall through to mark FAILED below
-
-                except Exception as e:
-                    # Non-retryable error — fail immediately
-                    logger.error("Failed to download %s: %s", filename, e)
-                    self.state_db.update_status(
+                if downloaded:
+                    await self.state_db.aupdate_status(
                         db_key,
                         record.job_name,
-                        ProductStatus.FAILED,
-                        error_message=str(e),
+                        ProductStatus.DOWNLOADED,
+                        download_path=str(download_path),
+                        bytes_downloaded=download_path.stat().st_size,
                     )
-                    last_error = None  # Already handled
-                    break
-
-            # If we exhausted retries on a retryable error, mark FAILED
-            if last_error is not None:
-                logger.error(
-                    "Failed to download %s after %d attempts: %s",
-                    filename,
-                    self.max_retries + 1,
-                    last_error,
-                )
-                self.state_db.update_status(
+
+                    # MD5 is a whole-product hash; skip verification for individual entries
+                    if self.verify_md5 and entry_name is None:
+                        verified = await asyncio.to_thread(self._verify_md5, product, download_path)
+                        if verified:
+                            await self.state_db.aupdate_status(db_key, record.job_name, ProductStatus.VERIFIED)
+                        else:
+                            await self.state_db.aupdate_status(
+                                db_key,
+                                record.job_name,
+                                ProductStatus.FAILED,
+                                error_message="MD5 verification failed",
+                            )
+                    else:
+                        await self.state_db.aupdate_status(db_key, record.job_name, ProductStatus.VERIFIED)
+
+                # Success — break out of retry loop
+                last_error = None
+                break
+
+            except RETRYABLE_EXCEPTIONS as e:
+                last_error = e
+                if attempt < self.max_retries:
+                    wait = self.retry_backoff * (2**attempt)
+                    logger.warning(
+                        "Retryable error downloading %s (attempt %d/%d): %s. Retrying in %.1fs",
+                        filename,
+                        attempt + 1,
+                        self.max_retries + 1,
+                        e,
+                        wait,
+                    )
+                    await asyncio.sleep(wait)
+                    # Reset progress for retry
+                    progress.update(task_id, completed=0)
+                # If last attempt, fall through to mark FAILED below
+
+            except Exception as e:
+                # Non-retryable error — fail immediately
+                logger.error("Failed to download %s: %s", filename, e)
+                await self.state_db.aupdate_status(
                     db_key,
                     record.job_name,
                     ProductStatus.FAILED,
-                    error_message=f"Failed after {self.max_retries + 1} attempts: {last_error}",
+                    error_message=str(e),
                 )
+                last_error = None  # Already handled
+                break
+
+        # If we exhausted retries on a retryable error, mark FAILED
+        if last_error is not None:
+            logger.error(
+                "Failed to download %s after %d attempts: %s",
+                filename,
+                self.max_retries + 1,
+                last_error,
+            )
+            await self.state_db.aupdate_status(
+                db_key,
+                record.job_name,
+                ProductStatus.FAILED,
+                error_message=f"Failed after {self.max_retries + 1} attempts: {last_error}",
+            )
 
-            overall_progress.update(overall_task, advance=1)
+        overall_progress.update(overall_task, advance=1)
 
     def _download_blocking(
         self,
@@ -21,8 +21,10 @@ Typical usage::
 
 from __future__ import annotations
 
+import functools
 import logging
 import os
+import re
 import warnings
 from pathlib import Path
 
@@ -35,30 +37,44 @@ DEFAULT_VALIDITY: int = 86400  # 24 hours in seconds
 # a SyntaxError on Python ≤ 3.13 and breaks the RTD build.
 _CREDENTIAL_FILE_ERRORS = (OSError, ValueError)
 
+# Resolves the directory holding ``.eumdac/credentials``; a module attribute so
+# tests can point it elsewhere without patching pathlib.
+_home = Path.home
+
+# One .env assignment per line: everything before the first "=" is the key, the
+# rest is the value; surrounding blanks are dropped and one matching pair of
+# outer quotes is removed.  Comment lines, blank lines and lines without "="
+# never match.  Runs over the raw file bytes, so only the matched keys and
+# values are decoded.
+_DOTENV_LINE = re.compile(
+    rb"""^[^\S\n]*+(?!\#)(?P<key>[^=\n]*?)[^\S\n]*=[^\S\n]*"""
+    rb"""(?:"(?P<dq>.*)"|'(?P<sq>.*)'|(?P<raw>.*?))[^\S\n]*$""",
+    re.MULTILINE,
+)
+
 # ---------------------------------------------------------------------------
 # Internal helpers
 # ---------------------------------------------------------------------------
 
 
 def _parse_dotenv(path: Path) -> dict[str, str]:
-    """Parse a .env file into a ``{key: value}`` dict.
+    """Parse the .env file at ``path`` into a ``{key: value}`` dict.
+
+    See :func:`_parse_dotenv_bytes` for the grammar.
+    """
+    return _parse_dotenv_bytes(path.read_bytes())
+
+
+def _parse_dotenv_bytes(data: bytes) -> dict[str, str]:
+    """Parse the contents of a .env file into a ``{key: value}`` dict.
 
     Handles ``KEY=value``, double/single-quoted values, comment lines, and
     blank lines.  Inline comments are *not* stripped (not standard dotenv).
+    Only the captured keys and values are decoded (UTF-8), instead of
+    decoding the whole file up front.
     """
-    result: dict[str, str] = {}
-    for line in path.read_text().splitlines():
-        line = line.strip()
-        if not line or line.startswith("#") or "=" not in line:
-            continue
-        key, _, value = line.partition("=")
-        key = key.strip()
-        value = value.strip()
-        if len(value) >= 2 and value[0] == value[-1] and value[0] in ('"', "'"):
-            value = value[1:-1]
-        if key:
-            result[key] = value
-    return result
+    # The value alternative that matched is always the last group to close
+    return {m["key"].decode(): m[m.lastgroup].decode() for m in _DOTENV_LINE.finditer(data) if m["key"]}
 
 
 def _parse_validity(raw: str, *, source: str) -> int | None:
@@ -76,7 +92,42 @@ def _parse_validity(raw: str, *, source: str) -> int | None:
     return None
 
 
+def _credentials_signature() -> tuple[str, ...]:
+    """Return the inputs that select which credential source wins.
+
+    Covers the three env vars plus the directories searched for ``.env`` and
+    ``~/.eumdac/credentials``; edits to the files themselves are not tracked.
+    When both env vars are set the file sources are never consulted, so the
+    directories are left out and not resolved.
+    """
+    env = (
+        os.environ.get("EUMDAC_KEY", ""),
+        os.environ.get("EUMDAC_SECRET", ""),
+        os.environ.get("EUMDAC_TOKEN_VALIDITY", ""),
+    )
+    if env[0] and env[1]:
+        return env
+    return (*env, os.getcwd(), str(_home()))
+
+
+@functools.lru_cache(maxsize=1)
+def _load_credentials_cached(signature: tuple[str, ...]) -> tuple[str | None, str | None, int]:  # noqa: ARG001
+    """Memoize :func:`_discover_credentials` per :func:`_credentials_signature`.
+
+    Call ``_load_credentials_cached.cache_clear()`` to force a fresh lookup.
+    """
+    return _discover_credentials()
+
+
 def _load_credentials() -> tuple[str | None, str | None, int]:
+    """Discover EUMDAC credentials, reusing the last result while the environment is unchanged.
+
+    See :func:`_discover_credentials` for the priority chain.
+    """
+    return _load_credentials_cached(_credentials_signature())
+
+
+def _discover_credentials() -> tuple[str | None, str | None, int]:
     """Discover EUMDAC credentials and token validity through a priority chain.
 
     Credentials (key/secret) are read from env vars → ``.env`` →
@@ -103,26 +154,27 @@ def _load_credentials() -> tuple[str | None, str | None, int]:
     if key and secret:
         return key, secret, validity
 
-    # 2. .env file in the current working directory
-    dotenv_path = Path(".env")
-    if dotenv_path.exists():
-        # noinspection PyBroadException
-        try:
-            env_vars = _parse_dotenv(dotenv_path)
-            key = key or env_vars.get("EUMDAC_KEY") or None
-            secret = secret or env_vars.get("EUMDAC_SECRET") or None
-            raw_validity = env_vars.get("EUMDAC_TOKEN_VALIDITY")
-            if raw_validity:
-                parsed = _parse_validity(raw_validity, source=".env file")
-                if parsed is not None:
-                    validity = parsed
-            if key and secret:
-                return key, secret, validity
-        except _CREDENTIAL_FILE_ERRORS:
-            logger.debug("Failed to parse .env file", exc_info=True)
+    # 2. .env file in the current working directory (a missing file is the common case, not an error)
+    # noinspection PyBroadException
+    try:
+        env_vars = _parse_dotenv(Path(".env"))
+    except FileNotFoundError:
+        env_vars = {}
+    except _CREDENTIAL_FILE_ERRORS:
+        logger.debug("Failed to parse .env file", exc_info=True)
+        env_vars = {}
+    key = key or env_vars.get("EUMDAC_KEY") or None
+    secret = secret or env_vars.get("EUMDAC_SECRET") or None
+    raw_validity = env_vars.get("EUMDAC_TOKEN_VALIDITY")
+    if raw_validity:
+        parsed = _parse_validity(raw_validity, source=".env file")
+        if parsed is not None:
+            validity = parsed
+    if key and secret:
+        return key, secret, validity
 
     # 3. ~/.eumdac/credentials  (format: "key,secret")
-    cred_file = Path.home() / ".eumdac" / "credentials"
+    cred_file = _home() / ".eumdac" / "credentials"
     if cred_file.exists():
         # noinspection PyBroadException
         try:
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import functools
 import importlib
 import math
 from collections.abc import Callable
@@ -24,11 +25,25 @@ def register(name: str, factory: Callable[..., PostSearchFilterFn]) -> None:
     _REGISTRY[name] = factory
 
 
+@functools.lru_cache(maxsize=128)
+def _resolve_factory(spec: str) -> Callable[..., PostSearchFilterFn]:
+    """Import and return the factory named by a ``'module:factory'`` spec.
+
+    Cached so jobs sharing a custom filter resolve it once; call
+    ``_resolve_factory.cache_clear()`` after reloading the module.
+    """
+    module_path, _, factory_name = spec.partition(":")
+    module = importlib.import_module(module_path)
+    return getattr(module, factory_name)
+
+
 def build_filter(type_: str, params: dict) -> PostSearchFilterFn:
     """Build a PostSearchFilterFn from a type name and params dict.
 
     If *type_* contains ':', it is treated as ``'module:factory_callable'`` and
     dynamically imported, otherwise the built-in registry is consulted.
+    The factory is called on every build, so each job gets its own filter;
+    only the import of a ``'module:factory'`` spec is cached.
 
     Args:
         type_: Filter type name or ``'module:factory'`` import path.
@@ -41,10 +56,7 @@ def build_filter(type_: str, params: dict) -> PostSearchFilterFn:
         ValueError: If *type_* is not found in the registry (and does not contain ':').
     """
     if ":" in type_:
-        module_path, _, factory_name = type_.partition(":")
-        module = importlib.import_module(module_path)
-        factory = getattr(module, factory_name)
-        return factory(**params)
+        return _resolve_factory(type_)(**params)
 
     if type_ not in _REGISTRY:
         available = ", ".join(sorted(_REGISTRY.keys()))
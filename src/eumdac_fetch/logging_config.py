@@ -9,6 +9,41 @@ from rich.logging import RichHandler
 
 from eumdac_fetch.models import LoggingConfig
 
+# Log files are written in blocks of this size rather than once per record
+_LOG_BUFFER_SIZE = 64 * 1024
+
+
+class _BufferedFileHandler(logging.FileHandler):
+    """FileHandler that lets a 64 KiB buffer batch DEBUG records instead of flushing per record.
+
+    ``StreamHandler.emit`` flushes after every record; here DEBUG records are
+    left in the buffer and any INFO or higher record flushes it, so the log
+    always shows what is currently running while bursts of debug detail are
+    written in blocks.  Buffered DEBUG lines are also written on an explicit
+    :meth:`flush` or when the handler is closed.
+    """
+
+    def _open(self):
+        return open(
+            self.baseFilename, self.mode, buffering=_LOG_BUFFER_SIZE, encoding=self.encoding, errors=self.errors
+        )
+
+    def emit(self, record: logging.LogRecord) -> None:
+        # Same as FileHandler/StreamHandler.emit, minus the unconditional flush;
+        # Handler.handle() holds self.lock around this call
+        if self.stream is None and (self.mode != "w" or not self._closed):
+            self.stream = self._open()
+        if not self.stream:
+            return
+        try:
+            self.stream.write(self.format(record) + self.terminator)
+            if record.levelno >= logging.INFO:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
 
 def setup_logging(config: LoggingConfig | None = None) -> logging.Logger:
     """Configure logging with Rich console handler and optional file handler.
@@ -36,7 +71,7 @@ def setup_logging(config: LoggingConfig | None = None) -> logging.Logger:
     logger.addHandler(console_handler)
 
     if config.file:
-        file_handler = logging.FileHandler(config.file)
+        file_handler = _BufferedFileHandler(config.file)
         file_handler.setLevel(logging.DEBUG)
         formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
         file_handler.setFormatter(formatter)
@@ -53,10 +88,11 @@ def add_session_log_handler(log_path: Path, level: str = "DEBUG") -> logging.Han
         level: Logging level for the file handler.
 
     Returns:
-        The created FileHandler (for later removal if needed).
+        The created FileHandler (for later removal if needed). Output is
+        buffered, so close the handler once it is removed.
     """
     logger = logging.getLogger("eumdac_fetch")
-    file_handler = logging.FileHandler(log_path)
+    file_handler = _BufferedFileHandler(log_path)
     file_handler.setLevel(getattr(logging, level.upper(), logging.DEBUG))
     formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s")
     file_handler.setFormatter(formatter)
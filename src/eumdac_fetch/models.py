@@ -3,8 +3,9 @@
 from __future__ import annotations
 
 import enum
+import operator
 from collections.abc import Callable
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 from pathlib import Path
 from typing import TYPE_CHECKING
@@ -33,7 +34,7 @@ class ProductStatus(enum.Enum):
     FAILED = "failed"
 
 
-@dataclass
+@dataclass(slots=True)
 class SearchFilters:
     """All supported eumdac search parameters."""
 
@@ -63,37 +64,15 @@ class SearchFilters:
 
     def to_search_kwargs(self) -> dict:
         """Convert to kwargs dict for collection.search(), dropping None values."""
-        kwargs = {}
-        # noinspection SpellCheckingInspection
-        for f in (
-            "dtstart",
-            "dtend",
-            "geo",
-            "bbox",
-            "sat",
-            "timeliness",
-            "filename",
-            "title",
-            "cycle",
-            "orbit",
-            "relorbit",
-            "product_type",
-            "type",
-            "publication",
-            "download_coverage",
-            "coverage",
-            "repeatCycleIdentifier",
-            "centerOfLongitude",
-            "set",
-            "sort",
-        ):
-            val = getattr(self, f)
-            if val is not None:
-                kwargs[f] = val
-        return kwargs
-
-
-@dataclass
+        return {k: v for k, v in zip(_SEARCH_FIELD_NAMES, _search_field_values(self), strict=True) if v is not None}
+
+
+# Every SearchFilters field is a search kwarg; attrgetter reads them all in one call
+_SEARCH_FIELD_NAMES = tuple(f.name for f in fields(SearchFilters))
+_search_field_values = operator.attrgetter(*_SEARCH_FIELD_NAMES)
+
+
+@dataclass(slots=True)
 class DownloadConfig:
     """Download configuration for a job."""
 
@@ -108,7 +87,7 @@ class DownloadConfig:
     entries: list[str] | None = None  # Glob patterns for entries; None = whole product (ZIP)
 
 
-@dataclass
+@dataclass(slots=True)
 class PostProcessConfig:
     """Post-processing configuration for a job."""
 
@@ -117,7 +96,7 @@ class PostProcessConfig:
     output_dir: Path = field(default_factory=lambda: Path("./output"))
 
 
-@dataclass
+@dataclass(slots=True)
 class PostSearchFilterConfig:
     """Configuration for a post-search filter."""
 
@@ -125,7 +104,7 @@ class PostSearchFilterConfig:
     params: dict = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class JobConfig:
     """Configuration for a single download job."""
 
@@ -138,7 +117,7 @@ class JobConfig:
     limit: int | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class LoggingConfig:
     """Logging configuration."""
 
@@ -146,15 +125,16 @@ class LoggingConfig:
     file: str | None = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AppConfig:
     """Top-level application configuration."""
 
     logging: LoggingConfig = field(default_factory=LoggingConfig)
     jobs: list[JobConfig] = field(default_factory=list)
+    parallel_jobs: int = 1
 
 
-@dataclass
+@dataclass(slots=True)
 class ProductRecord:
     """Per-product state tracking record."""
 
@@ -4,8 +4,10 @@ from __future__ import annotations
 
 import asyncio
 import contextlib
+import contextvars
 import logging
 import signal
+import time
 from pathlib import Path
 
 import eumdac
@@ -22,6 +24,49 @@ logger = logging.getLogger("eumdac_fetch")
 
 SENTINEL = None  # Signals end of queue
 
+# Name of the job the current task is working on; routes records to its session log
+_current_job: contextvars.ContextVar[str | None] = contextvars.ContextVar("eumdac_fetch_current_job", default=None)
+
+# Final post-processing statuses are written in batches of up to this many
+# rows, or sooner once this many seconds have passed since the last write.
+# FAILED statuses are never held back.
+_STATUS_BATCH_SIZE = 256
+_STATUS_FLUSH_INTERVAL = 2.0
+
+
+class _StatusBatch:
+    """Buffer final product statuses and write them with StateDB.update_status_many."""
+
+    def __init__(self, state_db: StateDB):
+        self._state_db = state_db
+        self._updates: list[tuple[str, str, ProductStatus, str | None]] = []
+        self._flushed_at = time.monotonic()
+
+    def _remaining(self) -> float:
+        return _STATUS_FLUSH_INTERVAL - (time.monotonic() - self._flushed_at)
+
+    def add(self, product_id: str, job_name: str, status: ProductStatus, error_message: str | None = None) -> None:
+        """Queue a status update, flushing when it is a failure or the batch is full or overdue."""
+        self._updates.append((product_id, job_name, status, error_message))
+        if status == ProductStatus.FAILED or len(self._updates) >= _STATUS_BATCH_SIZE or self._remaining() <= 0:
+            self.flush()
+
+    async def get(self, queue: asyncio.Queue):
+        """Wait for the next queue item, flushing queued updates if the queue stays idle until they are due."""
+        if self._updates:
+            try:
+                return await asyncio.wait_for(queue.get(), max(self._remaining(), 0))
+            except TimeoutError:
+                self.flush()
+        return await queue.get()
+
+    def flush(self) -> None:
+        """Write all queued updates in one transaction."""
+        if self._updates:
+            self._state_db.update_status_many(self._updates)
+            self._updates = []
+        self._flushed_at = time.monotonic()
+
 
 class Pipeline:
     """Orchestrates search -> download -> post-process as an async producer-consumer pipeline."""
@@ -48,91 +93,136 @@ class Pipeline:
             with contextlib.suppress(NotImplementedError):
                 loop.add_signal_handler(sig, self._handle_signal)  # type: ignore[arg-type]
 
+        try:
+            await self._run_jobs()
+        finally:
+            # The loop may outlive this run; don't leave it routing signals here
+            for sig in (signal.SIGINT, signal.SIGTERM):
+                with contextlib.suppress(NotImplementedError):
+                    loop.remove_signal_handler(sig)
+
+        logger.info("Pipeline finished")
+
+    async def _run_jobs(self) -> None:
+        """Run the configured jobs, up to ``parallel_jobs`` at a time, until done or shut down."""
         search_service = SearchService(self.token)
 
-        for job in self.config.jobs:
-            if self._shutdown.is_set():
-                break
+        if self.config.parallel_jobs <= 1:
+            for job in self.config.jobs:
+                if self._shutdown.is_set():
+                    break
+                await self._run_job(search_service, job)
+                if self._shutdown.is_set():
+                    logger.info("Shutdown requested, stopping pipeline")
+                    break
+            return
 
-            # Create session for this job
-            session = Session(job)
-            session.initialize()
+        slots = asyncio.Semaphore(self.config.parallel_jobs)
 
-            logger.info(
-                "Session: %s (%s)",
-                session.session_id,
-                "new" if session.is_new else "resuming",
-            )
-            logger.info("Session dir: %s", session.session_dir)
-            if session.is_live:
-                logger.info("Live session — search results will be refreshed")
+        async def run_when_free(job) -> None:
+            async with slots:
+                # Jobs still waiting for a slot are skipped once shutdown is requested
+                if not self._shutdown.is_set():
+                    await self._run_job(search_service, job)
 
-            # Set up session-scoped logging
-            log_handler = add_session_log_handler(session.log_path)
+        async with asyncio.TaskGroup() as tg:
+            for job in self.config.jobs:
+                tg.create_task(run_when_free(job))
 
-            # Set up state DB in session directory
-            state_db = StateDB(session.state_db_path)
+        if self._shutdown.is_set():
+            logger.info("Shutdown requested, stopping pipeline")
 
-            try:
-                logger.info("Starting pipeline for job: %s", job.name)
-
-                # Reset stale DOWNLOADING products from previous killed runs
-                if not session.is_new:
-                    reset_count = state_db.reset_stale_downloads(job.name)
-                    if reset_count:
-                        logger.info("Reset %d stale downloading products to pending", reset_count)
-
-                # Search with caching
-                products = self._search_with_cache(
-                    search_service,
-                    session,
-                    state_db,
-                    job,
-                )
+    async def _run_job(self, search_service: SearchService, job) -> None:
+        """Search, download and post-process a single job inside its own session."""
+        job_token = _current_job.set(job.name)
+        try:
+            await self._run_session(search_service, job)
+        finally:
+            _current_job.reset(job_token)
 
-                if not products:
-                    continue
+    async def _run_session(self, search_service: SearchService, job) -> None:
+        """Create or resume the job's session and run it through the pipeline."""
+        session = Session(job)
+        session.initialize()
 
-                is_remote = job.post_process.mode == "remote" and self.remote_post_processor is not None
-                if is_remote:
-                    await self._run_remote(products, job, state_db, session)
-                elif job.post_process.enabled and self.post_processor and job.download.enabled:
-                    session.download_dir.mkdir(parents=True, exist_ok=True)
-                    await self._run_with_post_processing(products, job, state_db, session)
-                elif job.download.enabled:
-                    session.download_dir.mkdir(parents=True, exist_ok=True)
-                    if job.post_process.enabled and not self.post_processor:
-                        logger.warning(
-                            "Post-processing enabled for job '%s' but no post_processor callable provided; "
-                            "downloading only",
-                            job.name,
-                        )
-                    await self._run_download_only(products, job, state_db, session)
-                else:
-                    logger.info("Search-only mode: download disabled — results cached")
-                    for product in products:
-                        product_id = str(product)
-                        if state_db.get(product_id, job.name) is None:
-                            state_db.upsert(
-                                ProductRecord(
-                                    product_id=product_id,
-                                    job_name=job.name,
-                                    collection=job.collection,
-                                    status=ProductStatus.PENDING,
-                                )
+        logger.info(
+            "Session: %s (%s)",
+            session.session_id,
+            "new" if session.is_new else "resuming",
+        )
+        logger.info("Session dir: %s", session.session_dir)
+        if session.is_live:
+            logger.info("Live session — search results will be refreshed")
+
+        # Set up session-scoped logging. With parallel jobs, records logged on
+        # behalf of another job stay out; records from threads that carry no
+        # job context (e.g. plain executor pools) still reach every session log
+        log_handler = add_session_log_handler(session.log_path)
+        log_handler.addFilter(lambda _record: _current_job.get() in (None, job.name))
+
+        # Set up state DB in session directory
+        state_db = StateDB(session.state_db_path)
+
+        try:
+            logger.info("Starting pipeline for job: %s", job.name)
+
+            # Reset stale DOWNLOADING products from previous killed runs
+            if not session.is_new:
+                reset_count = state_db.reset_stale_downloads(job.name)
+                if reset_count:
+                    logger.info("Reset %d stale downloading products to pending", reset_count)
+
+            # Search with caching
+            products = await self._search_with_cache(search_service, session, state_db, job)
+
+            if not products:
+                return
+
+            is_remote = job.post_process.mode == "remote" and self.remote_post_processor is not None
+            if is_remote:
+                await self._run_remote(products, job, state_db, session)
+            elif job.post_process.enabled and self.post_processor and job.download.enabled:
+                session.download_dir.mkdir(parents=True, exist_ok=True)
+                await self._run_with_post_processing(products, job, state_db, session)
+            elif job.download.enabled:
+                session.download_dir.mkdir(parents=True, exist_ok=True)
+                if job.post_process.enabled and not self.post_processor:
+                    logger.warning(
+                        "Post-processing enabled for job '%s' but no post_processor callable provided; "
+                        "downloading only",
+                        job.name,
+                    )
+                await self._run_download_only(products, job, state_db, session)
+            else:
+                logger.info("Search-only mode: download disabled — results cached")
+                for product in products:
+                    product_id = str(product)
+                    if state_db.get(product_id, job.name) is None:
+                        state_db.upsert(
+                            ProductRecord(
+                                product_id=product_id,
+                                job_name=job.name,
+                                collection=job.collection,
+                                status=ProductStatus.PENDING,
                             )
-            finally:
-                state_db.close()
-                logging.getLogger("eumdac_fetch").removeHandler(log_handler)
+                        )
+        finally:
+            state_db.close()
+            logging.getLogger("eumdac_fetch").removeHandler(log_handler)
+            log_handler.close()
 
-            if self._shutdown.is_set():
-                logger.info("Shutdown requested, stopping pipeline")
-                break
+    async def _call_blocking(self, fn, /, *args, **kwargs):
+        """Call a blocking function, in a worker thread when other jobs share the loop.
 
-        logger.info("Pipeline finished")
+        Only the remote calls go through here; the StateDB is used from the
+        loop thread, so no worker thread opens a connection of its own.
+        """
+        if self.config.parallel_jobs > 1:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+        return fn(*args, **kwargs)
 
-    @staticmethod
-    def _search_with_cache(
+    async def _search_with_cache(
+        self,
         search_service: SearchService,
         session: Session,
         state_db: StateDB,
@@ -146,11 +236,13 @@ class Pipeline:
                 logger.info("All products already processed for job: %s", job.name)
                 return []
             logger.info("Reconstructing %d product objects from cache (no re-search)", len(resumable))
-            products = [search_service.get_product(r.collection, r.product_id) for r in resumable]
+            products = await self._call_blocking(
+                lambda: [search_service.get_product(r.collection, r.product_id) for r in resumable]
+            )
             return products
 
         logger.info("Searching for products in %s", job.collection)
-        products = search_service.iter_products(job.collection, job.filters, limit=job.limit)
+        products = await self._call_blocking(search_service.iter_products, job.collection, job.filters, limit=job.limit)
         logger.info("Found %d products", len(products))
 
         if job.post_search_filter:
@@ -234,7 +326,7 @@ class Pipeline:
 
     async def _run_in_thread_with_status(
         self,
-        state_db: StateDB,
+        statuses: _StatusBatch,
         product_id: str,
         job_name: str,
         process_queue: asyncio.Queue,
@@ -242,13 +334,13 @@ class Pipeline:
         args: tuple,
         label: str,
     ) -> None:
-        """Call fn(*args) in a thread pool, updating product status to PROCESSED or FAILED."""
+        """Call fn(*args) in a thread pool, queueing product status PROCESSED or FAILED."""
         try:
             await asyncio.to_thread(fn, *args)
-            state_db.update_status(product_id, job_name, ProductStatus.PROCESSED)
+            statuses.add(product_id, job_name, ProductStatus.PROCESSED)
         except Exception as e:
             logger.error("%s failed for %s: %s", label, product_id, e)
-            state_db.update_status(
+            statuses.add(
                 product_id,
                 job_name,
                 ProductStatus.FAILED,
@@ -264,26 +356,30 @@ class Pipeline:
         process_queue: asyncio.Queue,
     ) -> None:
         """Consume downloaded products and post-process them."""
-        while True:
-            if self._shutdown.is_set():
-                break
-
-            record = await process_queue.get()
-            if record is SENTINEL:
-                break
-
-            logger.info("Post-processing product: %s", record.product_id)
-            state_db.update_status(record.product_id, job_name, ProductStatus.PROCESSING)
-            download_path = Path(record.download_path)
-            await self._run_in_thread_with_status(
-                state_db,
-                record.product_id,
-                job_name,
-                process_queue,
-                self.post_processor,
-                (download_path, record.product_id),
-                "Post-processing",
-            )
+        statuses = _StatusBatch(state_db)
+        try:
+            while True:
+                if self._shutdown.is_set():
+                    break
+
+                record = await statuses.get(process_queue)
+                if record is SENTINEL:
+                    break
+
+                logger.info("Post-processing product: %s", record.product_id)
+                state_db.update_status(record.product_id, job_name, ProductStatus.PROCESSING)
+                download_path = Path(record.download_path)
+                await self._run_in_thread_with_status(
+                    statuses,
+                    record.product_id,
+                    job_name,
+                    process_queue,
+                    self.post_processor,
+                    (download_path, record.product_id),
+                    "Post-processing",
+                )
+        finally:
+            statuses.flush()
 
     async def _run_remote(self, products: list, job, state_db: StateDB, _session: Session) -> None:
         """Run remote post-processing pipeline without downloading files."""
@@ -334,26 +430,30 @@ class Pipeline:
         process_queue: asyncio.Queue,
     ) -> None:
         """Consume RemoteDatasets and call remote_post_processor."""
-        while True:
-            if self._shutdown.is_set():
-                break
-
-            item = await process_queue.get()
-            if item is SENTINEL:
-                break
-
-            dataset, product_id = item
-            logger.info("Remote processing product: %s", product_id)
-            state_db.update_status(product_id, job_name, ProductStatus.PROCESSING)
-            await self._run_in_thread_with_status(
-                state_db,
-                product_id,
-                job_name,
-                process_queue,
-                self.remote_post_processor,
-                (dataset, product_id),
-                "Remote processing",
-            )
+        statuses = _StatusBatch(state_db)
+        try:
+            while True:
+                if self._shutdown.is_set():
+                    break
+
+                item = await statuses.get(process_queue)
+                if item is SENTINEL:
+                    break
+
+                dataset, product_id = item
+                logger.info("Remote processing product: %s", product_id)
+                state_db.update_status(product_id, job_name, ProductStatus.PROCESSING)
+                await self._run_in_thread_with_status(
+                    statuses,
+                    product_id,
+                    job_name,
+                    process_queue,
+                    self.remote_post_processor,
+                    (dataset, product_id),
+                    "Remote processing",
+                )
+        finally:
+            statuses.flush()
 
     def _handle_signal(self) -> None:
         """Handle shutdown signal."""
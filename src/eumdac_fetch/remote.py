@@ -22,12 +22,27 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+import weakref
 
 import aiohttp
+from fsspec.asyn import FSTimeoutError, sync
 from fsspec.implementations.http import HTTPFileSystem
 
 logger = logging.getLogger(__name__)
 
+# Shared connection pool sizing.  The pool outlives individual aiohttp
+# sessions so pooled TCP/TLS connections survive a token-refresh session swap.
+CONNECTION_LIMIT = 32
+KEEPALIVE_TIMEOUT = 75.0
+
+# Seconds a URL's stat result (size etc.) is reused before probing the server again.
+INFO_CACHE_TTL = 300.0
+
+# Named tuple so ruff format cannot strip the parentheses from the except clause
+# (see the matching note in eumdac_fetch.env).
+_CLOSE_ERRORS = (TimeoutError, FSTimeoutError, NotImplementedError)
+
 
 class TokenRefreshingHTTPFileSystem(HTTPFileSystem):
     """An HTTPFileSystem that transparently refreshes Bearer tokens on HTTP 401.
@@ -54,6 +69,12 @@ class TokenRefreshingHTTPFileSystem(HTTPFileSystem):
         calling ``time.sleep``).  It is always bridged to a thread via
         ``asyncio.to_thread`` to avoid stalling the event loop.
 
+    *   All sessions draw from one long-lived ``aiohttp.TCPConnector`` owned
+        by the filesystem (``connector_owner=False``).  Closing the session on
+        a token refresh therefore keeps the pooled keep-alive connections, so
+        the retried request does not pay a fresh TCP + TLS handshake.  A
+        ``connector`` passed in ``client_kwargs`` takes precedence.
+
     *   ``encoded=True`` is set by default so that fsspec does not re-encode
         URLs that already contain percent-encoded characters (``%3A``,
         ``%2B``, …).  Double-encoding produces URLs the server cannot resolve,
@@ -65,13 +86,38 @@ class TokenRefreshingHTTPFileSystem(HTTPFileSystem):
         Any object with a synchronous ``.access_token`` property that returns
         the current Bearer token as a ``str``.  Must remain alive for the
         duration of the filesystem's use.
+    connection_limit:
+        Maximum number of pooled connections (default
+        :data:`CONNECTION_LIMIT`).  A low value keeps concurrent range reads
+        funnelled through a few long-lived, already-handshaken connections.
+    keepalive_timeout:
+        Seconds an idle pooled connection is kept open (default
+        :data:`KEEPALIVE_TIMEOUT`).
+    info_cache_ttl:
+        Seconds a successful :meth:`_info` result is reused for the same URL
+        (default :data:`INFO_CACHE_TTL`).  Re-opening an entry then skips the
+        ``HEAD`` probe fsspec issues to learn the file size.  ``0`` disables
+        the cache.
     *args, **kwargs:
         Forwarded verbatim to :class:`fsspec.implementations.http.HTTPFileSystem`.
     """
 
-    def __init__(self, token_obj, *args, **kwargs) -> None:
+    def __init__(
+        self,
+        token_obj,
+        *args,
+        connection_limit: int = CONNECTION_LIMIT,
+        keepalive_timeout: float = KEEPALIVE_TIMEOUT,
+        info_cache_ttl: float = INFO_CACHE_TTL,
+        **kwargs,
+    ) -> None:
         self.token_obj = token_obj
+        self.connection_limit = connection_limit
+        self.keepalive_timeout = keepalive_timeout
+        self.info_cache_ttl = info_cache_ttl
+        self._info_cache: dict[str, tuple[float, dict]] = {}
         self._refresh_lock = asyncio.Lock()
+        self._connector: aiohttp.TCPConnector | None = None
 
         # Pre-populate so the very first request is already authenticated.
         # token_obj.access_token is a synchronous property — safe at __init__ time.
@@ -84,6 +130,40 @@ class TokenRefreshingHTTPFileSystem(HTTPFileSystem):
 
         super().__init__(*args, **kwargs)
 
+    # ------------------------------------------------------------------
+    # Session / connection pool
+    # ------------------------------------------------------------------
+
+    async def set_session(self):
+        """Return the current session, creating it on the shared connector if needed."""
+        if self._session is None:
+            client_kwargs = dict(self.client_kwargs)
+            if "connector" not in client_kwargs:
+                if self._connector is None or self._connector.closed:
+                    self._connector = aiohttp.TCPConnector(
+                        limit=self.connection_limit, keepalive_timeout=self.keepalive_timeout
+                    )
+                    if not self.asynchronous:
+                        weakref.finalize(self, self.close_connector, self.loop, self._connector)
+                client_kwargs["connector"] = self._connector
+                client_kwargs["connector_owner"] = False
+            self._session = await self.get_client(loop=self.loop, **client_kwargs)
+            if not self.asynchronous:
+                weakref.finalize(self, self.close_session, self.loop, self._session)
+        return self._session
+
+    @staticmethod
+    def close_connector(loop, connector):
+        """Close the shared connector; mirrors :meth:`HTTPFileSystem.close_session`."""
+        if loop is not None and loop.is_running():
+            try:
+                sync(loop, connector.close, timeout=0.1)
+                return
+            except _CLOSE_ERRORS:
+                pass
+        # close after loop is dead
+        connector._close()
+
     # ------------------------------------------------------------------
     # Token refresh internals
     # ------------------------------------------------------------------
@@ -92,14 +172,22 @@ class TokenRefreshingHTTPFileSystem(HTTPFileSystem):
         """Bridge a potentially blocking token renewal into the async event loop."""
         return await asyncio.to_thread(lambda: self.token_obj.access_token)
 
-    async def _update_auth(self) -> None:
+    async def _update_auth(self, stale_auth: str | None = None) -> None:
         """Refresh the token and invalidate the current aiohttp session.
 
         Idempotent under concurrent callers: only the first coroutine to
         acquire the lock performs real work; subsequent callers see the updated
         ``self.kwargs`` and return immediately.
+
+        ``stale_auth`` is the ``Authorization`` value the failing request was
+        sent with.  If the header has already moved on by the time the lock is
+        acquired, another coroutine has refreshed and ``token_obj.access_token``
+        is not consulted again — a burst of 401s costs one token read.
         """
         async with self._refresh_lock:
+            if stale_auth is not None and self.kwargs.get("headers", {}).get("Authorization") != stale_auth:
+                return
+
             new_token = await self._refresh_token_task()
             new_auth = f"Bearer {new_token}"
 
@@ -114,7 +202,8 @@ class TokenRefreshingHTTPFileSystem(HTTPFileSystem):
             # 2. Invalidate the session.  On the next request fsspec calls
             #    await self.set_session(), rebuilding a fresh ClientSession
             #    from the updated self.kwargs.  This avoids mutating aiohttp's
-            #    read-only CIMultiDictProxy entirely.
+            #    read-only CIMultiDictProxy entirely.  The shared connector is
+            #    not owned by the session, so pooled connections survive.
             if self._session is not None:
                 await self._session.close()
                 self._session = None
@@ -126,13 +215,14 @@ class TokenRefreshingHTTPFileSystem(HTTPFileSystem):
 
         Any non-401 HTTP error or non-HTTP exception propagates immediately.
         """
+        sent_auth = self.kwargs.get("headers", {}).get("Authorization")
         try:
             return await coro_func(*args, **kwargs)
         except aiohttp.ClientResponseError as exc:
             if exc.status != 401:
                 raise
             logger.info("HTTP 401 received; refreshing Bearer token and retrying.")
-            await self._update_auth()
+            await self._update_auth(sent_auth)
             # Sync the new auth value into any per-call headers the caller
             # passed explicitly so the retry uses a consistent header set.
             if "headers" in kwargs:
@@ -143,7 +233,8 @@ class TokenRefreshingHTTPFileSystem(HTTPFileSystem):
     # Protected async entry points
     #
     # _cat_file  — byte-range reads: the hot path for lazy xarray/h5netcdf.
-    # _info      — single-object stat; called internally by _open.
+    # _info      — single-object stat; called internally by _open.  Results
+    #              are cached per URL for info_cache_ttl seconds.
     # _ls_real   — directory listing.
     # _exists    — existence check.
     #
@@ -159,7 +250,17 @@ class TokenRefreshingHTTPFileSystem(HTTPFileSystem):
         return await self._run_with_refresh(super()._cat_file, url, start, end, **kwargs)
 
     async def _info(self, url, **kwargs):
-        return await self._run_with_refresh(super()._info, url, **kwargs)
+        # Only plain lookups are cached: per-call kwargs can change the request.
+        cacheable = self.info_cache_ttl > 0 and not kwargs
+        if cacheable:
+            cached = self._info_cache.get(url)
+            if cached is not None and time.monotonic() < cached[0]:
+                return dict(cached[1])
+
+        info = await self._run_with_refresh(super()._info, url, **kwargs)
+        if cacheable and info.get("size") is not None:
+            self._info_cache[url] = (time.monotonic() + self.info_cache_ttl, dict(info))
+        return info
 
     async def _ls_real(self, url, detail=True, **kwargs):
         return await self._run_with_refresh(super()._ls_real, url, detail, **kwargs)
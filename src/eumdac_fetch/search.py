@@ -5,7 +5,7 @@ from __future__ import annotations
 import itertools
 import logging
 import time
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 
 import eumdac
 import requests.exceptions
@@ -242,12 +242,12 @@ class SearchService:
 
         # First half
         # noinspection SpellCheckingInspection
-        first_filters = SearchFilters(**{**filters.__dict__, "dtend": midpoint})
+        first_filters = replace(filters, dtend=midpoint)
         first_count = self.count(collection_id, first_filters)
 
         # Second half
         # noinspection SpellCheckingInspection
-        second_filters = SearchFilters(**{**filters.__dict__, "dtstart": midpoint})
+        second_filters = replace(filters, dtstart=midpoint)
         second_count = self.count(collection_id, second_filters)
 
         products = []
@@ -2,13 +2,55 @@
 
 from __future__ import annotations
 
+import asyncio
+import dataclasses
+import functools
 import sqlite3
 import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import UTC, datetime
 from pathlib import Path
 
 from eumdac_fetch.models import ProductRecord, ProductStatus
 
+# Stay well under SQLITE_MAX_VARIABLE_NUMBER on older SQLite builds (999)
+_MAX_IN_PARAMS = 900
+
+# Product columns listed in ProductRecord field order, so a row unpacks
+# positionally into the dataclass
+_SELECT_PRODUCTS = f"SELECT {', '.join(f.name for f in dataclasses.fields(ProductRecord))} FROM products"
+
+# Per-connection tuning. In WAL mode synchronous=NORMAL never corrupts the
+# database; at worst the last commits roll back after a power loss.
+_CONNECTION_PRAGMAS = """
+    PRAGMA synchronous=NORMAL;
+    PRAGMA busy_timeout=5000;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-20000;
+"""
+
+# (whole second, ISO string) of the last timestamp handed out by _utc_now_iso
+_last_stamp: tuple[int, str] = (-1, "")
+
+
+def _utc_now_iso() -> str:
+    """Return the current UTC time as an ISO 8601 string at one-second resolution.
+
+    Status updates stamp every row they touch, so the formatted string is
+    reused for all calls within the same second instead of building a new
+    datetime each time.
+    """
+    global _last_stamp
+    second = time.time_ns() // 1_000_000_000
+    cached_second, stamp = _last_stamp
+    if second != cached_second:
+        stamp = datetime.fromtimestamp(second, UTC).isoformat()
+        _last_stamp = (second, stamp)
+    return stamp
+
 
 class StateDB:
     """Thread-safe SQLite state tracker for product processing status."""
@@ -16,103 +58,164 @@ class StateDB:
     def __init__(self, db_path: str | Path):
         self.db_path = str(db_path)
         self._local = threading.local()
+        # Serializes writers in-process so they queue on a lock rather than
+        # polling SQLite's busy handler; reads never take it (WAL snapshots)
+        self._write_lock = threading.Lock()
+        # One dedicated thread for async writes, so they reuse a single
+        # connection and don't queue behind downloads in the default executor
+        self._writer: ThreadPoolExecutor | None = None
         self._init_db()
 
     @property
     def _conn(self) -> sqlite3.Connection:
         """Get a thread-local connection."""
         if not hasattr(self._local, "conn") or self._local.conn is None:
-            self._local.conn = sqlite3.connect(self.db_path)
-            self._local.conn.row_factory = sqlite3.Row
-            self._local.conn.execute("PRAGMA journal_mode=WAL")
+            # IMMEDIATE takes the write lock when a write transaction begins, so
+            # concurrent writers wait on busy_timeout instead of failing to upgrade
+            conn = sqlite3.connect(self.db_path, isolation_level="IMMEDIATE")
+            conn.row_factory = sqlite3.Row
+            if self.db_path != ":memory:":
+                conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_CONNECTION_PRAGMAS)
+            self._local.conn = conn
         return self._local.conn
 
+    @contextmanager
+    def _writing(self) -> Iterator[sqlite3.Connection]:
+        """Hold the writer lock for one write transaction and commit it on exit.
+
+        If the block raises, the transaction is rolled back so the connection
+        releases SQLite's write lock and no partial batch is committed later.
+        """
+        with self._write_lock:
+            conn = self._conn
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
     def _init_db(self) -> None:
         """Create the products and search_results tables if they don't exist."""
-        # noinspection SqlNoDataSourceInspection,SqlDialectInspection
-        self._conn.execute("""
-            CREATE TABLE IF NOT EXISTS products (
-                product_id TEXT NOT NULL,
-                job_name TEXT NOT NULL,
-                collection TEXT NOT NULL DEFAULT '',
-                size_kb REAL NOT NULL DEFAULT 0,
-                md5 TEXT NOT NULL DEFAULT '',
-                bytes_downloaded INTEGER NOT NULL DEFAULT 0,
-                status TEXT NOT NULL DEFAULT 'pending',
-                download_path TEXT NOT NULL DEFAULT '',
-                error_message TEXT NOT NULL DEFAULT '',
-                created_at TEXT NOT NULL DEFAULT '',
-                updated_at TEXT NOT NULL DEFAULT '',
-                PRIMARY KEY (product_id, job_name)
-            )
-        """)
-        # noinspection SqlNoDataSourceInspection,SqlDialectInspection
-        self._conn.execute("""
-            CREATE TABLE IF NOT EXISTS search_results (
-                product_id TEXT PRIMARY KEY,
-                collection TEXT NOT NULL DEFAULT '',
-                size_kb REAL NOT NULL DEFAULT 0,
-                sensing_start TEXT NOT NULL DEFAULT '',
-                sensing_end TEXT NOT NULL DEFAULT '',
-                cached_at TEXT NOT NULL DEFAULT ''
-            )
-        """)
-        self._conn.commit()
+        with self._writing() as conn:
+            # noinspection SqlNoDataSourceInspection,SqlDialectInspection
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS products (
+                    product_id TEXT NOT NULL,
+                    job_name TEXT NOT NULL,
+                    collection TEXT NOT NULL DEFAULT '',
+                    size_kb REAL NOT NULL DEFAULT 0,
+                    md5 TEXT NOT NULL DEFAULT '',
+                    bytes_downloaded INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    download_path TEXT NOT NULL DEFAULT '',
+                    error_message TEXT NOT NULL DEFAULT '',
+                    created_at TEXT NOT NULL DEFAULT '',
+                    updated_at TEXT NOT NULL DEFAULT '',
+                    PRIMARY KEY (product_id, job_name)
+                )
+            """)
+            # The primary key leads with product_id, so per-job queries need their own index
+            # noinspection SqlNoDataSourceInspection,SqlDialectInspection
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_products_job_status ON products (job_name, status)")
+            # noinspection SqlNoDataSourceInspection,SqlDialectInspection
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS search_results (
+                    product_id TEXT PRIMARY KEY,
+                    collection TEXT NOT NULL DEFAULT '',
+                    size_kb REAL NOT NULL DEFAULT 0,
+                    sensing_start TEXT NOT NULL DEFAULT '',
+                    sensing_end TEXT NOT NULL DEFAULT '',
+                    cached_at TEXT NOT NULL DEFAULT ''
+                )
+            """)
 
     def get(self, product_id: str, job_name: str) -> ProductRecord | None:
         """Get a product record by ID and job name."""
         # noinspection SqlNoDataSourceInspection,SqlDialectInspection
         row = self._conn.execute(
-            "SELECT * FROM products WHERE product_id = ? AND job_name = ?",
+            f"{_SELECT_PRODUCTS} WHERE product_id = ? AND job_name = ?",
             (product_id, job_name),
         ).fetchone()
         if row is None:
             return None
         return self._row_to_record(row)
 
+    def get_many(self, product_ids: Iterable[str], job_name: str) -> dict[str, ProductRecord]:
+        """Get the records for several product IDs of a job, keyed by product ID.
+
+        IDs without a record are absent from the result. Lookups are issued in
+        batches of ``IN (...)`` queries rather than one query per ID.
+        """
+        ids = list(dict.fromkeys(product_ids))
+        records: dict[str, ProductRecord] = {}
+        for start in range(0, len(ids), _MAX_IN_PARAMS):
+            batch = ids[start : start + _MAX_IN_PARAMS]
+            placeholders = ", ".join("?" * len(batch))
+            # noinspection SqlNoDataSourceInspection,SqlDialectInspection
+            rows = self._conn.execute(
+                f"{_SELECT_PRODUCTS} WHERE job_name = ? AND product_id IN ({placeholders})",
+                (job_name, *batch),
+            ).fetchall()
+            for row in rows:
+                records[row["product_id"]] = self._row_to_record(row)
+        return records
+
     def upsert(self, record: ProductRecord) -> None:
         """Insert or update a product record."""
-        now = datetime.now(UTC).isoformat()
-        if not record.created_at:
-            record.created_at = now
-        record.updated_at = now
+        self.upsert_many([record])
 
-        # noinspection SqlNoDataSourceInspection,SqlDialectInspection
-        self._conn.execute(
-            """
-            INSERT INTO products (
-                product_id, job_name, collection, size_kb, md5,
-                bytes_downloaded, status, download_path,
-                error_message, created_at, updated_at
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(product_id, job_name) DO UPDATE SET
-                size_kb = excluded.size_kb,
-                md5 = excluded.md5,
-                bytes_downloaded = excluded.bytes_downloaded,
-                status = excluded.status,
-                download_path = excluded.download_path,
-                error_message = excluded.error_message,
-                updated_at = excluded.updated_at
-            """,
-            (
-                record.product_id,
-                record.job_name,
-                record.collection,
-                record.size_kb,
-                record.md5,
-                record.bytes_downloaded,
-                record.status.value,
-                record.download_path,
-                record.error_message,
-                record.created_at,
-                record.updated_at,
-            ),
-        )
-        self._conn.commit()
+    def upsert_many(self, records: Iterable[ProductRecord]) -> None:
+        """Insert or update several product records in a single transaction."""
+        now = _utc_now_iso()
+        rows = []
+        for record in records:
+            if not record.created_at:
+                record.created_at = now
+            record.updated_at = now
+            rows.append(
+                (
+                    record.product_id,
+                    record.job_name,
+                    record.collection,
+                    record.size_kb,
+                    record.md5,
+                    record.bytes_downloaded,
+                    record.status.value,
+                    record.download_path,
+                    record.error_message,
+                    record.created_at,
+                    record.updated_at,
+                )
+            )
+        if not rows:
+            return
+
+        with self._writing() as conn:
+            # noinspection SqlNoDataSourceInspection,SqlDialectInspection
+            conn.executemany(
+                """
+                INSERT INTO products (
+                    product_id, job_name, collection, size_kb, md5,
+                    bytes_downloaded, status, download_path,
+                    error_message, created_at, updated_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(product_id, job_name) DO UPDATE SET
+                    size_kb = excluded.size_kb,
+                    md5 = excluded.md5,
+                    bytes_downloaded = excluded.bytes_downloaded,
+                    status = excluded.status,
+                    download_path = excluded.download_path,
+                    error_message = excluded.error_message,
+                    updated_at = excluded.updated_at
+                """,
+                rows,
+            )
 
     def update_status(self, product_id: str, job_name: str, status: ProductStatus, **kwargs: object) -> None:
         """Update status and optional fields for a product."""
-        now = datetime.now(UTC).isoformat()
+        now = _utc_now_iso()
         sets = ["status = ?", "updated_at = ?"]
         params: list = [status.value, now]
 
@@ -121,18 +224,59 @@ class StateDB:
             params.append(value)
 
         params.extend([product_id, job_name])
-        # noinspection SqlNoDataSourceInspection,SqlDialectInspection
-        self._conn.execute(
-            f"UPDATE products SET {', '.join(sets)} WHERE product_id = ? AND job_name = ?",
-            params,
-        )
-        self._conn.commit()
+        with self._writing() as conn:
+            # noinspection SqlNoDataSourceInspection,SqlDialectInspection
+            conn.execute(
+                f"UPDATE products SET {', '.join(sets)} WHERE product_id = ? AND job_name = ?",
+                params,
+            )
+
+    def update_status_many(self, updates: Iterable[tuple[str, str, ProductStatus, str | None]]) -> None:
+        """Apply several status updates in a single transaction.
+
+        Each update is ``(product_id, job_name, status, error_message)``; an
+        ``error_message`` of None leaves the stored message unchanged. Updates
+        are applied in order, so a later update of the same product wins.
+        """
+        now = _utc_now_iso()
+        rows = [
+            (status.value, error_message, now, product_id, job_name)
+            for product_id, job_name, status, error_message in updates
+        ]
+        if not rows:
+            return
+
+        with self._writing() as conn:
+            # noinspection SqlNoDataSourceInspection,SqlDialectInspection
+            conn.executemany(
+                """
+                UPDATE products SET status = ?, error_message = COALESCE(?, error_message), updated_at = ?
+                WHERE product_id = ? AND job_name = ?
+                """,
+                rows,
+            )
+
+    async def aupdate_status(self, product_id: str, job_name: str, status: ProductStatus, **kwargs: object) -> None:
+        """Async :meth:`update_status` that keeps the commit off the event loop."""
+        await self._off_loop(self.update_status, product_id, job_name, status, **kwargs)
+
+    async def _off_loop(self, fn: Callable[..., object], /, *args: object, **kwargs: object) -> object:
+        """Run a blocking call on the writer thread, on that thread's own connection.
+
+        An in-memory database lives inside a single connection, and connections
+        are per thread, so calls against ``:memory:`` stay on the calling thread.
+        """
+        if self.db_path == ":memory:":
+            return fn(*args, **kwargs)
+        if self._writer is None:
+            self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="statedb-writer")
+        return await asyncio.get_running_loop().run_in_executor(self._writer, functools.partial(fn, *args, **kwargs))
 
     def get_by_status(self, job_name: str, status: ProductStatus) -> list[ProductRecord]:
         """Get all products with a given status for a job."""
         # noinspection SqlNoDataSourceInspection,SqlDialectInspection
         rows = self._conn.execute(
-            "SELECT * FROM products WHERE job_name = ? AND status = ?",
+            f"{_SELECT_PRODUCTS} WHERE job_name = ? AND status = ?",
             (job_name, status.value),
         ).fetchall()
         return [self._row_to_record(row) for row in rows]
@@ -141,7 +285,7 @@ class StateDB:
         """Get all product records for a job."""
         # noinspection SqlNoDataSourceInspection,SqlDialectInspection
         rows = self._conn.execute(
-            "SELECT * FROM products WHERE job_name = ?",
+            f"{_SELECT_PRODUCTS} WHERE job_name = ?",
             (job_name,),
         ).fetchall()
         return [self._row_to_record(row) for row in rows]
@@ -154,7 +298,7 @@ class StateDB:
         """
         # noinspection SqlNoDataSourceInspection,SqlDialectInspection
         rows = self._conn.execute(
-            "SELECT * FROM products WHERE job_name = ? AND status IN (?, ?, ?)",
+            f"{_SELECT_PRODUCTS} WHERE job_name = ? AND status IN (?, ?, ?)",
             (job_name, ProductStatus.PENDING.value, ProductStatus.DOWNLOADING.value, ProductStatus.FAILED.value),
         ).fetchall()
         return [self._row_to_record(row) for row in rows]
@@ -164,35 +308,25 @@ class StateDB:
 
         Returns the number of products reset.
         """
-        now = datetime.now(UTC).isoformat()
-        # noinspection SqlNoDataSourceInspection,SqlDialectInspection
-        cursor = self._conn.execute(
-            "UPDATE products SET status = ?, updated_at = ? WHERE job_name = ? AND status = ?",
-            (ProductStatus.PENDING.value, now, job_name, ProductStatus.DOWNLOADING.value),
-        )
-        self._conn.commit()
+        now = _utc_now_iso()
+        with self._writing() as conn:
+            # noinspection SqlNoDataSourceInspection,SqlDialectInspection
+            cursor = conn.execute(
+                "UPDATE products SET status = ?, updated_at = ? WHERE job_name = ? AND status = ?",
+                (ProductStatus.PENDING.value, now, job_name, ProductStatus.DOWNLOADING.value),
+            )
         return cursor.rowcount
 
     @staticmethod
     def _row_to_record(row: sqlite3.Row) -> ProductRecord:
-        """Convert a database row to a ProductRecord."""
-        return ProductRecord(
-            product_id=row["product_id"],
-            job_name=row["job_name"],
-            collection=row["collection"],
-            size_kb=row["size_kb"],
-            md5=row["md5"],
-            bytes_downloaded=row["bytes_downloaded"],
-            status=ProductStatus(row["status"]),
-            download_path=row["download_path"],
-            error_message=row["error_message"],
-            created_at=row["created_at"],
-            updated_at=row["updated_at"],
-        )
+        """Convert a row selected with ``_SELECT_PRODUCTS`` to a ProductRecord."""
+        record = ProductRecord(*row)
+        record.status = ProductStatus(record.status)
+        return record
 
     def cache_search_results(self, products: list, collection: str) -> None:
         """Bulk insert product metadata from eumdac product objects into search_results cache."""
-        now = datetime.now(UTC).isoformat()
+        now = _utc_now_iso()
         rows = []
         for product in products:
             product_id = str(product)
@@ -200,15 +334,15 @@ class StateDB:
             sensing_start = str(getattr(product, "sensing_start", ""))
             sensing_end = str(getattr(product, "sensing_end", ""))
             rows.append((product_id, collection, size_kb, sensing_start, sensing_end, now))
-        self._conn.executemany(
-            """
-            INSERT OR REPLACE INTO search_results
-                (product_id, collection, size_kb, sensing_start, sensing_end, cached_at)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """,
-            rows,
-        )
-        self._conn.commit()
+        with self._writing() as conn:
+            conn.executemany(
+                """
+                INSERT OR REPLACE INTO search_results
+                    (product_id, collection, size_kb, sensing_start, sensing_end, cached_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
 
     def get_cached_search_results(self) -> list[dict]:
         """Return all cached search result metadata."""
@@ -218,11 +352,20 @@ class StateDB:
 
     def has_cached_search(self) -> bool:
         """Check if the search_results cache has any rows."""
+        # EXISTS stops at the first row instead of counting the whole table
         # noinspection SqlNoDataSourceInspection,SqlDialectInspection
-        row = self._conn.execute("SELECT COUNT(*) AS cnt FROM search_results").fetchone()
-        return row["cnt"] > 0
+        row = self._conn.execute("SELECT EXISTS (SELECT 1 FROM search_results) AS cached").fetchone()
+        return bool(row["cached"])
 
     def close(self) -> None:
+        """Close the calling thread's connection and stop the writer thread, closing its connection."""
+        writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.submit(self._close_local).result()
+            writer.shutdown()
+        self._close_local()
+
+    def _close_local(self) -> None:
         """Close the thread-local connection."""
         if hasattr(self._local, "conn") and self._local.conn:
             self._local.conn.close()
@@ -0,0 +1,30 @@
+"""Test doubles shared by several test modules."""
+
+from __future__ import annotations
+
+from fsspec.implementations.http import HTTPFileSystem
+
+from eumdac_fetch.remote import TokenRefreshingHTTPFileSystem
+
+
+class _NoInitHTTPFileSystem(HTTPFileSystem):
+    """HTTPFileSystem whose __init__ only records kwargs — no loop, no session."""
+
+    def __init__(self, *args, **kwargs):
+        self.kwargs = kwargs  # HTTPFileSystem stores kwargs verbatim
+
+
+class StubbedHTTPFS(TokenRefreshingHTTPFileSystem, _NoInitHTTPFileSystem):
+    """TokenRefreshingHTTPFileSystem for unit tests, without patching fsspec.
+
+    The MRO places :class:`_NoInitHTTPFileSystem` between our class and
+    ``HTTPFileSystem``, so our ``__init__`` runs unchanged while its
+    ``super().__init__`` call lands on the no-op stub.  Instances are never
+    served from fsspec's instance cache.
+    """
+
+    cachable = False
+
+    def __init__(self, token_obj, *args, **kwargs):
+        super().__init__(token_obj, *args, **kwargs)
+        self._session = None
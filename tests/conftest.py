@@ -1,12 +1,26 @@
-"""Shared test fixtures."""
+"""Shared test fixtures.
+
+The unit suite is safe to run in parallel with ``pytest -n auto``: file
+fixtures live under ``tmp_path`` (per-worker under xdist) and shared
+StateDB fixtures are in-memory, so each worker process gets its own.
+"""
 
 from __future__ import annotations
 
+import asyncio
+import importlib
 import textwrap
 from unittest import mock
 
 import pytest
 
+from eumdac_fetch.models import DownloadConfig, JobConfig, PostProcessConfig, SearchFilters
+
+try:
+    import uvloop
+except ImportError:  # optional; not available on Windows
+    uvloop = None
+
 
 def pytest_addoption(parser):
     parser.addoption("--run-integration", action="store_true", default=False, help="Run integration tests")
@@ -21,6 +35,40 @@ def pytest_collection_modifyitems(config, items):
             item.add_marker(skip_integration)
 
 
+# Modules the CLI imports lazily inside its commands; loaded once up front so the
+# first test through each command is not billed for the import.
+_WARM_IMPORTS = ("eumdac", "requests", "urllib3", "eumdac_fetch.downloader", "eumdac_fetch.search")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_imports():
+    for name in _WARM_IMPORTS:
+        importlib.import_module(name)
+
+
+@pytest.fixture
+def make_job(tmp_path):
+    """Factory for a minimal JobConfig downloading under ``tmp_path``.
+
+    Every call builds fresh filter, download and post-process configs, so a
+    test mutating its job never affects another; keyword arguments replace
+    any JobConfig field.
+    """
+
+    def _make(**overrides) -> JobConfig:
+        fields = {
+            "name": "test-job",
+            "collection": "COL1",
+            "filters": SearchFilters(),
+            "download": DownloadConfig(directory=tmp_path / "downloads", parallel=1),
+            "post_process": PostProcessConfig(enabled=False),
+        }
+        fields.update(overrides)
+        return JobConfig(**fields)
+
+    return _make
+
+
 @pytest.fixture
 def tmp_config_dir(tmp_path):
     """Provide a temporary directory for config files."""
@@ -107,3 +155,17 @@ def mock_product():
     product.size = 50000  # KB
     product.md5 = "abc123def456"
     return product
+
+
+@pytest.fixture(scope="module")
+def loop():
+    """One event loop shared by every test in a module; uvloop's when installed."""
+    event_loop = uvloop.new_event_loop() if uvloop is not None else asyncio.new_event_loop()
+    yield event_loop
+    event_loop.close()
+
+
+@pytest.fixture
+def run(loop):
+    """Drive a coroutine to completion on the shared module loop."""
+    return loop.run_until_complete
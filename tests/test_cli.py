@@ -2,13 +2,91 @@
 
 from __future__ import annotations
 
-from unittest import mock
+import logging
+from types import SimpleNamespace
 
 import pytest
 from click.testing import CliRunner
 
 from eumdac_fetch.cli import cli
 
+# ---------------------------------------------------------------------------
+# Lightweight stubs
+#
+# The CLI only reads fixed values from its collaborators, so plain attribute
+# bags are enough — no MagicMock child allocation or call bookkeeping.
+# ---------------------------------------------------------------------------
+
+
+def _returns(value: object):
+    def _fn(*args, **kwargs):
+        return value
+
+    return _fn
+
+
+def _raise(exc: BaseException):
+    def _fn(*args, **kwargs):
+        raise exc
+
+    return _fn
+
+
+def _main(args: list[str]) -> int:
+    """Run the CLI parser in-process without CliRunner's stdio isolation; returns the exit code."""
+    try:
+        rv = cli.main(args, prog_name="eumdac-fetch", standalone_mode=False)
+    except SystemExit as e:
+        return e.code
+    return rv or 0
+
+
+def _session(*, is_new: bool = True, is_live: bool = False) -> SimpleNamespace:
+    return SimpleNamespace(
+        session_id="abc123def456",
+        session_dir="sessions/abc123def456",
+        download_dir="downloads/COL1",
+        state_db_path="sessions/abc123def456/state.db",
+        log_path="sessions/abc123def456/session.log",
+        is_new=is_new,
+        is_live=is_live,
+        initialize=lambda: None,
+    )
+
+
+class _Product:
+    def __init__(self, product_id: str):
+        self.product_id = product_id
+
+    def __str__(self) -> str:
+        return self.product_id
+
+
+class _StateDBStub:
+    """Records the calls the ``download`` command makes against the state DB."""
+
+    def __init__(self, *, cached: bool = False, resumable: list | None = None, reset_count: int = 0):
+        self.cached = cached
+        self.resumable = resumable or []
+        self.reset_count = reset_count
+        self.reset_calls: list[str] = []
+
+    def reset_stale_downloads(self, job_name: str) -> int:
+        self.reset_calls.append(job_name)
+        return self.reset_count
+
+    def has_cached_search(self) -> bool:
+        return self.cached
+
+    def get_resumable(self, job_name: str) -> list:
+        return self.resumable
+
+    def cache_search_results(self, products: list, collection: str) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
 
 @pytest.fixture
 def runner():
@@ -34,40 +112,89 @@ jobs:
     return str(config)
 
 
+@pytest.fixture
+def stub(monkeypatch):
+    """Replace a class/factory at *target* with one that always returns *obj*."""
+
+    def _stub(target: str, obj: object) -> None:
+        monkeypatch.setattr(target, _returns(obj))
+
+    return _stub
+
+
+@pytest.fixture
+def download_env(monkeypatch, stub):
+    """Stub every collaborator of the ``download`` command.
+
+    Returns a function ``(session, state_db, products) -> download_calls``; each
+    ``download_all`` invocation appends its positional args to ``download_calls``.
+    """
+
+    def _setup(session: SimpleNamespace, state_db: _StateDBStub, products: list) -> list:
+        download_calls: list[tuple] = []
+
+        async def download_all(*args):
+            download_calls.append(args)
+
+        def download_service(**kwargs):
+            return SimpleNamespace(download_all=download_all)
+
+        monkeypatch.setattr("eumdac_fetch.auth.get_token", lambda: object())
+        stub("eumdac_fetch.search.SearchService", SimpleNamespace(iter_products=_returns(products)))
+        stub("eumdac_fetch.session.Session", session)
+        stub("eumdac_fetch.state.StateDB", state_db)
+        stub("eumdac_fetch.logging_config.add_session_log_handler", logging.NullHandler())
+        monkeypatch.setattr("eumdac_fetch.downloader.DownloadService", download_service)
+        return download_calls
+
+    return _setup
+
+
+def _stub_pipeline(monkeypatch, *, error: Exception | None = None) -> list[dict]:
+    """Replace Pipeline with a stub; returns the constructor kwargs of every run() call."""
+    runs: list[dict] = []
+
+    def factory(**kwargs):
+        async def run():
+            if error is not None:
+                raise error
+            runs.append(kwargs)
+
+        return SimpleNamespace(run=run)
+
+    monkeypatch.setattr("eumdac_fetch.auth.get_token", lambda: object())
+    monkeypatch.setattr("eumdac_fetch.pipeline.Pipeline", factory)
+    return runs
+
+
 class TestInfoCommand:
-    @mock.patch("eumdac.AccessToken")
-    @mock.patch("eumdac_fetch.search.SearchService")
-    def test_info_success(self, mock_search_cls, mock_access_token_cls, runner):
+    def test_info_success(self, runner, monkeypatch, stub):
         from eumdac_fetch.search import CollectionInfo
 
-        mock_service = mock.MagicMock()
-        mock_search_cls.return_value = mock_service
-        mock_service.get_collection_info.return_value = CollectionInfo(
+        info = CollectionInfo(
             collection_id="EO:EUM:DAT:TEST",
             title="Test Collection",
             abstract="A test collection",
             search_options={},
         )
+        monkeypatch.setattr("eumdac.AccessToken", _returns(object()))
+        stub("eumdac_fetch.search.SearchService", SimpleNamespace(get_collection_info=_returns(info)))
 
         result = runner.invoke(cli, ["info", "EO:EUM:DAT:TEST", "--key", "k", "--secret", "s"])
 
         assert result.exit_code == 0
         assert "Test Collection" in result.output
 
-    def test_info_missing_credentials(self, runner):
-        result = runner.invoke(cli, ["info", "EO:EUM:DAT:TEST"])
+    def test_info_missing_credentials(self, monkeypatch, capsys):
+        monkeypatch.delenv("EUMDAC_KEY", raising=False)
+        monkeypatch.delenv("EUMDAC_SECRET", raising=False)
 
-        assert result.exit_code == 1
-        assert (
-            "credentials required" in result.output.lower() or "credentials required" in (result.stderr or "").lower()
-        )
+        assert _main(["info", "EO:EUM:DAT:TEST"]) == 1
+        assert "credentials required" in capsys.readouterr().err.lower()
 
-    @mock.patch("eumdac.AccessToken")
-    @mock.patch("eumdac_fetch.search.SearchService")
-    def test_info_api_error(self, mock_search_cls, mock_access_token_cls, runner):
-        mock_service = mock.MagicMock()
-        mock_search_cls.return_value = mock_service
-        mock_service.get_collection_info.side_effect = Exception("API error")
+    def test_info_api_error(self, runner, monkeypatch, stub):
+        monkeypatch.setattr("eumdac.AccessToken", _returns(object()))
+        stub("eumdac_fetch.search.SearchService", SimpleNamespace(get_collection_info=_raise(Exception("API error"))))
 
         result = runner.invoke(cli, ["info", "EO:EUM:DAT:TEST", "--key", "k", "--secret", "s"])
 
@@ -76,30 +203,21 @@ class TestInfoCommand:
 
 
 class TestSearchCommand:
-    @mock.patch("eumdac_fetch.auth.get_token")
-    @mock.patch("eumdac_fetch.search.SearchService")
-    def test_search_success(self, mock_search_cls, mock_create_token, runner, tmp_config):
+    def test_search_success(self, runner, tmp_config, monkeypatch, stub):
         from eumdac_fetch.search import SearchResult
 
-        mock_service = mock.MagicMock()
-        mock_search_cls.return_value = mock_service
-        mock_service.search.return_value = SearchResult(
-            total=10,
-            products=[],
-            filters_used={"dtstart": "2024-01-01"},
-        )
+        search_result = SearchResult(total=10, products=[], filters_used={"dtstart": "2024-01-01"})
+        monkeypatch.setattr("eumdac_fetch.auth.get_token", lambda: object())
+        stub("eumdac_fetch.search.SearchService", SimpleNamespace(search=_returns(search_result)))
 
         result = runner.invoke(cli, ["search", "-c", tmp_config])
 
         assert result.exit_code == 0
         assert "test-job" in result.output
 
-    @mock.patch("eumdac_fetch.auth.get_token")
-    @mock.patch("eumdac_fetch.search.SearchService")
-    def test_search_count_only(self, mock_search_cls, mock_create_token, runner, tmp_config):
-        mock_service = mock.MagicMock()
-        mock_search_cls.return_value = mock_service
-        mock_service.count.return_value = 42
+    def test_search_count_only(self, runner, tmp_config, monkeypatch, stub):
+        monkeypatch.setattr("eumdac_fetch.auth.get_token", lambda: object())
+        stub("eumdac_fetch.search.SearchService", SimpleNamespace(count=_returns(42)))
 
         result = runner.invoke(cli, ["search", "-c", tmp_config, "--count-only"])
 
@@ -121,54 +239,16 @@ class TestSearchCommand:
 
 
 class TestDownloadCommand:
-    @mock.patch("eumdac_fetch.auth.get_token")
-    @mock.patch("eumdac_fetch.search.SearchService")
-    @mock.patch("eumdac_fetch.session.Session")
-    @mock.patch("eumdac_fetch.state.StateDB")
-    @mock.patch("eumdac_fetch.downloader.DownloadService")
-    @mock.patch("eumdac_fetch.logging_config.add_session_log_handler")
-    def test_download_success(
-        self,
-        mock_log_handler,
-        mock_dl_cls,
-        mock_statedb_cls,
-        mock_session_cls,
-        mock_search_cls,
-        mock_create_token,
-        runner,
-        tmp_config,
-    ):
-        mock_service = mock.MagicMock()
-        mock_search_cls.return_value = mock_service
-        mock_service.iter_products.return_value = [mock.MagicMock()]
-
-        mock_session = mock.MagicMock()
-        mock_session.is_new = True
-        mock_session.is_live = False
-        mock_session_cls.return_value = mock_session
-
-        mock_state_db = mock.MagicMock()
-        mock_state_db.has_cached_search.return_value = False
-        mock_statedb_cls.return_value = mock_state_db
-
-        mock_dl = mock.MagicMock()
-        mock_dl_cls.return_value = mock_dl
-        mock_dl.download_all = mock.AsyncMock()
+    def test_download_success(self, runner, tmp_config, download_env):
+        download_calls = download_env(_session(), _StateDBStub(), [_Product("P1")])
 
         result = runner.invoke(cli, ["download", "-c", tmp_config])
 
         assert result.exit_code == 0
-        mock_dl.download_all.assert_called_once()
-
-    @mock.patch("eumdac_fetch.auth.get_token")
-    @mock.patch("eumdac_fetch.search.SearchService")
-    @mock.patch("eumdac_fetch.session.Session")
-    @mock.patch("eumdac_fetch.state.StateDB")
-    @mock.patch("eumdac_fetch.downloader.DownloadService")
-    def test_download_keyboard_interrupt(
-        self, mock_dl_cls, mock_statedb_cls, mock_session_cls, mock_search_cls, mock_create_token, runner, tmp_config
-    ):
-        mock_create_token.side_effect = KeyboardInterrupt()
+        assert len(download_calls) == 1
+
+    def test_download_keyboard_interrupt(self, runner, tmp_config, monkeypatch):
+        monkeypatch.setattr("eumdac_fetch.auth.get_token", _raise(KeyboardInterrupt()))
 
         result = runner.invoke(cli, ["download", "-c", tmp_config])
 
@@ -176,38 +256,32 @@ class TestDownloadCommand:
 
 
 class TestRunCommand:
-    @mock.patch("eumdac_fetch.auth.get_token")
-    @mock.patch("eumdac_fetch.pipeline.Pipeline")
-    def test_run_success(self, mock_pipeline_cls, mock_create_token, runner, tmp_config):
-        mock_pipeline = mock.MagicMock()
-        mock_pipeline_cls.return_value = mock_pipeline
-        mock_pipeline.run = mock.AsyncMock()
+    def test_run_success(self, runner, tmp_config, monkeypatch):
+        runs = _stub_pipeline(monkeypatch)
 
         result = runner.invoke(cli, ["run", "-c", tmp_config])
 
         assert result.exit_code == 0
-        mock_pipeline.run.assert_called_once()
+        assert len(runs) == 1
 
-    @mock.patch("eumdac_fetch.auth.get_token")
-    @mock.patch("eumdac_fetch.pipeline.Pipeline")
-    def test_run_keyboard_interrupt(self, mock_pipeline_cls, mock_create_token, runner, tmp_config):
-        mock_create_token.side_effect = KeyboardInterrupt()
+    def test_run_keyboard_interrupt(self, runner, tmp_config, monkeypatch):
+        _stub_pipeline(monkeypatch)
+        monkeypatch.setattr("eumdac_fetch.auth.get_token", _raise(KeyboardInterrupt()))
 
         result = runner.invoke(cli, ["run", "-c", tmp_config])
 
         assert result.exit_code == 130
 
-    @mock.patch("eumdac_fetch.auth.get_token")
-    def test_run_invalid_post_processor_format(self, mock_create_token, runner, tmp_config):
+    def test_run_invalid_post_processor_format(self, runner, tmp_config, monkeypatch):
         """--post-processor without ':' should fail."""
+        monkeypatch.setattr("eumdac_fetch.auth.get_token", lambda: object())
+
         result = runner.invoke(cli, ["run", "-c", tmp_config, "--post-processor", "no_colon_here"])
 
         assert result.exit_code == 1
         assert "module:function" in result.output
 
-    @mock.patch("eumdac_fetch.auth.get_token")
-    @mock.patch("eumdac_fetch.pipeline.Pipeline")
-    def test_run_with_post_processor(self, mock_pipeline_cls, mock_create_token, runner, tmp_config, tmp_path):
+    def test_run_with_post_processor(self, runner, tmp_config, tmp_path, monkeypatch):
         # Create a module with a callable
         mod_file = tmp_path / "myprocessor.py"
         mod_file.write_text("def process(path, pid): pass\n")
@@ -216,206 +290,60 @@ class TestRunCommand:
 
         sys.path.insert(0, str(tmp_path))
         try:
-            mock_pipeline = mock.MagicMock()
-            mock_pipeline_cls.return_value = mock_pipeline
-            mock_pipeline.run = mock.AsyncMock()
+            runs = _stub_pipeline(monkeypatch)
 
             result = runner.invoke(cli, ["run", "-c", tmp_config, "--post-processor", "myprocessor:process"])
 
             assert result.exit_code == 0
             # Verify pipeline was created with the post_processor
-            call_kwargs = mock_pipeline_cls.call_args
-            assert call_kwargs.kwargs.get("post_processor") is not None or (
-                len(call_kwargs.args) > 2 and call_kwargs.args[2] is not None
-            )
+            assert runs[0]["post_processor"] is not None
         finally:
             sys.path.pop(0)
             sys.modules.pop("myprocessor", None)
 
-    @mock.patch("eumdac_fetch.auth.get_token")
-    @mock.patch("eumdac_fetch.search.SearchService")
-    @mock.patch("eumdac_fetch.session.Session")
-    @mock.patch("eumdac_fetch.state.StateDB")
-    @mock.patch("eumdac_fetch.downloader.DownloadService")
-    @mock.patch("eumdac_fetch.logging_config.add_session_log_handler")
-    def test_download_live_session(
-        self,
-        mock_log_handler,
-        mock_dl_cls,
-        mock_statedb_cls,
-        mock_session_cls,
-        mock_search_cls,
-        mock_create_token,
-        runner,
-        tmp_config,
-    ):
+    def test_download_live_session(self, runner, tmp_config, download_env):
         """Live session prints live session message."""
-        mock_service = mock.MagicMock()
-        mock_search_cls.return_value = mock_service
-        mock_service.iter_products.return_value = [mock.MagicMock()]
-
-        mock_session = mock.MagicMock()
-        mock_session.is_new = True
-        mock_session.is_live = True
-        mock_session_cls.return_value = mock_session
-
-        mock_state_db = mock.MagicMock()
-        mock_state_db.has_cached_search.return_value = False
-        mock_statedb_cls.return_value = mock_state_db
-
-        mock_dl = mock.MagicMock()
-        mock_dl_cls.return_value = mock_dl
-        mock_dl.download_all = mock.AsyncMock()
+        download_env(_session(is_live=True), _StateDBStub(), [_Product("P1")])
 
         result = runner.invoke(cli, ["download", "-c", tmp_config])
 
         assert result.exit_code == 0
         assert "Live session" in result.output
 
-    @mock.patch("eumdac_fetch.auth.get_token")
-    @mock.patch("eumdac_fetch.search.SearchService")
-    @mock.patch("eumdac_fetch.session.Session")
-    @mock.patch("eumdac_fetch.state.StateDB")
-    @mock.patch("eumdac_fetch.downloader.DownloadService")
-    @mock.patch("eumdac_fetch.logging_config.add_session_log_handler")
-    def test_download_resumed_session_with_cache(
-        self,
-        mock_log_handler,
-        mock_dl_cls,
-        mock_statedb_cls,
-        mock_session_cls,
-        mock_search_cls,
-        mock_create_token,
-        runner,
-        tmp_config,
-    ):
+    def test_download_resumed_session_with_cache(self, runner, tmp_config, download_env):
         """Resumed non-live session uses cached search results."""
-        mock_service = mock.MagicMock()
-        mock_search_cls.return_value = mock_service
-
-        mock_session = mock.MagicMock()
-        mock_session.is_new = False
-        mock_session.is_live = False
-        mock_session_cls.return_value = mock_session
-
-        mock_state_db = mock.MagicMock()
-        mock_state_db.has_cached_search.return_value = True
-        resumable = mock.MagicMock()
-        resumable.product_id = "P1"
-        mock_state_db.get_resumable.return_value = [resumable]
-        mock_statedb_cls.return_value = mock_state_db
-
-        mock_product = mock.MagicMock()
-        mock_product.__str__ = mock.MagicMock(return_value="P1")
-        mock_service.iter_products.return_value = [mock_product]
-
-        mock_dl = mock.MagicMock()
-        mock_dl_cls.return_value = mock_dl
-        mock_dl.download_all = mock.AsyncMock()
+        state_db = _StateDBStub(cached=True, resumable=[SimpleNamespace(product_id="P1")])
+        download_env(_session(is_new=False), state_db, [_Product("P1")])
 
         result = runner.invoke(cli, ["download", "-c", tmp_config])
 
         assert result.exit_code == 0
         assert "cached" in result.output.lower() or "Using cached" in result.output
 
-    @mock.patch("eumdac_fetch.auth.get_token")
-    @mock.patch("eumdac_fetch.search.SearchService")
-    @mock.patch("eumdac_fetch.session.Session")
-    @mock.patch("eumdac_fetch.state.StateDB")
-    @mock.patch("eumdac_fetch.downloader.DownloadService")
-    @mock.patch("eumdac_fetch.logging_config.add_session_log_handler")
-    def test_download_resumed_all_done(
-        self,
-        mock_log_handler,
-        mock_dl_cls,
-        mock_statedb_cls,
-        mock_session_cls,
-        mock_search_cls,
-        mock_create_token,
-        runner,
-        tmp_config,
-    ):
+    def test_download_resumed_all_done(self, runner, tmp_config, download_env):
         """Resumed session with all products already downloaded."""
-        mock_session = mock.MagicMock()
-        mock_session.is_new = False
-        mock_session.is_live = False
-        mock_session_cls.return_value = mock_session
-
-        mock_state_db = mock.MagicMock()
-        mock_state_db.has_cached_search.return_value = True
-        mock_state_db.get_resumable.return_value = []
-        mock_statedb_cls.return_value = mock_state_db
+        download_calls = download_env(_session(is_new=False), _StateDBStub(cached=True), [])
 
         result = runner.invoke(cli, ["download", "-c", tmp_config])
 
         assert result.exit_code == 0
         assert "already downloaded" in result.output.lower()
-        mock_dl_cls.assert_not_called()
-
-    @mock.patch("eumdac_fetch.auth.get_token")
-    @mock.patch("eumdac_fetch.search.SearchService")
-    @mock.patch("eumdac_fetch.session.Session")
-    @mock.patch("eumdac_fetch.state.StateDB")
-    @mock.patch("eumdac_fetch.logging_config.add_session_log_handler")
-    def test_download_stale_reset(
-        self,
-        mock_log_handler,
-        mock_statedb_cls,
-        mock_session_cls,
-        mock_search_cls,
-        mock_create_token,
-        runner,
-        tmp_config,
-    ):
-        """Resumed session resets stale downloads."""
-        mock_service = mock.MagicMock()
-        mock_search_cls.return_value = mock_service
-        mock_service.iter_products.return_value = []
+        assert download_calls == []
 
-        mock_session = mock.MagicMock()
-        mock_session.is_new = False
-        mock_session.is_live = False
-        mock_session_cls.return_value = mock_session
-
-        mock_state_db = mock.MagicMock()
-        mock_state_db.has_cached_search.return_value = False
-        mock_state_db.reset_stale_downloads.return_value = 3
-        mock_statedb_cls.return_value = mock_state_db
+    def test_download_stale_reset(self, runner, tmp_config, download_env):
+        """Resumed session resets stale downloads."""
+        state_db = _StateDBStub(reset_count=3)
+        download_env(_session(is_new=False), state_db, [])
 
         result = runner.invoke(cli, ["download", "-c", tmp_config])
 
         assert result.exit_code == 0
         assert "Reset 3" in result.output
-        mock_state_db.reset_stale_downloads.assert_called_once()
-
-    @mock.patch("eumdac_fetch.auth.get_token")
-    @mock.patch("eumdac_fetch.search.SearchService")
-    @mock.patch("eumdac_fetch.session.Session")
-    @mock.patch("eumdac_fetch.state.StateDB")
-    @mock.patch("eumdac_fetch.logging_config.add_session_log_handler")
-    def test_download_no_products(
-        self,
-        mock_log_handler,
-        mock_statedb_cls,
-        mock_session_cls,
-        mock_search_cls,
-        mock_create_token,
-        runner,
-        tmp_config,
-    ):
-        """When search returns no products, download is skipped."""
-        mock_service = mock.MagicMock()
-        mock_search_cls.return_value = mock_service
-        mock_service.iter_products.return_value = []
-
-        mock_session = mock.MagicMock()
-        mock_session.is_new = True
-        mock_session.is_live = False
-        mock_session_cls.return_value = mock_session
+        assert state_db.reset_calls == ["test-job"]
 
-        mock_state_db = mock.MagicMock()
-        mock_state_db.has_cached_search.return_value = False
-        mock_statedb_cls.return_value = mock_state_db
+    def test_download_no_products(self, runner, tmp_config, download_env):
+        """When search returns no products, download is skipped."""
+        download_env(_session(), _StateDBStub(), [])
 
         result = runner.invoke(cli, ["download", "-c", tmp_config])
 
@@ -430,13 +358,9 @@ class TestRunCommand:
         result = runner.invoke(cli, ["download", "-c", str(bad_config)])
         assert result.exit_code == 1
 
-    @mock.patch("eumdac_fetch.auth.get_token")
-    @mock.patch("eumdac_fetch.pipeline.Pipeline")
-    def test_run_generic_error(self, mock_pipeline_cls, mock_create_token, runner, tmp_config):
+    def test_run_generic_error(self, runner, tmp_config, monkeypatch):
         """Run command catches generic exceptions."""
-        mock_pipeline = mock.MagicMock()
-        mock_pipeline_cls.return_value = mock_pipeline
-        mock_pipeline.run = mock.AsyncMock(side_effect=RuntimeError("pipeline broke"))
+        _stub_pipeline(monkeypatch, error=RuntimeError("pipeline broke"))
 
         result = runner.invoke(cli, ["run", "-c", tmp_config])
 
@@ -445,17 +369,16 @@ class TestRunCommand:
 
 
 class TestCollectionsCommand:
-    @mock.patch("eumdac.AccessToken")
-    @mock.patch("eumdac_fetch.search.SearchService")
-    def test_collections_lists_all(self, mock_search_cls, mock_access_token_cls, runner):
+    def test_collections_lists_all(self, runner, monkeypatch, stub):
         """collections command lists all available collections."""
         from eumdac_fetch.search import CollectionSummary
 
-        mock_service = mock_search_cls.return_value
-        mock_service.list_collections.return_value = [
+        summaries = [
             CollectionSummary("EO:EUM:DAT:MSG:HRSEVIRI", "High Rate SEVIRI"),
             CollectionSummary("EO:EUM:DAT:0665", "MTG FCI L1C HRFI"),
         ]
+        monkeypatch.setattr("eumdac.AccessToken", _returns(object()))
+        stub("eumdac_fetch.search.SearchService", SimpleNamespace(list_collections=lambda: summaries))
 
         result = runner.invoke(cli, ["collections", "--key", "test-key", "--secret", "test-secret"])
 
@@ -466,16 +389,18 @@ class TestCollectionsCommand:
         assert "MTG FCI L1C HRFI" in result.output
         assert "Found 2 collections" in result.output
 
-    def test_collections_requires_credentials(self, runner):
+    def test_collections_requires_credentials(self, monkeypatch, capsys):
         """collections command requires credentials."""
-        result = runner.invoke(cli, ["collections"])
-        assert result.exit_code == 1
-        assert "credentials required" in result.output.lower()
+        monkeypatch.delenv("EUMDAC_KEY", raising=False)
+        monkeypatch.delenv("EUMDAC_SECRET", raising=False)
+
+        assert _main(["collections"]) == 1
+        assert "credentials required" in capsys.readouterr().err.lower()
 
 
 class TestVersionOption:
-    def test_version(self, runner):
-        result = runner.invoke(cli, ["--version"])
+    def test_version(self, capsys):
+        assert _main(["--version"]) == 0
 
-        assert result.exit_code == 0
-        assert "eumdac-fetch" in result.output or "version" in result.output.lower()
+        out = capsys.readouterr().out
+        assert "eumdac-fetch" in out or "version" in out.lower()
@@ -11,10 +11,75 @@ import pytest
 
 from eumdac_fetch.config import (
     _interpolate_env_vars,
+    _interpolate_tree,
     _parse_datetime,
     load_config,
+    load_config_from_dict,
 )
 
+# ---------------------------------------------------------------------------
+# YAML fixtures — built once at import; templated ones are filled via format_map
+# ---------------------------------------------------------------------------
+
+_INT_FILTERS_YAML = """\
+jobs:
+  - name: int-test
+    collection: COL1
+    filters:
+      cycle: 5
+      orbit: 100
+      relorbit: 50
+      dtstart: '2024-01-01T00:00:00Z'
+      dtend: '2024-01-02T00:00:00Z'
+"""
+
+_DL_YAML = """\
+jobs:
+  - name: dl-test
+    collection: COL1
+    download:
+      directory: ./data
+      parallel: 8
+      resume: false
+      verify_md5: false
+      max_retries: 5
+      retry_backoff: 3.5
+      timeout: 600
+"""
+
+_ABS_DL_YAML = """\
+jobs:
+  - name: abs-test
+    collection: COL1
+    download:
+      directory: {directory}
+"""
+
+_PP_YAML = """\
+jobs:
+  - name: pp-test
+    collection: COL1
+    post_process:
+      enabled: true
+      output_dir: {output_dir}
+"""
+
+_NEW_FILTERS_YAML = """\
+jobs:
+  - name: test-new-filters
+    collection: EO:EUM:DAT:0665
+    filters:
+      dtstart: "2024-01-01T00:00:00Z"
+      dtend: "2024-01-02T00:00:00Z"
+      coverage: FD
+      bbox: "-180,-90,180,90"
+      title: "*HRFI*"
+      type: MTIFCI1CRRADHRFI
+      repeatCycleIdentifier: "1"
+      centerOfLongitude: "0.0"
+      set: brief
+"""
+
 
 class TestEnvVarInterpolation:
     def test_simple_var(self):
@@ -35,6 +100,33 @@ class TestEnvVarInterpolation:
     def test_no_vars(self):
         assert _interpolate_env_vars("plain-string") == "plain-string"
 
+    def test_env_cache_populated_and_reused(self):
+        cache: dict[str, str] = {}
+        with mock.patch.dict(os.environ, {"MY_VAR": "hello"}):
+            assert _interpolate_env_vars("${MY_VAR}", cache) == "hello"
+        assert cache == {"MY_VAR": "hello"}
+        with mock.patch.dict(os.environ, {}, clear=True):
+            assert _interpolate_env_vars("${MY_VAR}/x", cache) == "hello/x"
+
+
+class TestInterpolateTree:
+    def test_caller_tree_not_modified(self):
+        raw = {"logging": {"level": "${LEVEL}"}, "jobs": [{"name": "${LEVEL}-job"}]}
+        with mock.patch.dict(os.environ, {"LEVEL": "DEBUG"}):
+            result = _interpolate_tree(raw)
+        assert result == {"logging": {"level": "DEBUG"}, "jobs": [{"name": "DEBUG-job"}]}
+        assert raw == {"logging": {"level": "${LEVEL}"}, "jobs": [{"name": "${LEVEL}-job"}]}
+
+    def test_shared_nodes_expanded_once(self):
+        """An aliased node is interpolated once, even if its value expands to another ``${...}``."""
+        shared = {"directory": "${OUTER}"}
+        raw = {"a": shared, "b": shared, "c": [shared]}
+        with mock.patch.dict(os.environ, {"OUTER": "${INNER}", "INNER": "twice"}):
+            result = _interpolate_tree(raw)
+        assert result["a"] == result["b"] == result["c"][0] == {"directory": "${INNER}"}
+        assert result["a"] is result["b"]
+        assert shared == {"directory": "${OUTER}"}
+
 
 class TestParseDatetime:
     def test_utc_z_suffix(self):
@@ -107,17 +199,7 @@ class TestLoadConfig:
 
     def test_integer_filter_fields(self, tmp_path):
         f = tmp_path / "int.yaml"
-        f.write_text(
-            "jobs:\n"
-            "  - name: int-test\n"
-            "    collection: COL1\n"
-            "    filters:\n"
-            "      cycle: 5\n"
-            "      orbit: 100\n"
-            "      relorbit: 50\n"
-            "      dtstart: '2024-01-01T00:00:00Z'\n"
-            "      dtend: '2024-01-02T00:00:00Z'\n"
-        )
+        f.write_text(_INT_FILTERS_YAML)
         config = load_config(f)
         assert config.jobs[0].filters.cycle == 5
         assert config.jobs[0].filters.orbit == 100
@@ -126,19 +208,7 @@ class TestLoadConfig:
     def test_download_config_all_fields(self, tmp_path):
         """All download config fields are parsed including max_retries, retry_backoff, timeout."""
         f = tmp_path / "dl.yaml"
-        f.write_text(
-            "jobs:\n"
-            "  - name: dl-test\n"
-            "    collection: COL1\n"
-            "    download:\n"
-            "      directory: ./data\n"
-            "      parallel: 8\n"
-            "      resume: false\n"
-            "      verify_md5: false\n"
-            "      max_retries: 5\n"
-            "      retry_backoff: 3.5\n"
-            "      timeout: 600\n"
-        )
+        f.write_text(_DL_YAML)
         config = load_config(f)
         dl = config.jobs[0].download
         assert dl.parallel == 8
@@ -152,9 +222,7 @@ class TestLoadConfig:
         """Absolute paths in config are kept as-is."""
         abs_path = Path(tmp_path.anchor) / "absolute" / "path" / "downloads"
         f = tmp_path / "abs.yaml"
-        f.write_text(
-            f"jobs:\n  - name: abs-test\n    collection: COL1\n    download:\n      directory: {abs_path.as_posix()}\n"
-        )
+        f.write_text(_ABS_DL_YAML.format_map({"directory": abs_path.as_posix()}))
         config = load_config(f)
         assert config.jobs[0].download.directory == abs_path
 
@@ -187,18 +255,21 @@ class TestLoadConfig:
         assert config.logging.level == "WARNING"
         assert config.logging.file == "app.log"
 
+    def test_parallel_jobs_parsed(self):
+        jobs = [{"name": "a", "collection": "COL1"}]
+        assert load_config_from_dict({"jobs": jobs}).parallel_jobs == 1
+        assert load_config_from_dict({"parallel_jobs": "3", "jobs": jobs}).parallel_jobs == 3
+
+    @pytest.mark.parametrize("value", [0, -2])
+    def test_parallel_jobs_below_one_raises(self, value):
+        with pytest.raises(ValueError, match="'parallel_jobs' must be at least 1"):
+            load_config_from_dict({"parallel_jobs": value, "jobs": [{"name": "a", "collection": "COL1"}]})
+
     def test_post_process_config_parsed(self, tmp_path):
         """Post-process config with absolute output_dir."""
         abs_path = Path(tmp_path.anchor) / "absolute" / "output"
         f = tmp_path / "pp.yaml"
-        f.write_text(
-            "jobs:\n"
-            "  - name: pp-test\n"
-            "    collection: COL1\n"
-            "    post_process:\n"
-            "      enabled: true\n"
-            f"      output_dir: {abs_path.as_posix()}\n"
-        )
+        f.write_text(_PP_YAML.format_map({"output_dir": abs_path.as_posix()}))
         config = load_config(f)
         assert config.jobs[0].post_process.enabled is True
         assert config.jobs[0].post_process.output_dir == abs_path
@@ -213,23 +284,7 @@ class TestLoadConfig:
     def test_new_filter_fields(self, tmp_path):
         """New filter fields (coverage, bbox, title, etc.) are parsed correctly."""
         f = tmp_path / "new_filters.yaml"
-        f.write_text(
-            """
-jobs:
-  - name: test-new-filters
-    collection: EO:EUM:DAT:0665
-    filters:
-      dtstart: "2024-01-01T00:00:00Z"
-      dtend: "2024-01-02T00:00:00Z"
-      coverage: FD
-      bbox: "-180,-90,180,90"
-      title: "*HRFI*"
-      type: MTIFCI1CRRADHRFI
-      repeatCycleIdentifier: "1"
-      centerOfLongitude: "0.0"
-      set: brief
-"""
-        )
+        f.write_text(_NEW_FILTERS_YAML)
         config = load_config(f)
         filters = config.jobs[0].filters
         assert filters.coverage == "FD"
@@ -239,3 +294,24 @@ jobs:
         assert filters.repeatCycleIdentifier == "1"
         assert filters.centerOfLongitude == "0.0"
         assert filters.set == "brief"
+
+    def test_yaml_aliases_interpolated_once(self, tmp_path):
+        f = tmp_path / "alias.yaml"
+        f.write_text(
+            "jobs:\n"
+            "  - &base\n    name: a\n    collection: COL1\n    download:\n      directory: ${DL_DIR}\n"
+            "  - <<: *base\n    name: b\n"
+        )
+        with mock.patch.dict(os.environ, {"DL_DIR": "${NOT_EXPANDED}"}):
+            config = load_config(f)
+        assert [job.download.directory.name for job in config.jobs] == ["${NOT_EXPANDED}"] * 2
+
+    def test_load_from_dict_resolves_against_base_dir(self, tmp_path, monkeypatch):
+        """Dict configs resolve relative paths against base_dir, or the cwd when omitted."""
+        raw = {"jobs": [{"collection": "COL1", "download": {"directory": "dl"}}]}
+        config = load_config_from_dict(raw, base_dir=tmp_path / "cfg")
+        assert config.jobs[0].download.directory == tmp_path / "cfg" / "dl"
+
+        monkeypatch.chdir(tmp_path)
+        config = load_config_from_dict({"jobs": [{"collection": "COL1", "download": {"directory": "dl"}}]})
+        assert config.jobs[0].download.directory == tmp_path / "dl"
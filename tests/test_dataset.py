@@ -2,35 +2,43 @@
 
 from __future__ import annotations
 
+import contextlib
+import io
+from dataclasses import dataclass
 from unittest import mock
 
 import pytest
-from fsspec.implementations.http import HTTPFileSystem
 
-from eumdac_fetch.dataset import RemoteData, RemoteDataset
-from eumdac_fetch.remote import TokenRefreshingHTTPFileSystem
+from eumdac_fetch.dataset import DEFAULT_BLOCK_SIZE, DEFAULT_CACHE_TYPE, RemoteData, RemoteDataset
+from tests._stubs import StubbedHTTPFS
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
 
-def _make_token(value: str = "test-token"):
-    token = mock.MagicMock()
-    type(token).access_token = mock.PropertyMock(return_value=value)
-    return token
+@dataclass(frozen=True, slots=True)
+class _Token:
+    """Plain stand-in for a token manager: only ``.access_token`` is ever read."""
 
+    access_token: str
 
-def _make_fs(token):
-    """Build a TokenRefreshingHTTPFileSystem with the parent __init__ stubbed."""
 
-    def _stub(self, *args, **kwargs):
-        self.kwargs = kwargs
+_TOKEN = _Token("test-token")
 
-    with mock.patch.object(HTTPFileSystem, "__init__", _stub):
-        fs = TokenRefreshingHTTPFileSystem(token)
-    fs._session = None
-    return fs
+
+@pytest.fixture(scope="class")
+def _patched_fs_cls():
+    """Patch the filesystem class once per test class rather than once per test."""
+    with mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem") as fs_cls:
+        yield fs_cls
+
+
+@pytest.fixture
+def mock_fs_cls(_patched_fs_cls):
+    """The class-wide filesystem mock, with calls and configured results cleared."""
+    _patched_fs_cls.reset_mock(return_value=True, side_effect=True)
+    return _patched_fs_cls
 
 
 # ---------------------------------------------------------------------------
@@ -38,70 +46,124 @@ def _make_fs(token):
 # ---------------------------------------------------------------------------
 
 
+@pytest.mark.usefixtures("mock_fs_cls")
 class TestRemoteData:
-    def test_init_creates_fs_from_token(self):
-        token = _make_token()
-        with mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem") as mock_cls:
-            RemoteData("https://example.com/file.nc", token_manager=token)
-        mock_cls.assert_called_once_with(token_obj=token)
-
-    def test_init_uses_provided_fs(self):
-        token = _make_token()
-        shared_fs = _make_fs(token)
-        with mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem") as mock_cls:
-            rd = RemoteData("https://example.com/file.nc", fs=shared_fs)
-        mock_cls.assert_not_called()
+    def test_init_creates_fs_from_token(self, mock_fs_cls):
+        token = _TOKEN
+        RemoteData("https://example.com/file.nc", token_manager=token)
+        mock_fs_cls.assert_called_once_with(token_obj=token)
+
+    def test_init_uses_provided_fs(self, mock_fs_cls):
+        token = _TOKEN
+        shared_fs = StubbedHTTPFS(token)
+        rd = RemoteData("https://example.com/file.nc", fs=shared_fs)
+        mock_fs_cls.assert_not_called()
         assert rd._fs is shared_fs
 
     def test_init_calls_get_token_when_no_token(self):
-        fake_token = _make_token()
-        with (
-            mock.patch("eumdac_fetch.dataset.get_token", return_value=fake_token) as mock_cat,
-            mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem"),
-        ):
+        fake_token = _TOKEN
+        with mock.patch("eumdac_fetch.dataset.get_token", return_value=fake_token) as mock_cat:
             RemoteData("https://example.com/file.nc")
         mock_cat.assert_called_once_with()
 
-    def test_context_manager_opens_and_closes(self):
-        token = _make_token()
+    def test_context_manager_opens_and_closes(self, mock_fs_cls):
+        token = _TOKEN
         fake_handle = mock.MagicMock()
-        with mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem") as mock_cls:
-            mock_cls.return_value.open.return_value = fake_handle
-            with RemoteData("https://example.com/file.nc", token_manager=token) as f:
-                assert f is fake_handle
+        mock_fs_cls.return_value.open.return_value = fake_handle
+        with RemoteData("https://example.com/file.nc", token_manager=token) as f:
+            assert f is fake_handle
         fake_handle.close.assert_called_once()
 
-    def test_exit_closes_handle_on_exception(self):
-        token = _make_token()
+    def test_exit_closes_handle_on_exception(self, mock_fs_cls):
+        token = _TOKEN
         fake_handle = mock.MagicMock()
-        with (
-            mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem") as mock_cls,
-            pytest.raises(RuntimeError),
-        ):
-            mock_cls.return_value.open.return_value = fake_handle
+        with pytest.raises(RuntimeError):
+            mock_fs_cls.return_value.open.return_value = fake_handle
             with RemoteData("https://example.com/file.nc", token_manager=token):
                 raise RuntimeError("boom")
         fake_handle.close.assert_called_once()
 
-    def test_exit_does_not_suppress_exceptions(self):
-        token = _make_token()
-        with mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem") as mock_cls:
-            mock_cls.return_value.open.return_value = mock.MagicMock()
-            with pytest.raises(ValueError), RemoteData("https://example.com/file.nc", token_manager=token):
-                raise ValueError("not suppressed")
+    def test_exit_does_not_suppress_exceptions(self, mock_fs_cls):
+        token = _TOKEN
+        mock_fs_cls.return_value.open.return_value = mock.MagicMock()
+        with pytest.raises(ValueError), RemoteData("https://example.com/file.nc", token_manager=token):
+            raise ValueError("not suppressed")
 
-    def test_open_returns_handle_without_context_manager(self):
-        token = _make_token()
+    def test_open_returns_handle_without_context_manager(self, mock_fs_cls):
+        token = _TOKEN
         fake_handle = mock.MagicMock()
-        with mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem") as mock_cls:
-            mock_cls.return_value.open.return_value = fake_handle
-            rd = RemoteData("https://example.com/file.nc", token_manager=token)
-            assert rd.open() is fake_handle
+        mock_fs_cls.return_value.open.return_value = fake_handle
+        rd = RemoteData("https://example.com/file.nc", token_manager=token)
+        assert rd.open() is fake_handle
+
+    def test_open_forwards_block_size_and_cache_type(self, mock_fs_cls):
+        token = _TOKEN
+        rd = RemoteData("https://example.com/file.nc", token_manager=token, block_size=2**20, cache_type="background")
+        rd.open()
+        mock_fs_cls.assert_called_once_with(token_obj=token)
+        mock_fs_cls.return_value.open.assert_called_once_with(
+            "https://example.com/file.nc", block_size=2**20, cache_type="background"
+        )
+
+    def test_read_ranges_issues_one_range_per_pair(self, mock_fs_cls):
+        token = _TOKEN
+        mock_fs_cls.return_value.cat_ranges.return_value = [b"ab", b"cde"]
+        rd = RemoteData("https://example.com/file.nc", token_manager=token)
+        assert rd.read_ranges([0, 100], [2, 3]) == [b"ab", b"cde"]
+        mock_fs_cls.return_value.cat_ranges.assert_called_once_with(
+            ["https://example.com/file.nc"] * 2, [0, 100], [2, 103], on_error="raise"
+        )
+
+    def test_read_ranges_length_mismatch_raises(self):
+        token = _TOKEN
+        rd = RemoteData("https://example.com/file.nc", token_manager=token)
+        with pytest.raises(ValueError, match="same length"):
+            rd.read_ranges([0, 1], [1])
+
+    def test_persistent_reuses_handle_across_with_blocks(self, mock_fs_cls):
+        handle = mock.MagicMock(closed=False)
+        mock_fs_cls.return_value.open.return_value = handle
+        rd = RemoteData("https://example.com/file.nc", token_manager=_TOKEN, persistent=True)
+        with rd as f1:
+            pass
+        with rd as f2:
+            pass
+        assert f1 is f2 is handle
+        mock_fs_cls.return_value.open.assert_called_once()
+        handle.seek.assert_called_once_with(0)
+        handle.close.assert_not_called()
+        rd.close()
+        handle.close.assert_called_once()
+
+    def test_persistent_reopens_handle_closed_inside_block(self, mock_fs_cls):
+        handles = [io.BytesIO(b"first"), io.BytesIO(b"second")]
+        mock_fs_cls.return_value.open.side_effect = handles
+        rd = RemoteData("https://example.com/file.nc", token_manager=_TOKEN, persistent=True)
+        with rd as f1:
+            f1.close()
+        with rd as f2:
+            assert f2.read() == b"second"
+        assert f2 is handles[1]
+        assert mock_fs_cls.return_value.open.call_count == 2
+        rd.close()
+
+    def test_non_persistent_reopens_each_with_block(self, mock_fs_cls):
+        rd = RemoteData("https://example.com/file.nc", token_manager=_TOKEN)
+        with rd:
+            pass
+        with rd:
+            pass
+        assert mock_fs_cls.return_value.open.call_count == 2
+
+    def test_uses_slots_without_instance_dict(self):
+        rd = RemoteData("https://example.com/file.nc", token_manager=_TOKEN)
+        assert not hasattr(rd, "__dict__")
+        with pytest.raises(AttributeError):
+            rd.unexpected = 1
 
     def test_repr_contains_url(self):
-        token = _make_token()
-        with mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem"):
-            rd = RemoteData("https://example.com/file.nc", token_manager=token)
+        token = _TOKEN
+        rd = RemoteData("https://example.com/file.nc", token_manager=token)
         assert "https://example.com/file.nc" in repr(rd)
 
 
@@ -110,88 +172,202 @@ class TestRemoteData:
 # ---------------------------------------------------------------------------
 
 
+@pytest.mark.usefixtures("mock_fs_cls")
 class TestRemoteDataset:
     _entries = {
         "VIS06": "https://example.com/vis06.nc",
         "IR105": "https://example.com/ir105.nc",
     }
 
-    def test_init_creates_single_shared_fs(self):
-        token = _make_token()
-        with mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem") as mock_cls:
-            RemoteDataset(self._entries, token_manager=token)
-        mock_cls.assert_called_once_with(token_obj=token)
+    def test_init_creates_single_shared_fs(self, mock_fs_cls):
+        token = _TOKEN
+        RemoteDataset(self._entries, token_manager=token)
+        mock_fs_cls.assert_called_once_with(token_obj=token)
 
     def test_entries_are_remote_data_instances(self):
-        token = _make_token()
-        with mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem"):
-            ds = RemoteDataset(self._entries, token_manager=token)
+        token = _TOKEN
+        ds = RemoteDataset(self._entries, token_manager=token)
         assert isinstance(ds["VIS06"], RemoteData)
         assert isinstance(ds["IR105"], RemoteData)
 
-    def test_all_entries_share_same_fs(self):
-        token = _make_token()
-        with mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem") as mock_cls:
-            ds = RemoteDataset(self._entries, token_manager=token)
-        shared_fs = mock_cls.return_value
+    def test_all_entries_share_same_fs(self, mock_fs_cls):
+        token = _TOKEN
+        ds = RemoteDataset(self._entries, token_manager=token)
+        shared_fs = mock_fs_cls.return_value
         assert ds["VIS06"]._fs is shared_fs
         assert ds["IR105"]._fs is shared_fs
 
+    def test_block_size_and_cache_type_applied_to_entries(self):
+        token = _TOKEN
+        ds = RemoteDataset(self._entries, token_manager=token, block_size=4096, cache_type="blockcache")
+        assert ds["VIS06"]._open_kwargs == {"block_size": 4096, "cache_type": "blockcache"}
+
+    def test_many_entries_share_fs_and_keep_insertion_order(self, mock_fs_cls):
+        entries = {f"CHK{i:04d}": f"https://example.com/{i}.nc" for i in range(1000, 0, -1)}
+        ds = RemoteDataset(entries, token_manager=_TOKEN)
+        mock_fs_cls.assert_called_once()
+        assert ds.entries == list(entries)
+        assert all(ds[name]._fs is mock_fs_cls.return_value for name in entries)
+
+    def test_close_releases_persistent_handles(self, mock_fs_cls):
+        handles = {url: mock.MagicMock() for url in self._entries.values()}
+        mock_fs_cls.return_value.open.side_effect = lambda url, **_: handles[url]
+        ds = RemoteDataset(self._entries, token_manager=_TOKEN, persistent=True)
+        for name in ds:
+            with ds[name]:
+                pass
+        ds.close()
+        for h in handles.values():
+            h.close.assert_called_once()
+
+    def test_entries_default_to_readahead_blocks(self, mock_fs_cls):
+        ds = RemoteDataset(self._entries, token_manager=_TOKEN)
+        ds["VIS06"].open()
+        mock_fs_cls.return_value.open.assert_called_once_with(
+            self._entries["VIS06"], block_size=1 << 20, cache_type="readahead"
+        )
+
+    def test_none_falls_back_to_filesystem_defaults(self, mock_fs_cls):
+        ds = RemoteDataset(self._entries, token_manager=_TOKEN, block_size=None, cache_type=None)
+        ds["VIS06"].open()
+        mock_fs_cls.return_value.open.assert_called_once_with(self._entries["VIS06"])
+
     def test_entry_urls_are_set_correctly(self):
-        token = _make_token()
-        with mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem"):
-            ds = RemoteDataset(self._entries, token_manager=token)
+        token = _TOKEN
+        ds = RemoteDataset(self._entries, token_manager=token)
         assert ds["VIS06"]._url == self._entries["VIS06"]
         assert ds["IR105"]._url == self._entries["IR105"]
 
     def test_len(self):
-        token = _make_token()
-        with mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem"):
-            ds = RemoteDataset(self._entries, token_manager=token)
+        token = _TOKEN
+        ds = RemoteDataset(self._entries, token_manager=token)
         assert len(ds) == 2
 
     def test_iter_yields_names(self):
-        token = _make_token()
-        with mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem"):
-            ds = RemoteDataset(self._entries, token_manager=token)
+        token = _TOKEN
+        ds = RemoteDataset(self._entries, token_manager=token)
         assert set(ds) == {"VIS06", "IR105"}
 
     def test_contains(self):
-        token = _make_token()
-        with mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem"):
-            ds = RemoteDataset(self._entries, token_manager=token)
+        token = _TOKEN
+        ds = RemoteDataset(self._entries, token_manager=token)
         assert "VIS06" in ds
         assert "MISSING" not in ds
 
     def test_entries_property(self):
-        token = _make_token()
-        with mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem"):
-            ds = RemoteDataset(self._entries, token_manager=token)
+        token = _TOKEN
+        ds = RemoteDataset(self._entries, token_manager=token)
         assert set(ds.entries) == {"VIS06", "IR105"}
 
+    def test_entries_returns_fresh_list(self):
+        ds = RemoteDataset(self._entries, token_manager=_TOKEN)
+        names = ds.entries
+        assert names == ["VIS06", "IR105"]
+        names.append("extra")
+        assert ds.entries == ["VIS06", "IR105"]
+
     def test_missing_key_raises(self):
-        token = _make_token()
-        with mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem"):
-            ds = RemoteDataset(self._entries, token_manager=token)
+        token = _TOKEN
+        ds = RemoteDataset(self._entries, token_manager=token)
         with pytest.raises(KeyError):
             ds["NONEXISTENT"]
 
     def test_repr_contains_entry_names(self):
-        token = _make_token()
-        with mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem"):
-            ds = RemoteDataset(self._entries, token_manager=token)
+        token = _TOKEN
+        ds = RemoteDataset(self._entries, token_manager=token)
         assert "VIS06" in repr(ds)
         assert "IR105" in repr(ds)
 
     def test_init_calls_get_token_when_no_token(self):
-        fake_token = _make_token()
-        with (
-            mock.patch("eumdac_fetch.dataset.get_token", return_value=fake_token) as mock_cat,
-            mock.patch("eumdac_fetch.dataset.TokenRefreshingHTTPFileSystem"),
-        ):
+        fake_token = _TOKEN
+        with mock.patch("eumdac_fetch.dataset.get_token", return_value=fake_token) as mock_cat:
             RemoteDataset(self._entries)
         mock_cat.assert_called_once_with()
 
+    def test_open_all_yields_handles_and_closes_on_exit(self, mock_fs_cls):
+        token = _TOKEN
+        handles = {url: mock.MagicMock() for url in self._entries.values()}
+        mock_fs_cls.return_value.open.side_effect = lambda url, **_: handles[url]
+        ds = RemoteDataset(self._entries, token_manager=token)
+        with ds.open_all() as opened:
+            assert opened == {name: handles[url] for name, url in self._entries.items()}
+            for h in handles.values():
+                h.close.assert_not_called()
+        for h in handles.values():
+            h.close.assert_called_once()
+
+    def test_open_all_prefetch_reads_and_rewinds(self, mock_fs_cls):
+        handle = mock.MagicMock()
+        mock_fs_cls.return_value.open.return_value = handle
+        ds = RemoteDataset(self._entries, token_manager=_TOKEN)
+        with ds.open_all(["VIS06"], prefetch=65536):
+            handle.read.assert_called_once_with(65536)
+            handle.seek.assert_called_once_with(0)
+
+    def test_open_all_prefetch_failure_closes_handle(self, mock_fs_cls):
+        handle = mock.MagicMock()
+        handle.read.side_effect = OSError("short read")
+        mock_fs_cls.return_value.open.return_value = handle
+        ds = RemoteDataset(self._entries, token_manager=_TOKEN)
+        with pytest.raises(OSError, match="short read"), ds.open_all(["VIS06"], prefetch=16):
+            pass
+        handle.close.assert_called_once()
+
+    def test_gather_slices_reads_each_requested_variable(self, mock_fs_cls):
+        pytest.importorskip("xarray")
+        handles = {url: mock.MagicMock(name=url) for url in self._entries.values()}
+        mock_fs_cls.return_value.open.side_effect = lambda url, **_: handles[url]
+
+        def _open_dataset(f, engine):
+            ds = mock.MagicMock()
+            ds.__enter__.return_value = ds
+            ds.__getitem__.return_value.isel.side_effect = lambda **idx: mock.Mock(values=(f, engine, idx))
+            return ds
+
+        ds = RemoteDataset(self._entries, token_manager=_TOKEN)
+        with mock.patch("xarray.open_dataset", side_effect=_open_dataset):
+            out = ds.gather_slices(
+                {"IR105": ("ir", {"x": slice(0, 2)}), "VIS06": ("vis", {"y": slice(1, 3)})},
+                n_threads=2,
+            )
+
+        assert list(out) == ["IR105", "VIS06"]
+        assert out["IR105"] == (handles[self._entries["IR105"]], "h5netcdf", {"x": slice(0, 2)})
+        assert out["VIS06"] == (handles[self._entries["VIS06"]], "h5netcdf", {"y": slice(1, 3)})
+        for h in handles.values():
+            h.close.assert_called_once()
+
+    def test_open_all_subset(self, mock_fs_cls):
+        token = _TOKEN
+        ds = RemoteDataset(self._entries, token_manager=token)
+        with ds.open_all(["IR105"], max_workers=1) as opened:
+            assert list(opened) == ["IR105"]
+        mock_fs_cls.return_value.open.assert_called_once_with(
+            self._entries["IR105"], block_size=DEFAULT_BLOCK_SIZE, cache_type=DEFAULT_CACHE_TYPE
+        )
+
+    def test_open_all_unknown_name_raises_before_opening(self, mock_fs_cls):
+        token = _TOKEN
+        ds = RemoteDataset(self._entries, token_manager=token)
+        with pytest.raises(KeyError), ds.open_all(["MISSING"]):
+            pass
+        mock_fs_cls.return_value.open.assert_not_called()
+
+    def test_open_all_closes_opened_handles_on_failure(self, mock_fs_cls):
+        token = _TOKEN
+        ok_handle = mock.MagicMock()
+
+        def _open(url, **_):
+            if url == self._entries["IR105"]:
+                raise OSError("boom")
+            return ok_handle
+
+        mock_fs_cls.return_value.open.side_effect = _open
+        ds = RemoteDataset(self._entries, token_manager=token)
+        with pytest.raises(OSError, match="boom"), ds.open_all():
+            pass
+        ok_handle.close.assert_called_once()
+
 
 # ---------------------------------------------------------------------------
 # Integration tests — real EUMDAC network calls
@@ -200,23 +376,6 @@ class TestRemoteDataset:
 COLLECTION_ID = "EO:EUM:DAT:0665"  # MTG FCI L1C HRFI
 
 
-def _load_credentials():
-    import os
-    from pathlib import Path
-
-    key = os.environ.get("EUMDAC_KEY", "")
-    secret = os.environ.get("EUMDAC_SECRET", "")
-    if key and secret:
-        return key, secret
-    cred_file = Path.home() / ".eumdac" / "credentials"
-    if cred_file.exists():
-        text = cred_file.read_text().strip()
-        if "," in text:
-            k, _, s = text.partition(",")
-            return k.strip(), s.strip()
-    return None
-
-
 @pytest.fixture(scope="module")
 def live_token():
     from eumdac_fetch.auth import get_token
@@ -247,14 +406,34 @@ def fci_dataset(live_token):
     product = result.products[0]
     base_url = product.url.split("?")[0]
 
-    nc_entries = [e for e in product.entries if e.endswith(".nc")]
-    assert nc_entries, "No .nc entries in FCI product"
-
-    entries = {name: f"{base_url}/entry?name={quote(name, safe='')}" for name in nc_entries}
+    entries = {
+        name: f"{base_url}/entry?name={quote(name, safe='')}" for name in product.entries if name.endswith(".nc")
+    }
+    assert entries, "No .nc entries in FCI product"
     print(f"\nBuilding RemoteDataset with {len(entries)} entries: {list(entries)[:3]}…")
     return RemoteDataset(entries, token_manager=live_token)
 
 
+@pytest.fixture(scope="class")
+def _first_entry_handle(fci_dataset):
+    """Open the first entry once for the whole class instead of once per test."""
+    name = fci_dataset.entries[0]
+    with contextlib.closing(fci_dataset[name].open()) as handle:
+        yield name, handle
+
+
+@pytest.fixture
+def first_entry(_first_entry_handle):
+    """``(name, handle)`` for the first entry, rewound for the next reader."""
+    _first_entry_handle[1].seek(0)
+    return _first_entry_handle
+
+
+def _centre_indexers(dims: tuple, shape: tuple, width: int = 10) -> dict[str, slice]:
+    """Slice *width* elements from the middle of each dimension larger than *width* — explicitly not from 0."""
+    return {dim: slice(size // 2, size // 2 + width) for dim, size in zip(dims, shape, strict=True) if size > width}
+
+
 @pytest.mark.integration
 class TestRemoteDatasetIntegration:
     """Integration tests that open real FCI NetCDF entries via RemoteDataset."""
@@ -264,61 +443,113 @@ class TestRemoteDatasetIntegration:
         assert len(fci_dataset) > 0
         assert all(name.endswith(".nc") for name in fci_dataset)
 
-    def test_open_entry_lazy_metadata(self, fci_dataset):
+    def test_open_entry_lazy_metadata(self, first_entry):
         """Opening an entry via RemoteDataset yields a readable xarray Dataset."""
         import xarray as xr
 
-        name = fci_dataset.entries[0]
-        with fci_dataset[name] as f:
-            ds = xr.open_dataset(f, engine="h5netcdf")
-            print(f"\n{name}: vars={list(ds.data_vars)}, dims={dict(ds.sizes)}")
-            assert len(ds.data_vars) > 0
-            assert len(ds.dims) > 0
-            ds.close()
-
-    def test_lazy_open_does_not_pull_full_array(self, fci_dataset):
+        name, f = first_entry
+        ds = xr.open_dataset(f, engine="h5netcdf")
+        print(f"\n{name}: vars={list(ds.data_vars)}, dims={dict(ds.sizes)}")
+        assert len(ds.data_vars) > 0
+        assert len(ds.dims) > 0
+        ds.close()
+
+    def test_lazy_open_does_not_pull_full_array(self, first_entry):
         """Opening the dataset must not trigger a full data download."""
         import xarray as xr
 
+        _, f = first_entry
+        ds = xr.open_dataset(f, engine="h5netcdf")
+        var_name = next(iter(ds.data_vars))
+        var = ds[var_name]
+        assert var.shape is not None
+        assert var.dtype is not None
+        print(f"\n'{var_name}': shape={var.shape}, would be {var.nbytes / 1e6:.2f} MB")
+        ds.close()
+
+    def test_read_ranges_fetches_concurrent_byte_ranges(self, fci_dataset):
+        """read_ranges returns each requested range; the HDF5 signature opens the file."""
         name = fci_dataset.entries[0]
-        with fci_dataset[name] as f:
-            ds = xr.open_dataset(f, engine="h5netcdf")
-            var_name = next(iter(ds.data_vars))
-            var = ds[var_name]
-            assert var.shape is not None
-            assert var.dtype is not None
-            print(f"\n'{var_name}': shape={var.shape}, would be {var.nbytes / 1e6:.2f} MB")
-            ds.close()
-
-    def test_random_region_access(self, fci_dataset):
+        header, tail = fci_dataset[name].read_ranges([0, 512], [8, 16])
+        assert header == b"\x89HDF\r\n\x1a\n"
+        assert len(tail) == 16
+
+    def test_random_region_access(self, first_entry):
         """A slice from the centre of the array is retrieved correctly."""
         import xarray as xr
 
+        _, f = first_entry
+        ds = xr.open_dataset(f, engine="h5netcdf")
+
+        # First variable that has at least one dimension with > 10 elements
+        candidate = next((n for n, v in ds.data_vars.items() if any(s > 10 for s in v.shape)), None)
+        if candidate is None:
+            pytest.skip("No variable with dimensions large enough for a non-zero-offset slice")
+
+        var = ds[candidate]
+        indexers = _centre_indexers(var.dims, var.shape)
+        values = var.isel(**indexers).values
+        print(f"\n'{candidate}' centre slice: shape={values.shape}, dtype={values.dtype}")
+        assert all(s == 10 for s in values.shape)
+        ds.close()
+
+    def test_open_all_with_prefetch_opens_datasets(self, fci_dataset):
+        """Entries opened with a metadata prefetch are readable by xarray."""
+        import xarray as xr
+
+        names = fci_dataset.entries[:4]
+        with fci_dataset.open_all(names, prefetch=65536) as handles:
+            for name in names:
+                ds = xr.open_dataset(handles[name], engine="h5netcdf")
+                assert len(ds.data_vars) > 0
+                ds.close()
+
+    def test_gather_slices_matches_sequential_reads(self, fci_dataset):
+        """Threaded slice reads return the same arrays as reading each entry in turn."""
+        import numpy as np
+        import xarray as xr
+
+        requests = {}
+        for name in fci_dataset.entries[:2]:
+            with fci_dataset[name] as f, xr.open_dataset(f, engine="h5netcdf") as ds:
+                var_name = next((v for v in ds.data_vars if ds[v].ndim and all(s > 4 for s in ds[v].shape)), None)
+                if var_name is None:
+                    continue
+                requests[name] = (var_name, {dim: slice(0, 4) for dim in ds[var_name].dims})
+        if not requests:
+            pytest.skip("No variable large enough to slice")
+
+        expected = {}
+        for name, (var_name, indexers) in requests.items():
+            with fci_dataset[name] as f, xr.open_dataset(f, engine="h5netcdf") as ds:
+                expected[name] = ds[var_name].isel(**indexers).values
+
+        result = fci_dataset.gather_slices(requests, n_threads=len(requests))
+        for name, array in expected.items():
+            np.testing.assert_array_equal(result[name], array)
+
+    def test_readahead_issues_fewer_range_requests(self, fci_dataset):
+        """The default read-ahead window needs fewer Range GETs than uncached reads."""
+        import xarray as xr
+        from fsspec.implementations.http import HTTPFile
+
         name = fci_dataset.entries[0]
-        with fci_dataset[name] as f:
-            ds = xr.open_dataset(f, engine="h5netcdf")
-
-            # Find the first variable that has at least one dimension with > 10 elements
-            candidate = None
-            for var_name in ds.data_vars:
-                var = ds[var_name]
-                if any(s > 10 for s in var.shape):
-                    candidate = var_name
-                    break
-            if candidate is None:
-                pytest.skip("No variable with dimensions large enough for a non-zero-offset slice")
-
-            var = ds[candidate]
-            # Slice from the middle of each large dimension — explicitly not from 0
-            indexers = {
-                dim: slice(size // 2, size // 2 + 10)
-                for dim, size in zip(var.dims, var.shape, strict=True)
-                if size > 10
-            }
-            values = var.isel(**indexers).values
-            print(f"\n'{candidate}' centre slice: shape={values.shape}, dtype={values.dtype}")
-            assert all(s == 10 for s in values.shape)
-            ds.close()
+        entry = fci_dataset[name]
+        original = HTTPFile._fetch_range
+        counts = {}
+        for cache_type in ("none", DEFAULT_CACHE_TYPE):
+            calls = []
+
+            def _counting(self, start, end, calls=calls):
+                calls.append((start, end))
+                return original(self, start, end)
+
+            remote = RemoteData(entry._url, fs=entry._fs, block_size=DEFAULT_BLOCK_SIZE, cache_type=cache_type)
+            with mock.patch.object(HTTPFile, "_fetch_range", _counting), remote as f:
+                xr.open_dataset(f, engine="h5netcdf").close()
+            counts[cache_type] = len(calls)
+        print(f"\nRange GETs: {counts}")
+        assert counts[DEFAULT_CACHE_TYPE] < counts["none"]
 
     def test_two_entries_share_one_session(self, fci_dataset):
         """Two entries from the same dataset use the same underlying filesystem."""
@@ -336,9 +567,9 @@ class TestRemoteDatasetIntegration:
             pytest.skip("Need at least 2 entries")
 
         e1, e2 = fci_dataset.entries[:2]
-        with fci_dataset[e1] as f1, fci_dataset[e2] as f2:
-            ds1 = xr.open_dataset(f1, engine="h5netcdf")
-            ds2 = xr.open_dataset(f2, engine="h5netcdf")
+        with fci_dataset.open_all([e1, e2]) as handles:
+            ds1 = xr.open_dataset(handles[e1], engine="h5netcdf")
+            ds2 = xr.open_dataset(handles[e2], engine="h5netcdf")
             assert len(ds1.data_vars) > 0
             assert len(ds2.data_vars) > 0
             ds1.close()
@@ -2,14 +2,26 @@
 
 from __future__ import annotations
 
+import io
 from unittest import mock
 
+import pytest
+from rich.console import Console
+
 from eumdac_fetch.display import display_collection_info, display_product_count, display_search_results
 from eumdac_fetch.search import CollectionInfo
 
 
+@pytest.fixture(autouse=True)
+def console(monkeypatch):
+    """Swap the module console for a fixed-width, colourless in-memory recorder."""
+    recorder = Console(file=io.StringIO(), width=80, record=True, color_system=None, force_terminal=False)
+    monkeypatch.setattr("eumdac_fetch.display.console", recorder)
+    return recorder
+
+
 class TestDisplayCollectionInfo:
-    def test_displays_title_and_abstract(self, capsys):
+    def test_displays_title_and_abstract(self, console):
         info = CollectionInfo(
             collection_id="EO:EUM:DAT:TEST",
             title="Test Collection",
@@ -17,36 +29,50 @@ class TestDisplayCollectionInfo:
             search_options={},
         )
         display_collection_info(info)
-        # Rich outputs to its own console, so we check it doesn't raise
+        text = console.export_text()
+        assert "EO:EUM:DAT:TEST" in text
+        assert "Test Collection" in text
+        assert "A test abstract" in text
+        assert "Available Search Filters" not in text
 
-    def test_displays_search_options(self):
+    def test_displays_search_options(self, console):
         info = CollectionInfo(
             collection_id="EO:EUM:DAT:TEST",
             title="Test",
             abstract="Abstract",
             search_options={"sat": ["MSG4", "MSG3"], "timeliness": "NT"},
         )
-        # Should not raise
         display_collection_info(info)
+        text = console.export_text()
+        assert "Available Search Filters" in text
+        assert "MSG4, MSG3" in text
+        assert "timeliness" in text
 
 
 class TestDisplaySearchResults:
-    def test_displays_empty_results(self):
+    def test_displays_empty_results(self, console):
         display_search_results([], 0, {})
+        assert "No products found." in console.export_text()
 
-    def test_displays_products(self):
+    def test_displays_products(self, console):
         product = mock.MagicMock()
         product.__str__ = mock.MagicMock(return_value="PROD-001")
         product.size = 1234
         display_search_results([product], 1, {"dtstart": "2024-01-01"})
+        text = console.export_text()
+        assert "PROD-001" in text
+        assert "1,234" in text
+        assert "dtstart" in text
 
-    def test_handles_product_without_size(self):
+    def test_handles_product_without_size(self, console):
         product = mock.MagicMock()
         product.__str__ = mock.MagicMock(return_value="PROD-001")
         product.size = mock.PropertyMock(side_effect=AttributeError("no size"))
         display_search_results([product], 1, {})
+        assert "N/A" in console.export_text()
 
 
 class TestDisplayProductCount:
-    def test_displays_count(self):
+    def test_displays_count(self, console):
         display_product_count("EO:EUM:DAT:TEST", 42)
+        assert "EO:EUM:DAT:TEST: 42 products matching filters" in console.export_text()
@@ -3,29 +3,58 @@
 from __future__ import annotations
 
 import asyncio
+import fnmatch
+import functools
 import hashlib
 import http.client
 import io
-import time
+import logging
+import os
+import queue
+import shutil
+import threading
+from collections.abc import Iterator
 from contextlib import contextmanager
-from unittest import mock
+from pathlib import Path
 
 import pytest
 import requests.exceptions
 import urllib3.exceptions
 
-from eumdac_fetch.downloader import DownloadService
+from eumdac_fetch.downloader import DownloadService, _decode_entry_key, _encode_entry_key, _entry_matcher
 from eumdac_fetch.models import ProductRecord, ProductStatus
 from eumdac_fetch.state import StateDB
 
 
-@pytest.fixture
-def state_db(tmp_path):
-    db = StateDB(tmp_path / "test.db")
+@pytest.fixture(scope="module")
+def _module_state_db():
+    """In-memory StateDB built once per module; all access stays on the loop thread."""
+    db = StateDB(":memory:")
     yield db
     db.close()
 
 
+@pytest.fixture
+def _no_sleep(monkeypatch):
+    """Collapse retry backoff waits to a bare yield to the loop."""
+    real_sleep = asyncio.sleep
+    monkeypatch.setattr("eumdac_fetch.downloader.asyncio.sleep", lambda *_: real_sleep(0))
+
+
+@pytest.fixture
+def state_db(_module_state_db):
+    """Hand out the shared StateDB and wipe its tables after each test.
+
+    StateDB commits after every write, which would release an enclosing
+    SAVEPOINT, so isolation is restored by truncating instead.
+    """
+    yield _module_state_db
+    conn = _module_state_db._conn
+    conn.execute("DELETE FROM products")
+    conn.execute("DELETE FROM search_results")
+    conn.commit()
+
+
 @pytest.fixture
 def download_dir(tmp_path):
     d = tmp_path / "downloads"
@@ -34,51 +63,125 @@ def download_dir(tmp_path):
 
 
 @pytest.fixture
-def service(state_db, download_dir):
-    return DownloadService(
-        state_db=state_db,
-        download_dir=download_dir,
-        parallel=2,
-        resume=True,
-        verify_md5=False,
-    )
+def make_service(state_db, download_dir):
+    """Factory for a DownloadService on the test DB and directory; one worker, no MD5 check by default."""
 
+    def _make(**overrides) -> DownloadService:
+        overrides.setdefault("parallel", 1)
+        overrides.setdefault("verify_md5", False)
+        return DownloadService(state_db=state_db, download_dir=download_dir, **overrides)
 
-def make_mock_product(product_id: str = "P1", content: bytes = b"test data", md5: str = ""):
-    """Create a mock product with open() returning a context manager yielding IO[bytes]."""
-    product = mock.MagicMock()
-    product.__str__ = mock.MagicMock(return_value=product_id)
-    product.size = 10  # KB
-    product.md5 = md5 or hashlib.md5(content).hexdigest()
+    return _make
+
+
+@pytest.fixture
+def service(make_service):
+    return make_service(parallel=2, resume=True)
+
+
+# Distinct payloads for multi-product tests, built once
+_CONTENTS = tuple(f"data{i}".encode() for i in range(16))
+
+
+@functools.cache
+def _md5(content: bytes) -> str:
+    """Hex MD5 of ``content``, memoized across the small shared test corpus."""
+    return hashlib.md5(content).hexdigest()
+
+
+class _FakeProduct:
+    """Plain-attribute stand-in for an eumdac product, without MagicMock overhead."""
+
+    __slots__ = ("_id", "_open_kwargs_log", "entries", "md5", "open", "size")
+
+    def __init__(self, product_id: str, *, size: float = 10, md5: str = "", entries: list[str] | None = None):
+        self._id = product_id
+        self.size = size  # KB
+        self.md5 = md5
+        self.open = None
+        if entries is not None:
+            self.entries = entries
+
+    def __str__(self) -> str:
+        return self._id
+
+
+class _RewindingOpen:
+    """Context manager handing out the same buffer, rewound, on every entry."""
+
+    __slots__ = ("buf",)
+
+    def __init__(self, buf: io.BytesIO):
+        self.buf = buf
+
+    def __enter__(self) -> io.BytesIO:
+        self.buf.seek(0)
+        return self.buf
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+
+# Spare buffers for the ad-hoc open() fakes; concurrent downloads each take their own
+_BUFFER_POOL: queue.LifoQueue[io.BytesIO] = queue.LifoQueue()
 
-    @contextmanager
-    def fake_open(**kwargs):
-        yield io.BytesIO(content)
 
-    product.open = fake_open
+@contextmanager
+def _pooled_buffer(content: bytes) -> Iterator[io.BytesIO]:
+    """Yield a pooled buffer holding ``content``, returning it to the pool on exit."""
+    try:
+        buf = _BUFFER_POOL.get_nowait()
+    except queue.Empty:
+        buf = io.BytesIO()
+    buf.seek(0)
+    buf.truncate()
+    buf.write(content)
+    buf.seek(0)
+    try:
+        yield buf
+    finally:
+        _BUFFER_POOL.put(buf)
+
+
+def make_mock_product(product_id: str = "P1", content: bytes = b"test data", md5: str = ""):
+    """Create a fake product with open() returning a context manager yielding IO[bytes]."""
+    product = _FakeProduct(product_id, md5=md5 or _md5(content))
+    # Opens are sequential per product (download, then MD5 check), so one rewound buffer serves them all
+    opener = _RewindingOpen(io.BytesIO(content))
+    product.open = lambda **_: opener
     return product, content
 
 
+def _log_args(caplog, template: str) -> list[tuple]:
+    """Args of each captured record logged with the unformatted message ``template``."""
+    return [r.args for r in caplog.records if r.msg == template]
+
+
 class TestDownloadService:
-    def test_download_creates_file(self, service, state_db, download_dir):
+    @pytest.fixture
+    def download_dir(self, fs):
+        """Download into a pyfakefs in-memory filesystem; the shared StateDB is already in-memory."""
+        return Path(fs.create_dir("/downloads").path)
+
+    def test_download_creates_file(self, service, state_db, download_dir, run):
         product, content = make_mock_product("P1")
 
-        asyncio.run(service.download_all([product], "job1", "COL1"))
+        run(service.download_all([product], "job1", "COL1"))
 
         path = download_dir / "P1"
         assert path.exists()
         assert path.read_bytes() == content
 
-    def test_download_updates_state(self, service, state_db):
+    def test_download_updates_state(self, service, state_db, run):
         product, _ = make_mock_product("P1")
 
-        asyncio.run(service.download_all([product], "job1", "COL1"))
+        run(service.download_all([product], "job1", "COL1"))
 
         record = state_db.get("P1", "job1")
         # Without MD5 verification, should be VERIFIED
         assert record.status == ProductStatus.VERIFIED
 
-    def test_download_skips_verified(self, service, state_db, download_dir):
+    def test_download_skips_verified(self, service, state_db, download_dir, run):
         product, _ = make_mock_product("P1")
 
         # Pre-mark as verified
@@ -91,59 +194,69 @@ class TestDownloadService:
             )
         )
 
-        asyncio.run(service.download_all([product], "job1", "COL1"))
+        run(service.download_all([product], "job1", "COL1"))
         # Should not have created a file since it was already verified
         assert not (download_dir / "P1").exists()
 
-    def test_download_multiple(self, service, state_db, download_dir):
-        products = []
-        for i in range(5):
-            p, _ = make_mock_product(f"P{i}", content=f"data{i}".encode())
-            products.append(p)
+    def test_download_multiple(self, state_db, download_dir, make_service, run):
+        products = [make_mock_product(f"P{i}", content=content)[0] for i, content in enumerate(_CONTENTS[:5])]
+        # One slot per product so all five run in a single scheduling round
+        svc = make_service(parallel=len(products), resume=True)
+
+        run(svc.download_all(products, "job1", "COL1"))
+
+        ids = {f"P{i}" for i in range(5)}
+        with os.scandir(download_dir) as it:
+            assert ids <= {entry.name for entry in it}
+        records = state_db.get_many(ids, "job1")
+        assert {pid: r.status for pid, r in records.items()} == dict.fromkeys(ids, ProductStatus.VERIFIED)
 
-        asyncio.run(service.download_all(products, "job1", "COL1"))
+    def test_parallel_bounds_concurrent_downloads(self, state_db, download_dir, make_service, run):
+        products = [make_mock_product(f"P{i}", content=content)[0] for i, content in enumerate(_CONTENTS[:5])]
+        svc = make_service(parallel=2)
+        active = peak = 0
+        download_one = svc._download_one
 
-        for i in range(5):
-            assert (download_dir / f"P{i}").exists()
+        async def tracking_download_one(*args):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0)
+            await download_one(*args)
+            active -= 1
 
-    def test_md5_verification_pass(self, state_db, download_dir):
+        svc._download_one = tracking_download_one
+        run(svc.download_all(products, "job1", "COL1"))
+
+        assert peak == 2
+        assert len(state_db.get_by_status("job1", ProductStatus.VERIFIED)) == 5
+
+    def test_md5_verification_pass(self, state_db, download_dir, make_service, run):
         content = b"hello world"
-        expected_md5 = hashlib.md5(content).hexdigest()
+        expected_md5 = _md5(content)
         product, _ = make_mock_product("P1", content=content, md5=expected_md5)
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=True,
-        )
+        svc = make_service(verify_md5=True)
 
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        run(svc.download_all([product], "job1", "COL1"))
 
         record = state_db.get("P1", "job1")
         assert record.status == ProductStatus.VERIFIED
 
-    def test_md5_verification_fail(self, state_db, download_dir):
+    def test_md5_verification_fail(self, state_db, download_dir, make_service, run):
         product, _ = make_mock_product("P1", content=b"real data", md5="wrong_md5")
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=True,
-        )
+        svc = make_service(verify_md5=True)
 
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        run(svc.download_all([product], "job1", "COL1"))
 
         record = state_db.get("P1", "job1")
         assert record.status == ProductStatus.FAILED
         assert "MD5" in record.error_message
 
-    def test_download_handles_non_retryable_failure(self, state_db, download_dir):
+    def test_download_handles_non_retryable_failure(self, state_db, download_dir, make_service, run):
         """Non-retryable errors fail immediately without retrying."""
-        product = mock.MagicMock()
-        product.__str__ = mock.MagicMock(return_value="P1")
-        product.size = 10
+        product = _FakeProduct("P1")
 
         call_count = 0
 
@@ -154,15 +267,9 @@ class TestDownloadService:
 
         product.open = raise_on_open
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-            max_retries=3,
-        )
+        svc = make_service(max_retries=3)
 
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        run(svc.download_all([product], "job1", "COL1"))
 
         record = state_db.get("P1", "job1")
         assert record.status == ProductStatus.FAILED
@@ -170,46 +277,49 @@ class TestDownloadService:
         # Non-retryable: should only be called once
         assert call_count == 1
 
-    def test_download_retries_on_connection_error(self, state_db, download_dir):
-        """ConnectionError triggers retry with eventual success."""
-        content = b"test data"
-        product = mock.MagicMock()
-        product.__str__ = mock.MagicMock(return_value="P1")
-        product.size = 10
-        product.md5 = ""
-
+    @pytest.mark.usefixtures("_no_sleep")
+    @pytest.mark.parametrize(
+        "exc",
+        [
+            ConnectionError("Connection reset"),
+            TimeoutError("Timed out"),
+            # Covers EUMDAC HTTP errors
+            requests.exceptions.ConnectionError("Connection aborted"),
+            http.client.IncompleteRead(b"partial", 100),
+            urllib3.exceptions.ProtocolError("Connection aborted", None),
+        ],
+        ids=["builtin-ConnectionError", "TimeoutError", "requests-ConnectionError", "IncompleteRead", "ProtocolError"],
+    )
+    def test_retryable_error_is_retried(self, state_db, download_dir, exc, make_service, run):
+        """Each retryable exception triggers a retry with eventual success."""
+        content = b"full data"
         call_count = 0
 
         @contextmanager
         def flaky_open(**kwargs):
             nonlocal call_count
             call_count += 1
-            if call_count < 3:
-                raise ConnectionError("Connection reset")
-            yield io.BytesIO(content)
+            if call_count == 1:
+                raise exc
+            with _pooled_buffer(content) as buf:
+                yield buf
 
+        product = _FakeProduct("P1")
         product.open = flaky_open
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-            max_retries=3,
-            retry_backoff=0.01,  # Fast for tests
-        )
+        svc = make_service(max_retries=2, retry_backoff=0.01)  # Fast for tests
 
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        run(svc.download_all([product], "job1", "COL1"))
 
         record = state_db.get("P1", "job1")
         assert record.status == ProductStatus.VERIFIED
-        assert call_count == 3  # 2 failures + 1 success
+        assert (download_dir / "P1").read_bytes() == content
+        assert call_count == 2  # 1 failure + 1 success
 
-    def test_download_exhausts_retries(self, state_db, download_dir):
+    @pytest.mark.usefixtures("_no_sleep")
+    def test_download_exhausts_retries(self, state_db, download_dir, make_service, run):
         """When all retries are exhausted, product is marked FAILED."""
-        product = mock.MagicMock()
-        product.__str__ = mock.MagicMock(return_value="P1")
-        product.size = 10
+        product = _FakeProduct("P1")
 
         call_count = 0
 
@@ -220,16 +330,9 @@ class TestDownloadService:
 
         product.open = always_fail
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-            max_retries=2,
-            retry_backoff=0.01,
-        )
+        svc = make_service(max_retries=2, retry_backoff=0.01)
 
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        run(svc.download_all([product], "job1", "COL1"))
 
         record = state_db.get("P1", "job1")
         assert record.status == ProductStatus.FAILED
@@ -237,121 +340,46 @@ class TestDownloadService:
         # max_retries=2 means 3 total attempts (1 initial + 2 retries)
         assert call_count == 3
 
-    def test_download_retries_on_timeout(self, state_db, download_dir):
-        """TimeoutError is also retryable."""
-        content = b"data"
-        product = mock.MagicMock()
-        product.__str__ = mock.MagicMock(return_value="P1")
-        product.size = 10
-        product.md5 = ""
-
-        call_count = 0
-
-        @contextmanager
-        def timeout_then_ok(**kwargs):
-            nonlocal call_count
-            call_count += 1
-            if call_count == 1:
-                raise TimeoutError("Timed out")
-            yield io.BytesIO(content)
-
-        product.open = timeout_then_ok
-
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-            max_retries=2,
-            retry_backoff=0.01,
-        )
-
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
-
-        record = state_db.get("P1", "job1")
-        assert record.status == ProductStatus.VERIFIED
-        assert call_count == 2
-
-    def test_download_retries_on_request_exception(self, state_db, download_dir):
-        """requests.exceptions.RequestException is retryable (covers EUMDAC HTTP errors)."""
-        content = b"satellite data"
-        product = mock.MagicMock()
-        product.__str__ = mock.MagicMock(return_value="P1")
-        product.size = 10
-        product.md5 = ""
-
-        call_count = 0
-
-        @contextmanager
-        def http_error_then_ok(**kwargs):
-            nonlocal call_count
-            call_count += 1
-            if call_count == 1:
-                raise requests.exceptions.ConnectionError("Connection aborted")
-            yield io.BytesIO(content)
-
-        product.open = http_error_then_ok
-
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-            max_retries=2,
-            retry_backoff=0.01,
-        )
-
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
-
-        record = state_db.get("P1", "job1")
-        assert record.status == ProductStatus.VERIFIED
-        assert call_count == 2
-
-    def test_download_timeout(self, state_db, download_dir):
+    def test_download_timeout(self, state_db, download_dir, monkeypatch, make_service, run):
         """Download that exceeds timeout should fail (TimeoutError is retryable)."""
-        product = mock.MagicMock()
-        product.__str__ = mock.MagicMock(return_value="P1")
-        product.size = 10
+        product, _ = make_mock_product("P1")
+        timeouts = []
 
-        @contextmanager
-        def slow_open(**kwargs):
-            time.sleep(2)
-            yield io.BytesIO(b"data")
+        async def expire_immediately(aw, timeout):
+            # Drop the never-started to_thread coroutine and report the timeout at once
+            aw.close()
+            timeouts.append(timeout)
+            raise TimeoutError
 
-        product.open = slow_open
+        monkeypatch.setattr("eumdac_fetch.downloader.asyncio.wait_for", expire_immediately)
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-            max_retries=0,
-            timeout=0.5,
-        )
+        svc = make_service(max_retries=0, timeout=0.5)
 
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        run(svc.download_all([product], "job1", "COL1"))
 
         record = state_db.get("P1", "job1")
         assert record.status == ProductStatus.FAILED
+        assert timeouts == [0.5]
+        assert not (download_dir / "P1").exists()
 
-    def test_disk_space_warning(self, state_db, download_dir, caplog):
+    def test_disk_space_warning(self, state_db, download_dir, caplog, monkeypatch, make_service, run):
         """Disk space warning is logged when free space is insufficient."""
-        product, content = make_mock_product("P1")
-        product.size = 999_999_999  # ~1 TB in KB
+        product, content = make_mock_product("P1")  # 10 KB estimated
+        probed = []
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-        )
+        def nearly_full(path):
+            probed.append(path)
+            return shutil._ntuple_diskusage(total=1_000_000_000, used=999_999_000, free=1_000)
 
-        import logging
+        monkeypatch.setattr("eumdac_fetch.downloader.shutil.disk_usage", nearly_full)
+
+        svc = make_service()
 
         with caplog.at_level(logging.WARNING, logger="eumdac_fetch"):
-            asyncio.run(svc.download_all([product], "job1", "COL1"))
+            run(svc.download_all([product], "job1", "COL1"))
 
-        assert any("Low disk space" in msg for msg in caplog.messages)
+        assert _log_args(caplog, "Low disk space: ~%.1f GB needed, %.1f GB free")
+        assert probed == [download_dir]
 
     def test_timeout_parameter_stored(self, state_db, download_dir):
         """Verify timeout parameter is stored on DownloadService."""
@@ -370,7 +398,7 @@ class TestDownloadService:
         )
         assert svc.timeout == 300.0
 
-    def test_product_size_exception_defaults_to_zero(self, state_db, download_dir):
+    def test_product_size_exception_defaults_to_zero(self, state_db, download_dir, make_service, run):
         """Product with .size raising an exception should default to 0."""
 
         class NoSizeProduct:
@@ -385,69 +413,54 @@ class TestDownloadService:
 
             @contextmanager
             def open(self, **kwargs):
-                yield io.BytesIO(b"data")
+                with _pooled_buffer(b"data") as buf:
+                    yield buf
 
         product = NoSizeProduct()
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-        )
+        svc = make_service()
 
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        run(svc.download_all([product], "job1", "COL1"))
 
         record = state_db.get("P1", "job1")
         assert record.size_kb == 0
         assert record.status == ProductStatus.VERIFIED
 
-    def test_resume_with_existing_partial_file(self, state_db, download_dir):
+    def test_resume_with_existing_partial_file(self, state_db, download_dir, make_service, run):
         """Resume appends to existing partial download."""
         # Create a partial file
         partial = download_dir / "P1"
         partial.write_bytes(b"partial")
 
         full_content = b"remaining data"
-        product = mock.MagicMock()
-        product.__str__ = mock.MagicMock(return_value="P1")
-        product.size = 10
-        product.md5 = ""
+        product = _FakeProduct("P1")
 
         open_kwargs_received = {}
 
         @contextmanager
         def resume_open(**kwargs):
             open_kwargs_received.update(kwargs)
-            yield io.BytesIO(full_content)
+            with _pooled_buffer(full_content) as buf:
+                yield buf
 
         product.open = resume_open
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            resume=True,
-            verify_md5=False,
-        )
+        svc = make_service(resume=True)
 
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        run(svc.download_all([product], "job1", "COL1"))
 
         record = state_db.get("P1", "job1")
         assert record.status == ProductStatus.VERIFIED
         # Should have tried byte-range resume with chunk=(offset, "")
         assert "chunk" in open_kwargs_received
 
-    def test_resume_fallback_on_range_not_supported(self, state_db, download_dir):
+    def test_resume_fallback_on_range_not_supported(self, state_db, download_dir, make_service, run):
         """When byte-range resume fails, falls back to full download."""
         partial = download_dir / "P1"
         partial.write_bytes(b"partial")
 
         full_content = b"full new data"
-        product = mock.MagicMock()
-        product.__str__ = mock.MagicMock(return_value="P1")
-        product.size = 10
-        product.md5 = ""
+        product = _FakeProduct("P1")
 
         call_count = [0]
 
@@ -456,19 +469,14 @@ class TestDownloadService:
             call_count[0] += 1
             if "chunk" in kwargs:
                 raise Exception("Range not supported")
-            yield io.BytesIO(full_content)
+            with _pooled_buffer(full_content) as buf:
+                yield buf
 
         product.open = resume_or_full
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            resume=True,
-            verify_md5=False,
-        )
+        svc = make_service(resume=True)
 
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        run(svc.download_all([product], "job1", "COL1"))
 
         record = state_db.get("P1", "job1")
         assert record.status == ProductStatus.VERIFIED
@@ -476,7 +484,7 @@ class TestDownloadService:
         assert call_count[0] == 2
         assert (download_dir / "P1").read_bytes() == full_content
 
-    def test_resume_disabled_ignores_partial(self, state_db, download_dir):
+    def test_resume_disabled_ignores_partial(self, state_db, download_dir, make_service, run):
         """With resume=False, existing partial files are overwritten."""
         partial = download_dir / "P1"
         partial.write_bytes(b"old partial data")
@@ -484,42 +492,32 @@ class TestDownloadService:
         new_content = b"fresh download"
         product, _ = make_mock_product("P1", content=new_content)
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            resume=False,
-            verify_md5=False,
-        )
+        svc = make_service(resume=False)
 
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        run(svc.download_all([product], "job1", "COL1"))
 
         assert (download_dir / "P1").read_bytes() == new_content
 
-    def test_shutdown_stops_download(self, state_db, download_dir):
+    def test_shutdown_stops_download(self, state_db, download_dir, make_service, run):
         """Requesting shutdown stops pending downloads."""
-        products = []
-        for i in range(5):
-            p, _ = make_mock_product(f"P{i}", content=f"data{i}".encode())
-            products.append(p)
+        products = [make_mock_product(f"P{i}", content=content)[0] for i, content in enumerate(_CONTENTS[:5])]
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-        )
+        svc = make_service()
 
         # Set shutdown before download starts
         svc.request_shutdown()
 
-        asyncio.run(svc.download_all(products, "job1", "COL1"))
+        run(svc.download_all(products, "job1", "COL1"))
 
         # Some or all products should not have been downloaded
-        downloaded = [f"P{i}" for i in range(5) if (download_dir / f"P{i}").exists()]
+        ids = {f"P{i}" for i in range(5)}
+        with os.scandir(download_dir) as it:
+            downloaded = ids & {entry.name for entry in it}
         assert len(downloaded) < 5
+        records = state_db.get_many(ids, "job1")
+        assert all(r.status != ProductStatus.VERIFIED for pid, r in records.items() if pid not in downloaded)
 
-    def test_product_not_in_search_results(self, state_db, download_dir, caplog):
+    def test_product_not_in_search_results(self, state_db, download_dir, caplog, make_service, run):
         """Products in state DB but not in product_map are skipped with warning."""
         product, content = make_mock_product("P1")
 
@@ -533,21 +531,14 @@ class TestDownloadService:
             )
         )
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-        )
-
-        import logging
+        svc = make_service()
 
         with caplog.at_level(logging.WARNING, logger="eumdac_fetch"):
-            asyncio.run(svc.download_all([product], "job1", "COL1"))
+            run(svc.download_all([product], "job1", "COL1"))
 
-        assert any("P_ORPHAN" in msg and "not found" in msg for msg in caplog.messages)
+        assert ("P_ORPHAN",) in _log_args(caplog, "Product %s not found in search results, skipping")
 
-    def test_md5_attribute_missing_skips_verification(self, state_db, download_dir):
+    def test_md5_attribute_missing_skips_verification(self, state_db, download_dir, make_service, run):
         """When product.md5 raises, verification is skipped (returns True)."""
         content = b"test data"
 
@@ -563,49 +554,38 @@ class TestDownloadService:
 
             @contextmanager
             def open(self, **kwargs):
-                yield io.BytesIO(content)
+                with _pooled_buffer(content) as buf:
+                    yield buf
 
         product = NoMd5Product()
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=True,
-        )
+        svc = make_service(verify_md5=True)
 
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        run(svc.download_all([product], "job1", "COL1"))
 
         record = state_db.get("P1", "job1")
         assert record.status == ProductStatus.VERIFIED
 
-    def test_md5_empty_string_skips_verification(self, state_db, download_dir):
+    def test_md5_empty_string_skips_verification(self, state_db, download_dir, make_service, run):
         """When product.md5 is empty string, verification passes."""
         content = b"test data"
-        product = mock.MagicMock()
-        product.__str__ = mock.MagicMock(return_value="P1")
-        product.size = 10
-        product.md5 = ""
+        product = _FakeProduct("P1")
 
         @contextmanager
         def fake_open(**kwargs):
-            yield io.BytesIO(content)
+            with _pooled_buffer(content) as buf:
+                yield buf
 
         product.open = fake_open
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=True,
-        )
+        svc = make_service(verify_md5=True)
 
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        run(svc.download_all([product], "job1", "COL1"))
 
         record = state_db.get("P1", "job1")
         assert record.status == ProductStatus.VERIFIED
 
-    def test_skips_processed_products(self, state_db, download_dir):
+    def test_skips_processed_products(self, state_db, download_dir, make_service, run):
         """Products with PROCESSED status are skipped."""
         product, _ = make_mock_product("P1")
         state_db.upsert(
@@ -617,32 +597,18 @@ class TestDownloadService:
             )
         )
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-        )
+        svc = make_service()
 
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        run(svc.download_all([product], "job1", "COL1"))
         assert not (download_dir / "P1").exists()
 
-    def test_shutdown_between_retries(self, state_db, download_dir):
+    @pytest.mark.usefixtures("_no_sleep")
+    def test_shutdown_between_retries(self, state_db, download_dir, make_service, run):
         """Shutdown flag checked between retry attempts aborts early."""
         attempt_count = [0]
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-            max_retries=3,
-            retry_backoff=0.01,
-        )
+        svc = make_service(max_retries=3, retry_backoff=0.01)
 
-        product = mock.MagicMock()
-        product.__str__ = mock.MagicMock(return_value="P1")
-        product.size = 10
-        product.md5 = ""
+        product = _FakeProduct("P1")
 
         @contextmanager
         def failing_open(**kwargs):
@@ -654,7 +620,7 @@ class TestDownloadService:
 
         product.open = failing_open
 
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        run(svc.download_all([product], "job1", "COL1"))
 
         # Should have tried only once; the shutdown flag prevents retry
         assert attempt_count[0] == 1
@@ -662,14 +628,9 @@ class TestDownloadService:
         # Status stays DOWNLOADING because shutdown aborted before FAILED update
         assert record.status in (ProductStatus.DOWNLOADING, ProductStatus.PENDING)
 
-    def test_shutdown_mid_stream(self, state_db, download_dir):
+    def test_shutdown_mid_stream(self, state_db, download_dir, make_service, run):
         """Shutdown flag during _stream_to_file stops reading and returns False."""
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-        )
+        svc = make_service()
 
         # Create a stream that sets shutdown after yielding a chunk
         class ShutdownStream:
@@ -687,8 +648,7 @@ class TestDownloadService:
                 # before reaching this point
                 return b"y" * size
 
-        product = mock.MagicMock()
-        product.__str__ = mock.MagicMock(return_value="P1")
+        product = _FakeProduct("P1")
         product.size = 100
         product.md5 = ""
 
@@ -698,177 +658,106 @@ class TestDownloadService:
 
         product.open = stream_open
 
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        run(svc.download_all([product], "job1", "COL1"))
 
         record = state_db.get("P1", "job1")
         # Download should not complete — shutdown interrupted _stream_to_file
         assert record.status != ProductStatus.VERIFIED
 
-    def test_incomplete_read_is_retried(self, state_db, download_dir):
-        """http.client.IncompleteRead is retried instead of failing permanently."""
-        content = b"full data"
-        call_count = [0]
 
-        @contextmanager
-        def flaky_open(**kwargs):
-            call_count[0] += 1
-            if call_count[0] == 1:
-                raise http.client.IncompleteRead(b"partial", 100)
-            yield io.BytesIO(content)
+class TestFileBackedState:
+    def test_status_writes_share_one_writer_thread(self, tmp_path, download_dir, run):
+        """With an on-disk database, async status writes all commit on the StateDB writer thread."""
+        db = StateDB(tmp_path / "state.db")
+        threads = set()
+        update_status = db.update_status
 
-        product = mock.MagicMock()
-        product.__str__ = mock.MagicMock(return_value="P1")
-        product.size = 10
-        product.md5 = ""
-        product.open = flaky_open
+        def recording_update_status(*args, **kwargs):
+            threads.add(threading.current_thread().name)
+            update_status(*args, **kwargs)
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-            max_retries=2,
-            retry_backoff=0.01,
-        )
-
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
-
-        record = state_db.get("P1", "job1")
-        assert record.status == ProductStatus.VERIFIED
-        assert call_count[0] == 2  # 1 failure + 1 success
-
-    def test_protocol_error_is_retried(self, state_db, download_dir):
-        """urllib3.exceptions.ProtocolError is retried instead of failing permanently."""
-        content = b"full data"
-        call_count = [0]
-
-        @contextmanager
-        def flaky_open(**kwargs):
-            call_count[0] += 1
-            if call_count[0] == 1:
-                raise urllib3.exceptions.ProtocolError("Connection aborted", None)
-            yield io.BytesIO(content)
-
-        product = mock.MagicMock()
-        product.__str__ = mock.MagicMock(return_value="P1")
-        product.size = 10
-        product.md5 = ""
-        product.open = flaky_open
-
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-            max_retries=2,
-            retry_backoff=0.01,
-        )
-
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
-
-        record = state_db.get("P1", "job1")
-        assert record.status == ProductStatus.VERIFIED
-        assert call_count[0] == 2
+        db.update_status = recording_update_status
+        products = [make_mock_product(f"P{i}", content=content)[0] for i, content in enumerate(_CONTENTS[:4])]
+        svc = DownloadService(state_db=db, download_dir=download_dir, parallel=2, verify_md5=False)
+        try:
+            run(svc.download_all(products, "job1", "COL1"))
+            assert len(db.get_by_status("job1", ProductStatus.VERIFIED)) == 4
+        finally:
+            db.close()
+        assert len(threads) == 1 and threads.pop().startswith("statedb-writer")
 
 
 class TestEntryMode:
     """Tests for entry-level (individual file) downloading."""
 
     def _make_entry_product(self, product_id: str, entries: list[str], content: bytes = b"nc data"):
-        """Create a mock product that exposes entries."""
-        product = mock.MagicMock()
-        product.__str__ = mock.MagicMock(return_value=product_id)
-        product.size = 50  # KB
-        product.md5 = ""
-        product.entries = entries
+        """Create a fake product that exposes entries."""
+        product = _FakeProduct(product_id, size=50, entries=entries)  # size in KB
 
         open_kwargs_log = []
+        openers: dict[str | None, _RewindingOpen] = {}
 
-        @contextmanager
         def fake_open(**kwargs):
             open_kwargs_log.append(kwargs)
-            yield io.BytesIO(content)
+            # Entries may download concurrently, so each gets its own reusable buffer
+            entry = kwargs.get("entry")
+            if (opener := openers.get(entry)) is None:
+                opener = openers[entry] = _RewindingOpen(io.BytesIO(content))
+            return opener
 
         product.open = fake_open
         product._open_kwargs_log = open_kwargs_log
         return product
 
-    def test_entry_mode_downloads_matched_entry(self, state_db, download_dir):
+    def test_entry_mode_downloads_matched_entry(self, state_db, download_dir, make_service, run):
         """Entry mode downloads only entries matching the glob pattern."""
         entries = ["product_0001.nc", "product_0002.nc", "metadata.xml"]
         product = self._make_entry_product("P1", entries)
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-            entries=["*.nc"],
-        )
+        svc = make_service(entries=["*.nc"])
 
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        run(svc.download_all([product], "job1", "COL1"))
 
         # Only .nc files should be downloaded
         assert (download_dir / "product_0001.nc").exists()
         assert (download_dir / "product_0002.nc").exists()
         assert not (download_dir / "metadata.xml").exists()
 
-    def test_entry_mode_passes_entry_to_open(self, state_db, download_dir):
+    def test_entry_mode_passes_entry_to_open(self, state_db, download_dir, make_service, run):
         """entry_name is forwarded to product.open(entry=...)."""
         entries = ["strip_0001.nc"]
         product = self._make_entry_product("P1", entries)
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-            entries=["*.nc"],
-        )
+        svc = make_service(entries=["*.nc"])
 
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        run(svc.download_all([product], "job1", "COL1"))
 
         assert len(product._open_kwargs_log) >= 1
         assert product._open_kwargs_log[-1].get("entry") == "strip_0001.nc"
 
-    def test_entry_mode_skips_unmatched(self, state_db, download_dir, caplog):
+    def test_entry_mode_skips_unmatched(self, state_db, download_dir, caplog, make_service, run):
         """Warning logged when no entries match the pattern."""
         entries = ["metadata.xml", "quicklook.png"]
         product = self._make_entry_product("P1", entries)
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-            entries=["*.nc"],
-        )
-
-        import logging
+        svc = make_service(entries=["*.nc"])
 
         with caplog.at_level(logging.WARNING, logger="eumdac_fetch"):
-            asyncio.run(svc.download_all([product], "job1", "COL1"))
+            run(svc.download_all([product], "job1", "COL1"))
 
-        assert any("No entries matched" in msg for msg in caplog.messages)
+        assert [args[-1] for args in _log_args(caplog, "No entries matched patterns %s for %s")] == ["P1"]
         assert not any((download_dir / f).exists() for f in entries)
 
-    def test_entry_mode_skips_md5_verification(self, state_db, download_dir):
+    def test_entry_mode_skips_md5_verification(self, state_db, download_dir, make_service, run):
         """MD5 is not verified for individual entries (hash covers whole product)."""
         entries = ["data_0001.nc"]
         product = self._make_entry_product("P1", entries, content=b"entry content")
         product.md5 = "badhash"  # Would fail if checked
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=True,  # Enabled globally but must be skipped per-entry
-            entries=["*.nc"],
-        )
-
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        # MD5 enabled globally but must be skipped per-entry
+        svc = make_service(verify_md5=True, entries=["*.nc"])
 
-        from eumdac_fetch.downloader import _encode_entry_key
+        run(svc.download_all([product], "job1", "COL1"))
 
         key = _encode_entry_key("P1", "data_0001.nc")
         record = state_db.get(key, "job1")
@@ -876,8 +765,6 @@ class TestEntryMode:
 
     def test_entry_mode_state_key_encoding(self, state_db, download_dir):
         """State DB key encodes both product_id and entry_name."""
-        from eumdac_fetch.downloader import _decode_entry_key, _encode_entry_key
-
         key = _encode_entry_key("EO:EUM:DAT:0665:P123", "body_0001.nc")
         assert "::entry::" in key
 
@@ -887,60 +774,61 @@ class TestEntryMode:
 
     def test_decode_whole_product_key(self):
         """Keys without entry suffix decode with entry_name=None."""
-        from eumdac_fetch.downloader import _decode_entry_key
-
         product_id, entry_name = _decode_entry_key("EO:EUM:DAT:0665:P123")
         assert product_id == "EO:EUM:DAT:0665:P123"
         assert entry_name is None
 
-    def test_entry_mode_handles_entries_error(self, state_db, download_dir, caplog):
+    def test_entry_matcher_agrees_with_fnmatch(self):
+        """The compiled matcher selects exactly what per-pattern fnmatch selects."""
+        patterns = ["*.nc", "body_00[0-9]?.h5", "manifest.xml"]
+        names = ["a/b/body_0001.nc", "body_0012.h5", "body_0100.h5", "x/manifest.xml", "manifest.xml.bak", "nc"]
+        matches = _entry_matcher(patterns)
+        for name in names:
+            expected = any(fnmatch.fnmatch(name.split("/")[-1], p) or fnmatch.fnmatch(name, p) for p in patterns)
+            assert matches(name) is expected, name
+        assert not _entry_matcher([])("anything.nc")
+
+    def test_entry_mode_handles_entries_error(self, state_db, download_dir, caplog, make_service, run):
         """When product.entries raises, product is skipped with warning."""
-        product = mock.MagicMock()
-        product.__str__ = mock.MagicMock(return_value="P1")
-        product.size = 10
-        type(product).entries = mock.PropertyMock(side_effect=Exception("API error"))
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-            entries=["*.nc"],
-        )
+        class NoEntriesProduct:
+            size = 10
+            md5 = ""
+
+            @property
+            def entries(self):
+                raise Exception("API error")
+
+            def __str__(self):
+                return "P1"
+
+        product = NoEntriesProduct()
 
-        import logging
+        svc = make_service(entries=["*.nc"])
 
         with caplog.at_level(logging.WARNING, logger="eumdac_fetch"):
-            asyncio.run(svc.download_all([product], "job1", "COL1"))
+            run(svc.download_all([product], "job1", "COL1"))
 
-        assert any("Could not list entries" in msg for msg in caplog.messages)
+        assert _log_args(caplog, "Could not list entries for %s, skipping") == [("P1",)]
 
-    def test_whole_product_mode_passes_none_entry(self, state_db, download_dir):
+    def test_whole_product_mode_passes_none_entry(self, state_db, download_dir, make_service, run):
         """In whole-product mode, entry=None is passed to product.open()."""
         content = b"zip content"
         open_kwargs_log = []
 
-        product = mock.MagicMock()
-        product.__str__ = mock.MagicMock(return_value="P1")
-        product.size = 10
-        product.md5 = ""
+        product = _FakeProduct("P1")
 
         @contextmanager
         def fake_open(**kwargs):
             open_kwargs_log.append(kwargs)
-            yield io.BytesIO(content)
+            with _pooled_buffer(content) as buf:
+                yield buf
 
         product.open = fake_open
 
-        svc = DownloadService(
-            state_db=state_db,
-            download_dir=download_dir,
-            parallel=1,
-            verify_md5=False,
-            entries=None,  # Whole-product mode
-        )
+        svc = make_service(entries=None)  # Whole-product mode
 
-        asyncio.run(svc.download_all([product], "job1", "COL1"))
+        run(svc.download_all([product], "job1", "COL1"))
 
         assert len(open_kwargs_log) >= 1
         assert open_kwargs_log[-1].get("entry") is None
@@ -3,10 +3,57 @@
 from __future__ import annotations
 
 import warnings
+from types import SimpleNamespace
 from unittest import mock
 
+import pytest
+
 import eumdac_fetch.env as env_module
-from eumdac_fetch.env import DEFAULT_VALIDITY, ENV, _Env, _load_credentials, _parse_dotenv
+from eumdac_fetch.env import DEFAULT_VALIDITY, ENV, _Env, _load_credentials, _parse_dotenv, _parse_dotenv_bytes
+
+
+@pytest.fixture(autouse=True)
+def _fresh_credentials():
+    """Drop memoized credentials so each test sees its own environment and stubs."""
+    env_module._load_credentials_cached.cache_clear()
+    yield
+    env_module._load_credentials_cached.cache_clear()
+
+
+@pytest.fixture(scope="class")
+def cred_home(tmp_path_factory):
+    """Home directory whose ``~/.eumdac/credentials`` holds ``file-key, file-secret``; built once per class."""
+    home = tmp_path_factory.mktemp("cred_home")
+    (home / ".eumdac").mkdir()
+    (home / ".eumdac" / "credentials").write_text("file-key, file-secret")
+    return home
+
+
+@pytest.fixture(scope="class")
+def empty_home(tmp_path_factory):
+    """Home directory without a credentials file; built once per class."""
+    return tmp_path_factory.mktemp("empty_home")
+
+
+@pytest.fixture(autouse=True)
+def fake_home(monkeypatch, empty_home):
+    """Resolve ``~`` to a directory without credentials unless a test repoints it."""
+    monkeypatch.setattr(env_module, "_home", lambda: empty_home)
+
+
+@pytest.fixture
+def fake_dotenv(monkeypatch):
+    """Serve ``.env`` contents from memory; ``mapping = None`` means no file."""
+    fake = SimpleNamespace(mapping=None)
+
+    def parse(path):
+        if fake.mapping is None:
+            raise FileNotFoundError(path)
+        return dict(fake.mapping)
+
+    monkeypatch.setattr(env_module, "_parse_dotenv", parse)
+    return fake
+
 
 # ---------------------------------------------------------------------------
 # _parse_dotenv
@@ -14,42 +61,53 @@ from eumdac_fetch.env import DEFAULT_VALIDITY, ENV, _Env, _load_credentials, _pa
 
 
 class TestParseDotenv:
-    def test_simple_key_value(self, tmp_path):
-        f = tmp_path / ".env"
-        f.write_text("EUMDAC_KEY=my-key\nEUMDAC_SECRET=my-secret\n")
-        assert _parse_dotenv(f) == {"EUMDAC_KEY": "my-key", "EUMDAC_SECRET": "my-secret"}
+    def test_simple_key_value(self):
+        data = b"EUMDAC_KEY=my-key\nEUMDAC_SECRET=my-secret\n"
+        assert _parse_dotenv_bytes(data) == {"EUMDAC_KEY": "my-key", "EUMDAC_SECRET": "my-secret"}
 
-    def test_double_quoted_value(self, tmp_path):
-        f = tmp_path / ".env"
-        f.write_text('EUMDAC_KEY="quoted-key"\n')
-        assert _parse_dotenv(f)["EUMDAC_KEY"] == "quoted-key"
+    def test_double_quoted_value(self):
+        data = b'EUMDAC_KEY="quoted-key"\n'
+        assert _parse_dotenv_bytes(data)["EUMDAC_KEY"] == "quoted-key"
 
-    def test_single_quoted_value(self, tmp_path):
-        f = tmp_path / ".env"
-        f.write_text("EUMDAC_KEY='quoted-key'\n")
-        assert _parse_dotenv(f)["EUMDAC_KEY"] == "quoted-key"
+    def test_single_quoted_value(self):
+        data = b"EUMDAC_KEY='quoted-key'\n"
+        assert _parse_dotenv_bytes(data)["EUMDAC_KEY"] == "quoted-key"
 
-    def test_ignores_comment_lines(self, tmp_path):
-        f = tmp_path / ".env"
-        f.write_text("# this is a comment\nEUMDAC_KEY=k\n")
-        result = _parse_dotenv(f)
+    def test_ignores_comment_lines(self):
+        data = b"# this is a comment\nEUMDAC_KEY=k\n"
+        result = _parse_dotenv_bytes(data)
         assert list(result.keys()) == ["EUMDAC_KEY"]
 
-    def test_ignores_blank_lines(self, tmp_path):
-        f = tmp_path / ".env"
-        f.write_text("\n\nEUMDAC_KEY=k\n\n")
-        assert _parse_dotenv(f) == {"EUMDAC_KEY": "k"}
+    def test_ignores_blank_lines(self):
+        data = b"\n\nEUMDAC_KEY=k\n\n"
+        assert _parse_dotenv_bytes(data) == {"EUMDAC_KEY": "k"}
 
-    def test_ignores_lines_without_equals(self, tmp_path):
+    def test_ignores_lines_without_equals(self):
+        data = b"NOTANASSIGNMENT\nEUMDAC_KEY=k\n"
+        assert _parse_dotenv_bytes(data) == {"EUMDAC_KEY": "k"}
+
+    def test_value_with_equals_sign(self):
+        """Only the first '=' is used as the separator."""
+        data = b"TOKEN=abc=def\n"
+        assert _parse_dotenv_bytes(data)["TOKEN"] == "abc=def"
+
+    def test_strips_blanks_and_indented_comments(self):
+        data = b"  # KEY=commented\n  EUMDAC_KEY =  spaced value \r\n"
+        assert _parse_dotenv_bytes(data) == {"EUMDAC_KEY": "spaced value"}
+
+    def test_only_matching_outer_quotes_removed(self):
+        data = b'A="x"y"\nB="unbalanced\nC=\'mixed"\nD=""\n'
+        assert _parse_dotenv_bytes(data) == {"A": 'x"y', "B": '"unbalanced', "C": "'mixed\"", "D": ""}
+
+    def test_reads_path(self, tmp_path):
         f = tmp_path / ".env"
-        f.write_text("NOTANASSIGNMENT\nEUMDAC_KEY=k\n")
+        f.write_text("EUMDAC_KEY=k\n")
         assert _parse_dotenv(f) == {"EUMDAC_KEY": "k"}
 
-    def test_value_with_equals_sign(self, tmp_path):
-        """Only the first '=' is used as the separator."""
+    def test_reads_path_with_crlf_and_utf8_value(self, tmp_path):
         f = tmp_path / ".env"
-        f.write_text("TOKEN=abc=def\n")
-        assert _parse_dotenv(f)["TOKEN"] == "abc=def"
+        f.write_bytes('# note\r\nEUMDAC_KEY = "k"\r\nEUMDAC_SECRET=sécret\r\n'.encode())
+        assert _parse_dotenv(f) == {"EUMDAC_KEY": "k", "EUMDAC_SECRET": "sécret"}
 
 
 # ---------------------------------------------------------------------------
@@ -66,6 +124,18 @@ class TestLoadCredentials:
         assert secret == "env-secret"
         assert validity == DEFAULT_VALIDITY
 
+    def test_env_vars_skip_file_sources(self, monkeypatch):
+        """A complete env-var pair returns before .env or the credentials file is touched."""
+        monkeypatch.setenv("EUMDAC_KEY", "env-key")
+        monkeypatch.setenv("EUMDAC_SECRET", "env-secret")
+        parse = mock.Mock(side_effect=AssertionError(".env must not be read"))
+        home = mock.Mock(side_effect=AssertionError("home must not be probed for credentials"))
+        monkeypatch.setattr(env_module, "_parse_dotenv", parse)
+        monkeypatch.setattr(env_module, "_home", home)
+        assert _load_credentials()[:2] == ("env-key", "env-secret")
+        parse.assert_not_called()
+        home.assert_not_called()
+
     def test_reads_validity_from_env_var(self, monkeypatch):
         monkeypatch.setenv("EUMDAC_KEY", "k")
         monkeypatch.setenv("EUMDAC_SECRET", "s")
@@ -84,85 +154,70 @@ class TestLoadCredentials:
         assert secret == "dotenv-secret"
         assert validity == DEFAULT_VALIDITY
 
-    def test_reads_validity_from_dotenv_file(self, tmp_path, monkeypatch):
-        (tmp_path / ".env").write_text("EUMDAC_KEY=k\nEUMDAC_SECRET=s\nEUMDAC_TOKEN_VALIDITY=7200\n")
-        monkeypatch.chdir(tmp_path)
+    def test_reads_validity_from_dotenv_file(self, monkeypatch, fake_dotenv):
+        fake_dotenv.mapping = {"EUMDAC_KEY": "k", "EUMDAC_SECRET": "s", "EUMDAC_TOKEN_VALIDITY": "7200"}
         monkeypatch.delenv("EUMDAC_KEY", raising=False)
         monkeypatch.delenv("EUMDAC_SECRET", raising=False)
         monkeypatch.delenv("EUMDAC_TOKEN_VALIDITY", raising=False)
         _, _, validity = _load_credentials()
         assert validity == 7200
 
-    def test_reads_from_credentials_file(self, tmp_path, monkeypatch):
-        cred_dir = tmp_path / ".eumdac"
-        cred_dir.mkdir()
-        (cred_dir / "credentials").write_text("file-key, file-secret")
-        monkeypatch.chdir(tmp_path)  # no .env here
+    def test_reads_from_credentials_file(self, cred_home, monkeypatch, fake_dotenv):
         monkeypatch.delenv("EUMDAC_KEY", raising=False)
         monkeypatch.delenv("EUMDAC_SECRET", raising=False)
         monkeypatch.delenv("EUMDAC_TOKEN_VALIDITY", raising=False)
-        with mock.patch("pathlib.Path.home", return_value=tmp_path):
-            key, secret, validity = _load_credentials()
+        monkeypatch.setattr(env_module, "_home", lambda: cred_home)
+        key, secret, validity = _load_credentials()
         assert key == "file-key"
         assert secret == "file-secret"
         assert validity == DEFAULT_VALIDITY
 
-    def test_credentials_file_no_trailing_whitespace(self, tmp_path, monkeypatch):
+    def test_credentials_file_no_trailing_whitespace(self, tmp_path, monkeypatch, fake_dotenv):
         """Whitespace around key/secret is stripped."""
         cred_dir = tmp_path / ".eumdac"
         cred_dir.mkdir()
         (cred_dir / "credentials").write_text("  spaced-key  ,  spaced-secret  ")
-        monkeypatch.chdir(tmp_path)
         monkeypatch.delenv("EUMDAC_KEY", raising=False)
         monkeypatch.delenv("EUMDAC_SECRET", raising=False)
         monkeypatch.delenv("EUMDAC_TOKEN_VALIDITY", raising=False)
-        with mock.patch("pathlib.Path.home", return_value=tmp_path):
-            key, secret, _ = _load_credentials()
+        monkeypatch.setattr(env_module, "_home", lambda: tmp_path)
+        key, secret, _ = _load_credentials()
         assert key == "spaced-key"
         assert secret == "spaced-secret"
 
-    def test_env_vars_take_priority_over_dotenv(self, tmp_path, monkeypatch):
-        (tmp_path / ".env").write_text("EUMDAC_KEY=dotenv-key\nEUMDAC_SECRET=dotenv-secret\n")
-        monkeypatch.chdir(tmp_path)
+    def test_env_vars_take_priority_over_dotenv(self, monkeypatch, fake_dotenv):
+        fake_dotenv.mapping = {"EUMDAC_KEY": "dotenv-key", "EUMDAC_SECRET": "dotenv-secret"}
         monkeypatch.setenv("EUMDAC_KEY", "env-key")
         monkeypatch.setenv("EUMDAC_SECRET", "env-secret")
         key, secret, _ = _load_credentials()
         assert key == "env-key"
         assert secret == "env-secret"
 
-    def test_dotenv_takes_priority_over_credentials_file(self, tmp_path, monkeypatch):
-        (tmp_path / ".env").write_text("EUMDAC_KEY=dotenv-key\nEUMDAC_SECRET=dotenv-secret\n")
-        cred_dir = tmp_path / ".eumdac"
-        cred_dir.mkdir()
-        (cred_dir / "credentials").write_text("file-key, file-secret")
-        monkeypatch.chdir(tmp_path)
+    def test_dotenv_takes_priority_over_credentials_file(self, cred_home, monkeypatch, fake_dotenv):
+        fake_dotenv.mapping = {"EUMDAC_KEY": "dotenv-key", "EUMDAC_SECRET": "dotenv-secret"}
         monkeypatch.delenv("EUMDAC_KEY", raising=False)
         monkeypatch.delenv("EUMDAC_SECRET", raising=False)
         monkeypatch.delenv("EUMDAC_TOKEN_VALIDITY", raising=False)
-        with mock.patch("pathlib.Path.home", return_value=tmp_path):
-            key, secret, _ = _load_credentials()
+        monkeypatch.setattr(env_module, "_home", lambda: cred_home)
+        key, secret, _ = _load_credentials()
         assert key == "dotenv-key"
         assert secret == "dotenv-secret"
 
-    def test_returns_none_when_nothing_found(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)  # no .env
+    def test_returns_none_when_nothing_found(self, monkeypatch, fake_dotenv):
         monkeypatch.delenv("EUMDAC_KEY", raising=False)
         monkeypatch.delenv("EUMDAC_SECRET", raising=False)
         monkeypatch.delenv("EUMDAC_TOKEN_VALIDITY", raising=False)
-        with mock.patch("pathlib.Path.home", return_value=tmp_path):
-            key, secret, validity = _load_credentials()
+        key, secret, validity = _load_credentials()
         assert key is None
         assert secret is None
         assert validity == DEFAULT_VALIDITY  # default always present
 
-    def test_empty_env_var_treated_as_missing(self, tmp_path, monkeypatch):
+    def test_empty_env_var_treated_as_missing(self, monkeypatch, fake_dotenv):
         """Empty env vars are treated as unset and do not short-circuit the chain."""
-        monkeypatch.chdir(tmp_path)  # no .env
         monkeypatch.setenv("EUMDAC_KEY", "")
         monkeypatch.setenv("EUMDAC_SECRET", "")
         monkeypatch.delenv("EUMDAC_TOKEN_VALIDITY", raising=False)
-        with mock.patch("pathlib.Path.home", return_value=tmp_path):  # no cred file
-            key, secret, _ = _load_credentials()
+        key, secret, _ = _load_credentials()
         assert not key
         assert not secret
 
@@ -173,6 +228,24 @@ class TestLoadCredentials:
         _, _, validity = _load_credentials()
         assert validity == DEFAULT_VALIDITY
 
+    def test_result_cached_while_environment_unchanged(self, monkeypatch, fake_dotenv):
+        monkeypatch.delenv("EUMDAC_KEY", raising=False)
+        monkeypatch.delenv("EUMDAC_SECRET", raising=False)
+        monkeypatch.delenv("EUMDAC_TOKEN_VALIDITY", raising=False)
+        fake_dotenv.mapping = {"EUMDAC_KEY": "first", "EUMDAC_SECRET": "s"}
+        assert _load_credentials()[0] == "first"
+        fake_dotenv.mapping = {"EUMDAC_KEY": "second", "EUMDAC_SECRET": "s"}
+        assert _load_credentials()[0] == "first"
+        env_module._load_credentials_cached.cache_clear()
+        assert _load_credentials()[0] == "second"
+
+    def test_env_var_change_invalidates_cache(self, monkeypatch):
+        monkeypatch.setenv("EUMDAC_KEY", "k1")
+        monkeypatch.setenv("EUMDAC_SECRET", "s")
+        assert _load_credentials()[0] == "k1"
+        monkeypatch.setenv("EUMDAC_KEY", "k2")
+        assert _load_credentials()[0] == "k2"
+
     def test_zero_validity_env_var_uses_default(self, monkeypatch):
         """Zero is not a valid validity; the default should be used."""
         monkeypatch.setenv("EUMDAC_KEY", "k")
@@ -201,8 +274,7 @@ class TestEnv:
         assert isinstance(ENV.validity, int)
         assert ENV.validity > 0
 
-    def test_env_validity_defaults_to_86400_when_unset(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
+    def test_env_validity_defaults_to_86400_when_unset(self, monkeypatch, fake_dotenv):
         monkeypatch.delenv("EUMDAC_TOKEN_VALIDITY", raising=False)
         monkeypatch.setenv("EUMDAC_KEY", "k")
         monkeypatch.setenv("EUMDAC_SECRET", "s")
@@ -216,27 +288,22 @@ class TestEnv:
         env = _Env()
         assert env.validity == 1800
 
-    def test_env_warns_when_no_credentials(self, tmp_path, monkeypatch):
-        monkeypatch.chdir(tmp_path)
+    def test_env_warns_when_no_credentials(self, monkeypatch, fake_dotenv):
         monkeypatch.delenv("EUMDAC_KEY", raising=False)
         monkeypatch.delenv("EUMDAC_SECRET", raising=False)
         monkeypatch.delenv("EUMDAC_TOKEN_VALIDITY", raising=False)
         monkeypatch.setattr(env_module, "_credentials_warning_emitted", False)
-        with mock.patch("pathlib.Path.home", return_value=tmp_path), warnings.catch_warnings(record=True) as caught:
-            warnings.simplefilter("always")
+        with pytest.warns(UserWarning, match="EUMDAC credentials not found") as caught:
             env = _Env()
         assert env.key is None
         assert env.secret is None
         assert len(caught) == 1
-        assert issubclass(caught[0].category, UserWarning)
-        assert "EUMDAC credentials not found" in str(caught[0].message)
 
     def test_env_no_warning_when_credentials_present(self, monkeypatch):
         monkeypatch.setenv("EUMDAC_KEY", "k")
         monkeypatch.setenv("EUMDAC_SECRET", "s")
-        with warnings.catch_warnings(record=True) as caught:
-            warnings.simplefilter("always")
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")  # any warning fails the test
             env = _Env()
         assert env.key == "k"
         assert env.secret == "s"
-        assert len(caught) == 0
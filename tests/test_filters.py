@@ -2,33 +2,45 @@
 
 from __future__ import annotations
 
-import asyncio
 import textwrap
+from dataclasses import dataclass
 from datetime import UTC, datetime, timedelta
+from types import SimpleNamespace
 from unittest import mock
 
 import pytest
 
+import eumdac_fetch.filters as filters_module
 from eumdac_fetch.filters import _REGISTRY, PostSearchFilterFn, build_filter, register
+from eumdac_fetch.models import AppConfig
 
 # ---------------------------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------------------------
 
 
-def _make_product(sensing_start: datetime) -> mock.MagicMock:
-    """Create a mock eumdac product with a real datetime sensing_start."""
-    p = mock.MagicMock()
-    p.sensing_start = sensing_start
-    p.__str__ = mock.MagicMock(return_value=str(sensing_start.timestamp()))
-    p.size = 100
-    return p
+@dataclass(slots=True, frozen=True)
+class _FakeProduct:
+    """Stand-in for an eumdac product: just the fields the filters read."""
 
+    sensing_start: datetime
+    size: int = 100
 
-def _products_at_offsets(*hours: float, base: datetime | None = None) -> list:
-    """Return mock products whose sensing_start is base + offset hours."""
-    if base is None:
-        base = datetime(2025, 1, 1, tzinfo=UTC)
+    def __str__(self) -> str:
+        return str(self.sensing_start.timestamp())
+
+
+# Reference sensing time the offset helpers and assertions count from
+_BASE = datetime(2025, 1, 1, tzinfo=UTC)
+
+
+def _make_product(sensing_start: datetime) -> _FakeProduct:
+    """Create a fake eumdac product with a real datetime sensing_start."""
+    return _FakeProduct(sensing_start)
+
+
+def _products_at_offsets(*hours: float, base: datetime = _BASE) -> list:
+    """Return fake products whose sensing_start is base + offset hours."""
     return [_make_product(base + timedelta(hours=h)) for h in hours]
 
 
@@ -55,6 +67,28 @@ class TestRegistry:
         finally:
             _REGISTRY.pop("_test_every", None)
 
+    def test_each_build_calls_factory(self):
+        """Stateful filters are never shared: every build gets a fresh filter from the factory."""
+
+        def counting_factory():
+            seen = []
+
+            def _f(products):
+                seen.extend(products)
+                return list(seen)
+
+            return _f
+
+        register("_test_stateful", counting_factory)
+        try:
+            first = build_filter("_test_stateful", {})
+            second = build_filter("_test_stateful", {})
+            assert first is not second
+            assert first([1, 2]) == [1, 2]
+            assert second([3]) == [3]
+        finally:
+            _REGISTRY.pop("_test_stateful", None)
+
     def test_build_filter_unknown_type_raises(self):
         """build_filter raises ValueError with helpful message for unknown types."""
         with pytest.raises(ValueError, match="Unknown post-search filter type 'nonexistent'"):
@@ -73,11 +107,17 @@ class TestRegistry:
         fake_module = mock.MagicMock()
         fake_module.my_factory = fake_factory
 
-        with mock.patch("importlib.import_module", return_value=fake_module) as mock_import:
-            result = build_filter("mymodule.sub:my_factory", {"keep_every": 3})
+        filters_module._resolve_factory.cache_clear()
+        try:
+            with mock.patch("importlib.import_module", return_value=fake_module) as mock_import:
+                result = build_filter("mymodule.sub:my_factory", {"keep_every": 3})
+                build_filter("mymodule.sub:my_factory", {"keep_every": 4})
+        finally:
+            filters_module._resolve_factory.cache_clear()
 
+        # The second build reuses the resolved factory without importing again
         mock_import.assert_called_once_with("mymodule.sub")
-        fake_factory.assert_called_once_with(keep_every=3)
+        assert fake_factory.call_args_list == [mock.call(keep_every=3), mock.call(keep_every=4)]
         assert result is sentinel_fn
 
 
@@ -102,9 +142,8 @@ class TestSampleInterval:
         fn = build_filter("sample_interval", {"interval_hours": 3})
         result = fn(products)
         assert len(result) == 2
-        base = datetime(2025, 1, 1, tzinfo=UTC)
-        assert result[0].sensing_start == base
-        assert result[1].sensing_start == base + timedelta(hours=3)
+        assert result[0].sensing_start == _BASE
+        assert result[1].sensing_start == _BASE + timedelta(hours=3)
 
     def test_products_within_same_bucket_only_first_kept(self):
         """Multiple products in the same bucket → only the earliest is kept."""
@@ -112,8 +151,7 @@ class TestSampleInterval:
         fn = build_filter("sample_interval", {"interval_hours": 3})
         result = fn(products)
         assert len(result) == 1
-        base = datetime(2025, 1, 1, tzinfo=UTC)
-        assert result[0].sensing_start == base
+        assert result[0].sensing_start == _BASE
 
     def test_each_product_in_own_bucket(self):
         """When products are each in their own bucket, all are kept."""
@@ -124,13 +162,12 @@ class TestSampleInterval:
 
     def test_unsorted_input_sorted_before_bucketing(self):
         """Products out of chronological order are sorted before bucketing."""
-        base = datetime(2025, 1, 1, tzinfo=UTC)
         # Provide products in reverse order; the first in the bucket (t=0) must be kept
         products = _products_at_offsets(2, 1, 0)  # reversed
         fn = build_filter("sample_interval", {"interval_hours": 3})
         result = fn(products)
         assert len(result) == 1
-        assert result[0].sensing_start == base
+        assert result[0].sensing_start == _BASE
 
 
 # ---------------------------------------------------------------------------
@@ -141,26 +178,44 @@ class TestSampleInterval:
 class TestPipelineAppliesFilter:
     """Verify that _search_with_cache applies the post_search_filter before caching."""
 
-    def _make_job(self, tmp_path, filter_cfg=None):
-        from eumdac_fetch.models import (
-            AppConfig,
-            DownloadConfig,
-            JobConfig,
-            PostProcessConfig,
-            SearchFilters,
-        )
+    @pytest.fixture
+    def pipeline_env(self, tmp_path):
+        """Patch the pipeline's collaborators and yield the mocks the tests steer and inspect."""
+        products = []
+        for product_id in ("P1", "P2"):
+            product = mock.MagicMock()
+            product.__str__ = mock.MagicMock(return_value=product_id)
+            product.size = 10
+            products.append(product)
 
-        job = JobConfig(
-            name="test-job",
-            collection="COL1",
-            filters=SearchFilters(),
-            download=DownloadConfig(directory=tmp_path / "downloads", parallel=1),
-            post_process=PostProcessConfig(enabled=False),
-            post_search_filter=filter_cfg,
-        )
-        return AppConfig(jobs=[job])
+        mock_session = mock.MagicMock()
+        mock_session.session_id = "abc"
+        mock_session.session_dir = tmp_path / "sessions" / "abc"
+        mock_session.download_dir = tmp_path / "downloads" / "COL1"
+        mock_session.state_db_path = tmp_path / "sessions" / "abc" / "state.db"
+        mock_session.log_path = tmp_path / "sessions" / "abc" / "session.log"
+        mock_session.is_new = True
+        mock_session.is_live = True
+        mock_session.session_dir.mkdir(parents=True, exist_ok=True)
+        mock_session.download_dir.mkdir(parents=True, exist_ok=True)
 
-    def test_filter_applied_before_cache(self, tmp_path):
+        with mock.patch.multiple(
+            "eumdac_fetch.pipeline",
+            SearchService=mock.DEFAULT,
+            Session=mock.DEFAULT,
+            add_session_log_handler=mock.DEFAULT,
+            StateDB=mock.DEFAULT,
+            DownloadService=mock.DEFAULT,
+        ) as patched:
+            patched["Session"].return_value = mock_session
+            search = patched["SearchService"].return_value
+            search.iter_products.return_value = products
+            state = patched["StateDB"].return_value
+            state.has_cached_search.return_value = False
+            patched["DownloadService"].return_value.download_all = mock.AsyncMock()
+            yield SimpleNamespace(products=products, search=search, state=state)
+
+    def test_filter_applied_before_cache(self, pipeline_env, make_job, run):
         """When post_search_filter is set, it runs before cache_search_results."""
         from eumdac_fetch.models import PostSearchFilterConfig
         from eumdac_fetch.pipeline import Pipeline
@@ -174,96 +229,24 @@ class TestPipelineAppliesFilter:
         register("_pipeline_test_filter", _factory)
 
         try:
-            app_config = self._make_job(tmp_path, filter_cfg)
-            pipeline = Pipeline(token=mock.MagicMock(), config=app_config)
-
-            mock_product = mock.MagicMock()
-            mock_product.__str__ = mock.MagicMock(return_value="P1")
-            mock_product.size = 10
-            mock_product2 = mock.MagicMock()
-            mock_product2.__str__ = mock.MagicMock(return_value="P2")
-            mock_product2.size = 10
-
-            mock_session = mock.MagicMock()
-            mock_session.session_id = "abc"
-            mock_session.session_dir = tmp_path / "sessions" / "abc"
-            mock_session.download_dir = tmp_path / "downloads" / "COL1"
-            mock_session.state_db_path = tmp_path / "sessions" / "abc" / "state.db"
-            mock_session.log_path = tmp_path / "sessions" / "abc" / "session.log"
-            mock_session.is_new = True
-            mock_session.is_live = True
-            mock_session.initialize = mock.MagicMock()
-            mock_session.session_dir.mkdir(parents=True, exist_ok=True)
-            mock_session.download_dir.mkdir(parents=True, exist_ok=True)
-
-            with (
-                mock.patch("eumdac_fetch.pipeline.SearchService") as mock_search_cls,
-                mock.patch("eumdac_fetch.pipeline.Session", return_value=mock_session),
-                mock.patch("eumdac_fetch.pipeline.add_session_log_handler") as mock_log,
-                mock.patch("eumdac_fetch.pipeline.StateDB") as mock_state_cls,
-                mock.patch("eumdac_fetch.pipeline.DownloadService") as mock_dl_cls,
-            ):
-                mock_search = mock_search_cls.return_value
-                mock_search.iter_products.return_value = [mock_product, mock_product2]
-                mock_log.return_value = mock.MagicMock()
-                mock_state = mock_state_cls.return_value
-                mock_state.has_cached_search.return_value = False
-                mock_state.close = mock.MagicMock()
-                mock_dl = mock_dl_cls.return_value
-                mock_dl.download_all = mock.AsyncMock()
-
-                asyncio.run(pipeline.run())
-
-                # Only the first product (after filter) should have been cached
-                mock_state.cache_search_results.assert_called_once_with([mock_product], "COL1")
+            pipeline = Pipeline(
+                token=mock.MagicMock(), config=AppConfig(jobs=[make_job(post_search_filter=filter_cfg)])
+            )
+            run(pipeline.run())
         finally:
             _REGISTRY.pop("_pipeline_test_filter", None)
 
-    def test_no_filter_caches_all(self, tmp_path):
+        # Only the first product (after filter) should have been cached
+        pipeline_env.state.cache_search_results.assert_called_once_with(pipeline_env.products[:1], "COL1")
+
+    def test_no_filter_caches_all(self, pipeline_env, make_job, run):
         """When no post_search_filter, all products are cached."""
         from eumdac_fetch.pipeline import Pipeline
 
-        app_config = self._make_job(tmp_path, filter_cfg=None)
-        pipeline = Pipeline(token=mock.MagicMock(), config=app_config)
-
-        mock_product = mock.MagicMock()
-        mock_product.__str__ = mock.MagicMock(return_value="P1")
-        mock_product.size = 10
-        mock_product2 = mock.MagicMock()
-        mock_product2.__str__ = mock.MagicMock(return_value="P2")
-        mock_product2.size = 10
-
-        mock_session = mock.MagicMock()
-        mock_session.session_id = "abc"
-        mock_session.session_dir = tmp_path / "sessions" / "abc"
-        mock_session.download_dir = tmp_path / "downloads" / "COL1"
-        mock_session.state_db_path = tmp_path / "sessions" / "abc" / "state.db"
-        mock_session.log_path = tmp_path / "sessions" / "abc" / "session.log"
-        mock_session.is_new = True
-        mock_session.is_live = True
-        mock_session.initialize = mock.MagicMock()
-        mock_session.session_dir.mkdir(parents=True, exist_ok=True)
-        mock_session.download_dir.mkdir(parents=True, exist_ok=True)
-
-        with (
-            mock.patch("eumdac_fetch.pipeline.SearchService") as mock_search_cls,
-            mock.patch("eumdac_fetch.pipeline.Session", return_value=mock_session),
-            mock.patch("eumdac_fetch.pipeline.add_session_log_handler") as mock_log,
-            mock.patch("eumdac_fetch.pipeline.StateDB") as mock_state_cls,
-            mock.patch("eumdac_fetch.pipeline.DownloadService") as mock_dl_cls,
-        ):
-            mock_search = mock_search_cls.return_value
-            mock_search.iter_products.return_value = [mock_product, mock_product2]
-            mock_log.return_value = mock.MagicMock()
-            mock_state = mock_state_cls.return_value
-            mock_state.has_cached_search.return_value = False
-            mock_state.close = mock.MagicMock()
-            mock_dl = mock_dl_cls.return_value
-            mock_dl.download_all = mock.AsyncMock()
-
-            asyncio.run(pipeline.run())
+        pipeline = Pipeline(token=mock.MagicMock(), config=AppConfig(jobs=[make_job()]))
+        run(pipeline.run())
 
-            mock_state.cache_search_results.assert_called_once_with([mock_product, mock_product2], "COL1")
+        pipeline_env.state.cache_search_results.assert_called_once_with(pipeline_env.products, "COL1")
 
 
 # ---------------------------------------------------------------------------
@@ -293,38 +276,23 @@ class TestConfigParsing:
         assert job.post_search_filter.type == "sample_interval"
         assert job.post_search_filter.params == {"interval_hours": 3}
 
-    def test_no_post_search_filter_is_none(self, tmp_path):
+    def test_no_post_search_filter_is_none(self):
         """Jobs without post_search_filter have None."""
-        config_file = tmp_path / "job.yaml"
-        config_file.write_text(
-            textwrap.dedent("""\
-            jobs:
-              - name: "plain-job"
-                collection: "EO:EUM:DAT:0665"
-            """)
-        )
-        from eumdac_fetch.config import load_config
+        from eumdac_fetch.config import load_config_from_dict
 
-        app_config = load_config(config_file)
+        app_config = load_config_from_dict({"jobs": [{"name": "plain-job", "collection": "EO:EUM:DAT:0665"}]})
         assert app_config.jobs[0].post_search_filter is None
 
-    def test_custom_filter_type_and_multiple_params(self, tmp_path):
+    def test_custom_filter_type_and_multiple_params(self):
         """Custom 'module:factory' type and multiple extra params are stored correctly."""
-        config_file = tmp_path / "job.yaml"
-        config_file.write_text(
-            textwrap.dedent("""\
-            jobs:
-              - name: "custom-filter-job"
-                collection: "EO:EUM:DAT:0665"
-                post_search_filter:
-                  type: "mymodule:my_factory"
-                  keep_every: 5
-                  min_size_kb: 100
-            """)
-        )
-        from eumdac_fetch.config import load_config
-
-        app_config = load_config(config_file)
+        from eumdac_fetch.config import load_config_from_dict
+
+        job = {
+            "name": "custom-filter-job",
+            "collection": "EO:EUM:DAT:0665",
+            "post_search_filter": {"type": "mymodule:my_factory", "keep_every": 5, "min_size_kb": 100},
+        }
+        app_config = load_config_from_dict({"jobs": [job]})
         psf = app_config.jobs[0].post_search_filter
         assert psf is not None
         assert psf.type == "mymodule:my_factory"
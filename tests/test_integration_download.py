@@ -9,8 +9,10 @@ Run with:
 
 from __future__ import annotations
 
-import asyncio
+import functools
+import itertools
 import os
+import posixpath
 import shutil
 from datetime import UTC, datetime
 from pathlib import Path
@@ -23,10 +25,12 @@ TEST_DTSTART = datetime(2025, 3, 15, 10, 0, 0, tzinfo=UTC)
 TEST_DTEND = datetime(2025, 3, 15, 12, 0, 0, tzinfo=UTC)
 
 
+@functools.lru_cache(maxsize=1)
 def _load_credentials() -> tuple[str, str] | None:
     """Load credentials from env vars, then ~/.eumdac/credentials.
 
-    Returns (key, secret) or None if unavailable.
+    Returns (key, secret) or None if unavailable.  Memoized for the session so
+    the credentials file is read at most once however many fixtures ask.
     """
     key = os.environ.get("EUMDAC_KEY", "")
     secret = os.environ.get("EUMDAC_SECRET", "")
@@ -60,6 +64,16 @@ def eumdac_token(credentials):
     return get_token()
 
 
+@pytest.fixture(scope="module")
+def window_products(eumdac_token):
+    """First two products of the test window, searched once per module."""
+    from eumdac_fetch.models import SearchFilters
+    from eumdac_fetch.search import SearchService
+
+    filters = SearchFilters(dtstart=TEST_DTSTART, dtend=TEST_DTEND)
+    return SearchService(eumdac_token).search(COLLECTION_ID, filters, limit=2).products
+
+
 @pytest.fixture(scope="module")
 def download_dir(tmp_path_factory):
     """Temporary directory for downloads, cleaned up after tests."""
@@ -68,6 +82,32 @@ def download_dir(tmp_path_factory):
     shutil.rmtree(d, ignore_errors=True)
 
 
+def test_load_credentials_reads_file_once(tmp_path, monkeypatch):
+    """Repeat lookups are served from the cache, not from disk."""
+    cred_dir = tmp_path / ".eumdac"
+    cred_dir.mkdir()
+    (cred_dir / "credentials").write_text("k,s")
+    monkeypatch.delenv("EUMDAC_KEY", raising=False)
+    monkeypatch.delenv("EUMDAC_SECRET", raising=False)
+    monkeypatch.setattr(Path, "home", lambda: tmp_path)
+
+    reads = []
+    original = Path.read_text
+
+    def _counting_read_text(self, *args, **kwargs):
+        reads.append(self)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(Path, "read_text", _counting_read_text)
+    _load_credentials.cache_clear()
+    try:
+        assert _load_credentials() == ("k", "s")
+        assert _load_credentials() == ("k", "s")
+        assert len(reads) == 1
+    finally:
+        _load_credentials.cache_clear()
+
+
 @pytest.mark.integration
 class TestRealDownload:
     """Integration tests that hit the real EUMDAC API."""
@@ -90,19 +130,13 @@ class TestRealDownload:
             print(f"  {p}")
         assert len(result.products) > 0
 
-    def test_download_products(self, eumdac_token, download_dir):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_download_products(self, window_products, download_dir):
         """Download products from a 2-hour window and verify files land on disk."""
-        import asyncio
-
         from eumdac_fetch.downloader import DownloadService
-        from eumdac_fetch.models import SearchFilters
-        from eumdac_fetch.search import SearchService
         from eumdac_fetch.state import StateDB
 
-        service = SearchService(eumdac_token)
-        filters = SearchFilters(dtstart=TEST_DTSTART, dtend=TEST_DTEND)
-        result = service.search(COLLECTION_ID, filters, limit=2)
-        products = result.products
+        products = window_products
 
         assert len(products) > 0, "Need at least 1 product to test download"
         print(f"\nWill download {len(products)} product(s) to {download_dir}")
@@ -117,7 +151,7 @@ class TestRealDownload:
                 verify_md5=True,
             )
 
-            asyncio.run(download_service.download_all(products, "integration-test", COLLECTION_ID))
+            await download_service.download_all(products, "integration-test", COLLECTION_ID)
 
             # Check state DB for results
             from eumdac_fetch.models import ProductStatus
@@ -147,7 +181,8 @@ class TestRealDownload:
         finally:
             state_db.close()
 
-    def test_resume_after_kill(self, eumdac_token, tmp_path_factory):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_resume_after_kill(self, eumdac_token, window_products, tmp_path_factory):
         """Simulate process kill after 1st file done + ~5% of 2nd, then resume.
 
         Verifies the 2nd download resumes from the partial file (byte-range)
@@ -161,10 +196,7 @@ class TestRealDownload:
         dl_dir = tmp_path_factory.mktemp("resume_test")
         db_path = dl_dir / ".state.db"
 
-        service = SearchService(eumdac_token)
-        filters = SearchFilters(dtstart=TEST_DTSTART, dtend=TEST_DTEND)
-        result = service.search(COLLECTION_ID, filters, limit=2)
-        products = result.products
+        products = window_products
         assert len(products) >= 2, "Need at least 2 products for resume test"
 
         p1, p2 = products[0], products[1]
@@ -181,7 +213,7 @@ class TestRealDownload:
                 resume=True,
                 verify_md5=True,
             )
-            asyncio.run(svc.download_all([p1], "resume-job", COLLECTION_ID))
+            await svc.download_all([p1], "resume-job", COLLECTION_ID)
             rec1 = state_db.get(str(p1), "resume-job")
             assert rec1.status == ProductStatus.VERIFIED, f"Product 1 should be verified, got {rec1.status}"
             print(f"\nProduct 1 downloaded and verified: {rec1.bytes_downloaded:,} bytes")
@@ -206,19 +238,14 @@ class TestRealDownload:
             )
             state_db.update_status(p2_id, "resume-job", ProductStatus.DOWNLOADING)
 
-            # Manually download ~5% of product 2
+            # Manually download ~5% of product 2 with a byte-range request, so
+            # the server sends only the prefix instead of us truncating a full stream
             p2_path = dl_dir / p2_id
-            ctx = p2.open()
-            bytes_written = 0
-            with ctx as stream, open(p2_path, "wb") as f:
-                while bytes_written < target_bytes:
-                    data = stream.read(CHUNK_SIZE)
-                    if not data:
-                        break
-                    f.write(data)
-                    bytes_written += len(data)
+            with p2.open(chunk=(0, target_bytes)) as stream, open(p2_path, "wb") as f:
+                shutil.copyfileobj(stream, f, CHUNK_SIZE)
 
             partial_size = p2_path.stat().st_size
+            assert 0 < partial_size <= target_bytes, "Range request was not honoured (expected a 206 prefix)"
             print(
                 f"Product 2 partially downloaded: {partial_size:,} / ~{p2_size_bytes:,} bytes ({partial_size * 100 // p2_size_bytes if p2_size_bytes else 0}%)"
             )
@@ -234,7 +261,9 @@ class TestRealDownload:
             print(f"Reset {reset_count} stale download(s)")
             assert reset_count == 1, f"Expected 1 stale reset, got {reset_count}"
 
-            # Re-search for products (needed for product objects)
+            # Re-search for products, as a restarted process would
+            service = SearchService(eumdac_token)
+            filters = SearchFilters(dtstart=TEST_DTSTART, dtend=TEST_DTEND)
             result2 = service.search(COLLECTION_ID, filters, limit=2)
             products2 = result2.products
 
@@ -245,7 +274,7 @@ class TestRealDownload:
                 resume=True,
                 verify_md5=True,
             )
-            asyncio.run(svc2.download_all(products2, "resume-job", COLLECTION_ID))
+            await svc2.download_all(products2, "resume-job", COLLECTION_ID)
 
             # Verify product 2 completed
             rec2 = state_db2.get(p2_id, "resume-job")
@@ -273,20 +302,17 @@ class TestRealDownload:
             state_db2.close()
             shutil.rmtree(dl_dir, ignore_errors=True)
 
-    def test_download_single_entry(self, eumdac_token, tmp_path_factory):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_download_single_entry(self, window_products, tmp_path_factory):
         """Download a single NetCDF entry from an FCI product."""
         from eumdac_fetch.downloader import DownloadService
-        from eumdac_fetch.models import ProductStatus, SearchFilters
-        from eumdac_fetch.search import SearchService
+        from eumdac_fetch.models import ProductStatus
         from eumdac_fetch.state import StateDB
 
         dl_dir = tmp_path_factory.mktemp("single_entry")
         state_db = StateDB(dl_dir / ".state.db")
         try:
-            service = SearchService(eumdac_token)
-            filters = SearchFilters(dtstart=TEST_DTSTART, dtend=TEST_DTEND)
-            result = service.search(COLLECTION_ID, filters, limit=1)
-            products = result.products
+            products = window_products[:1]
             assert len(products) > 0, "Need at least 1 product"
 
             product = products[0]
@@ -294,9 +320,9 @@ class TestRealDownload:
             print(f"\nProduct {product} has {len(all_entries)} entries")
 
             # Pick the first .nc entry
-            nc_entries = [e for e in all_entries if e.endswith(".nc")]
-            assert nc_entries, "Expected at least one .nc entry"
-            target_pattern = nc_entries[0].split("/")[-1]
+            first_nc = next((e for e in all_entries if e.endswith(".nc")), None)
+            assert first_nc, "Expected at least one .nc entry"
+            target_pattern = posixpath.basename(first_nc)
             print(f"Downloading single entry: {target_pattern}")
 
             download_service = DownloadService(
@@ -308,7 +334,7 @@ class TestRealDownload:
                 entries=[target_pattern],
             )
 
-            asyncio.run(download_service.download_all(products, "single-entry-test", COLLECTION_ID))
+            await download_service.download_all(products, "single-entry-test", COLLECTION_ID)
 
             all_records = state_db.get_all("single-entry-test")
             print(f"State DB records: {len(all_records)}")
@@ -325,36 +351,35 @@ class TestRealDownload:
             path = dl_dir / target_pattern
             assert path.exists(), f"Entry file missing: {path}"
             assert path.stat().st_size > 0
-            magic = path.read_bytes()[:4]
+            with path.open("rb") as fh:
+                magic = fh.read(4)
             assert magic != b"PK\x03\x04", "Expected raw NetCDF4/HDF5, not ZIP"
             print(f"Entry downloaded: {path.name} ({path.stat().st_size:,} bytes), magic={magic!r}")
 
         finally:
             state_db.close()
 
-    def test_download_two_entries(self, eumdac_token, tmp_path_factory):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_download_two_entries(self, window_products, tmp_path_factory):
         """Download two NetCDF entries from an FCI product using a glob pattern."""
         from eumdac_fetch.downloader import DownloadService
-        from eumdac_fetch.models import ProductStatus, SearchFilters
-        from eumdac_fetch.search import SearchService
+        from eumdac_fetch.models import ProductStatus
         from eumdac_fetch.state import StateDB
 
         dl_dir = tmp_path_factory.mktemp("two_entries")
         state_db = StateDB(dl_dir / ".state.db")
         try:
-            service = SearchService(eumdac_token)
-            filters = SearchFilters(dtstart=TEST_DTSTART, dtend=TEST_DTEND)
-            result = service.search(COLLECTION_ID, filters, limit=1)
-            products = result.products
+            products = window_products[:1]
             assert len(products) > 0, "Need at least 1 product"
 
             product = products[0]
             all_entries = product.entries
-            nc_entries = [e for e in all_entries if e.endswith(".nc")]
-            assert len(nc_entries) >= 2, f"Need at least 2 .nc entries, found {len(nc_entries)}"
+            # Stop scanning the listing once two .nc entries are found
+            nc_entries = list(itertools.islice((e for e in all_entries if e.endswith(".nc")), 2))
+            assert len(nc_entries) == 2, f"Need at least 2 .nc entries, found {len(nc_entries)}"
 
             # Download first two .nc entries by their filenames
-            target_names = [e.split("/")[-1] for e in nc_entries[:2]]
+            target_names = list(map(posixpath.basename, nc_entries))
             print(f"\nDownloading 2 entries: {target_names}")
 
             download_service = DownloadService(
@@ -366,7 +391,7 @@ class TestRealDownload:
                 entries=target_names,
             )
 
-            asyncio.run(download_service.download_all(products, "two-entry-test", COLLECTION_ID))
+            await download_service.download_all(products, "two-entry-test", COLLECTION_ID)
 
             all_records = state_db.get_all("two-entry-test")
             print(f"State DB records: {len(all_records)}")
@@ -383,26 +408,22 @@ class TestRealDownload:
                 path = dl_dir / name
                 assert path.exists(), f"Entry file missing: {path}"
                 assert path.stat().st_size > 0
-                magic = path.read_bytes()[:4]
+                with path.open("rb") as fh:
+                    magic = fh.read(4)
                 assert magic != b"PK\x03\x04", f"Expected raw NetCDF4/HDF5 for {name}, not ZIP"
                 print(f"Entry downloaded: {name} ({path.stat().st_size:,} bytes)")
 
         finally:
             state_db.close()
 
-    def test_download_is_resumable(self, eumdac_token, download_dir):
+    @pytest.mark.asyncio(loop_scope="module")
+    async def test_download_is_resumable(self, window_products, download_dir):
         """Running download again skips already-verified products."""
-        import asyncio
-
         from eumdac_fetch.downloader import DownloadService
-        from eumdac_fetch.models import ProductStatus, SearchFilters
-        from eumdac_fetch.search import SearchService
+        from eumdac_fetch.models import ProductStatus
         from eumdac_fetch.state import StateDB
 
-        service = SearchService(eumdac_token)
-        filters = SearchFilters(dtstart=TEST_DTSTART, dtend=TEST_DTEND)
-        result = service.search(COLLECTION_ID, filters, limit=2)
-        products = result.products
+        products = window_products
 
         # Re-open the same state DB from previous test
         state_db = StateDB(download_dir / ".eumdac-fetch-state.db")
@@ -419,7 +440,7 @@ class TestRealDownload:
             )
 
             # This should be near-instant since products are already verified
-            asyncio.run(download_service.download_all(products, "integration-test", COLLECTION_ID))
+            await download_service.download_all(products, "integration-test", COLLECTION_ID)
 
             still_verified = state_db.get_by_status("integration-test", ProductStatus.VERIFIED)
             assert len(still_verified) == len(already_verified), "Resume should not re-download verified products"
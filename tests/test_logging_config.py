@@ -59,3 +59,23 @@ class TestAddSessionLogHandler:
         finally:
             handler.close()
             logging.getLogger("eumdac_fetch").removeHandler(handler)
+
+    def test_buffers_debug_until_info_or_close(self, tmp_path, caplog):
+        caplog.set_level(logging.DEBUG, logger="eumdac_fetch")
+        log_path = tmp_path / "session.log"
+        handler = add_session_log_handler(log_path)
+        logger = logging.getLogger("eumdac_fetch")
+        try:
+            logger.debug("buffered line")
+            assert "buffered line" not in log_path.read_text()
+            logger.info("Post-processing product P1")
+            text = log_path.read_text()
+            assert "buffered line" in text
+            assert "Post-processing product P1" in text
+
+            logger.debug("trailing debug line")
+            assert "trailing debug line" not in log_path.read_text()
+        finally:
+            logger.removeHandler(handler)
+            handler.close()
+        assert "trailing debug line" in log_path.read_text()
@@ -3,29 +3,24 @@
 from __future__ import annotations
 
 import asyncio
+import dataclasses
+import functools
+import logging
+import signal
+import threading
 from pathlib import Path
+from types import SimpleNamespace
 from unittest import mock
 
 import pytest
 
 from eumdac_fetch.models import (
     AppConfig,
-    DownloadConfig,
-    JobConfig,
     PostProcessConfig,
     ProductRecord,
     ProductStatus,
-    SearchFilters,
 )
-from eumdac_fetch.pipeline import Pipeline
-from eumdac_fetch.state import StateDB
-
-
-@pytest.fixture
-def state_db(tmp_path):
-    db = StateDB(tmp_path / "test.db")
-    yield db
-    db.close()
+from eumdac_fetch.pipeline import Pipeline, _current_job, _StatusBatch
 
 
 @pytest.fixture
@@ -34,317 +29,238 @@ def mock_token():
 
 
 @pytest.fixture
-def basic_config(tmp_path):
-    return AppConfig(
-        jobs=[
-            JobConfig(
-                name="test-job",
-                collection="COL1",
-                filters=SearchFilters(),
-                download=DownloadConfig(directory=tmp_path / "downloads", parallel=1),
-                post_process=PostProcessConfig(enabled=False),
-            )
-        ],
-    )
+def basic_config(make_job):
+    return AppConfig(jobs=[make_job()])
 
 
 @pytest.fixture
-def post_process_config(tmp_path):
-    return AppConfig(
-        jobs=[
-            JobConfig(
-                name="test-job",
-                collection="COL1",
-                filters=SearchFilters(),
-                download=DownloadConfig(directory=tmp_path / "downloads", parallel=1),
-                post_process=PostProcessConfig(enabled=True, output_dir=tmp_path / "output"),
-            )
-        ],
-    )
+def post_process_config(tmp_path, make_job):
+    post_process = PostProcessConfig(enabled=True, output_dir=tmp_path / "output")
+    return AppConfig(jobs=[make_job(post_process=post_process)])
 
 
 @pytest.fixture
 def mock_session(tmp_path):
-    """Create a mock Session that returns tmp_path-based paths."""
+    """Create a mock Session that returns tmp_path-based paths.
+
+    Nothing is created on disk: the session log handler is always patched out,
+    the state database is in-memory, and the pipeline makes the download
+    directory itself when it needs one.
+    """
     session = mock.MagicMock()
     session.session_id = "abc123def456"
     session.session_dir = tmp_path / "sessions" / "abc123def456"
     session.download_dir = tmp_path / "downloads" / "COL1"
-    session.state_db_path = tmp_path / "sessions" / "abc123def456" / "state.db"
+    session.state_db_path = ":memory:"
     session.log_path = tmp_path / "sessions" / "abc123def456" / "session.log"
     session.is_new = True
     session.is_live = True
     session.initialize = mock.MagicMock()
-    # Create the dirs so log handler can write
-    session.session_dir.mkdir(parents=True, exist_ok=True)
-    session.download_dir.mkdir(parents=True, exist_ok=True)
     return session
 
 
-class TestPipeline:
-    def test_pipeline_init(self, mock_token, basic_config):
-        pipeline = Pipeline(token=mock_token, config=basic_config)
-        assert not pipeline._shutdown.is_set()
-        assert pipeline.post_processor is None
+@pytest.fixture
+def mock_search(monkeypatch):
+    """Install a mock SearchService class; returns the instance the pipeline will use."""
+    search_cls = mock.MagicMock()
+    search_cls.return_value.iter_products.return_value = []
+    monkeypatch.setattr("eumdac_fetch.pipeline.SearchService", search_cls)
+    return search_cls.return_value
 
-    def test_handle_signal(self, mock_token, basic_config):
-        pipeline = Pipeline(token=mock_token, config=basic_config)
-        pipeline._handle_signal()
-        assert pipeline._shutdown.is_set()
 
-    def test_run_empty_search(self, mock_token, basic_config, mock_session):
-        pipeline = Pipeline(token=mock_token, config=basic_config)
+@pytest.fixture
+def mock_session_cls(monkeypatch, mock_session):
+    """Make every job use ``mock_session`` and keep session logging off disk."""
+    session_cls = mock.MagicMock(return_value=mock_session)
+    monkeypatch.setattr("eumdac_fetch.pipeline.Session", session_cls)
+    monkeypatch.setattr("eumdac_fetch.pipeline.add_session_log_handler", mock.MagicMock())
+    return session_cls
 
-        with (
-            mock.patch("eumdac_fetch.pipeline.SearchService") as mock_search_cls,
-            mock.patch("eumdac_fetch.pipeline.Session", return_value=mock_session),
-            mock.patch("eumdac_fetch.pipeline.add_session_log_handler") as mock_log,
-        ):
-            mock_search = mock_search_cls.return_value
-            mock_search.iter_products.return_value = []
-            mock_log.return_value = mock.MagicMock()
 
-            asyncio.run(pipeline.run())
+async def _async_noop(*_args, **_kwargs) -> None:
+    return None
 
-            mock_search.iter_products.assert_called_once()
 
-    def test_run_creates_session(self, mock_token, basic_config, mock_session):
-        """Pipeline creates and initializes a Session for each job."""
-        pipeline = Pipeline(token=mock_token, config=basic_config)
+async def _record_download(calls: list, *args, **_kwargs) -> None:
+    calls.append(args)
+
+
+@pytest.fixture
+def mock_dl_cls(monkeypatch):
+    """Install a mock DownloadService class whose download_all is a no-op coroutine."""
+    dl_cls = mock.MagicMock()
+    dl_cls.return_value.download_all = _async_noop
+    monkeypatch.setattr("eumdac_fetch.pipeline.DownloadService", dl_cls)
+    return dl_cls
 
-        with (
-            mock.patch("eumdac_fetch.pipeline.SearchService") as mock_search_cls,
-            mock.patch("eumdac_fetch.pipeline.Session", return_value=mock_session) as mock_session_cls,
-            mock.patch("eumdac_fetch.pipeline.add_session_log_handler") as mock_log,
-        ):
-            mock_search = mock_search_cls.return_value
-            mock_search.iter_products.return_value = []
-            mock_log.return_value = mock.MagicMock()
 
-            asyncio.run(pipeline.run())
+@pytest.fixture
+def download_calls(mock_dl_cls):
+    """Positional args of each download_all call, recorded in order."""
+    calls: list[tuple] = []
+    mock_dl_cls.return_value.download_all = functools.partial(_record_download, calls)
+    return calls
+
+
+@pytest.fixture
+def mock_state(monkeypatch):
+    """Install a mock StateDB class; returns the instance the pipeline will use."""
+    state_cls = mock.MagicMock()
+    state = state_cls.return_value
+    state.has_cached_search.return_value = False
+    state.get_by_status.return_value = []
+    monkeypatch.setattr("eumdac_fetch.pipeline.StateDB", state_cls)
+    return state
+
+
+@pytest.fixture
+def verified_record():
+    return ProductRecord(
+        product_id="P1",
+        job_name="test-job",
+        collection="COL1",
+        status=ProductStatus.VERIFIED,
+        download_path="/tmp/P1",
+    )
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class StubProduct:
+    """Stand-in for an eumdac product: the pipeline only needs str() and size."""
+
+    name: str
+    size: int = 10
+
+    def __str__(self) -> str:
+        return self.name
 
-            mock_session_cls.assert_called_once_with(basic_config.jobs[0])
-            mock_session.initialize.assert_called_once()
 
-    def test_run_download_only(self, mock_token, basic_config, mock_session):
+@pytest.fixture
+def mock_product():
+    return StubProduct("P1")
+
+
+@pytest.fixture
+def run_pipeline(mock_token, mock_search, run):
+    """Run a Pipeline whose fresh search returns ``products``; returns the pipeline."""
+
+    def _run(config, products=(), **hooks):
+        mock_search.iter_products.return_value = list(products)
+        pipeline = Pipeline(token=mock_token, config=config, **hooks)
+        run(pipeline.run())
+        return pipeline
+
+    return _run
+
+
+@pytest.mark.usefixtures("mock_session_cls")
+class TestPipeline:
+    def test_pipeline_init(self, mock_token, basic_config):
         pipeline = Pipeline(token=mock_token, config=basic_config)
+        assert not pipeline._shutdown.is_set()
+        assert pipeline.post_processor is None
 
-        mock_product = mock.MagicMock()
-        mock_product.__str__ = mock.MagicMock(return_value="P1")
-        mock_product.size = 10
+    def test_handle_signal(self, mock_token, basic_config):
+        pipeline = Pipeline(token=mock_token, config=basic_config)
+        pipeline._handle_signal()
+        assert pipeline._shutdown.is_set()
 
-        with (
-            mock.patch("eumdac_fetch.pipeline.SearchService") as mock_search_cls,
-            mock.patch("eumdac_fetch.pipeline.Session", return_value=mock_session),
-            mock.patch("eumdac_fetch.pipeline.add_session_log_handler") as mock_log,
-            mock.patch("eumdac_fetch.pipeline.DownloadService") as mock_dl_cls,
-        ):
-            mock_search = mock_search_cls.return_value
-            mock_search.iter_products.return_value = [mock_product]
-            mock_log.return_value = mock.MagicMock()
-            mock_dl = mock_dl_cls.return_value
-            mock_dl.download_all = mock.AsyncMock()
+    def test_run_empty_search(self, basic_config, mock_search, run_pipeline):
+        run_pipeline(basic_config)
+        mock_search.iter_products.assert_called_once()
 
-            asyncio.run(pipeline.run())
+    def test_run_creates_session(self, basic_config, mock_session, mock_session_cls, run_pipeline):
+        """Pipeline creates and initializes a Session for each job."""
+        run_pipeline(basic_config)
+        mock_session_cls.assert_called_once_with(basic_config.jobs[0])
+        mock_session.initialize.assert_called_once()
 
-            mock_dl.download_all.assert_called_once()
+    def test_run_download_only(self, basic_config, download_calls, mock_product, run_pipeline):
+        run_pipeline(basic_config, [mock_product])
+        assert download_calls == [([mock_product], "test-job", "COL1")]
 
-    def test_run_uses_session_download_dir(self, mock_token, basic_config, mock_session):
+    def test_run_uses_session_download_dir(self, basic_config, mock_session, mock_dl_cls, mock_product, run_pipeline):
         """DownloadService should use session.download_dir, not job.download.directory."""
-        pipeline = Pipeline(token=mock_token, config=basic_config)
+        run_pipeline(basic_config, [mock_product])
+        assert mock_dl_cls.call_args.kwargs["download_dir"] == mock_session.download_dir
 
-        mock_product = mock.MagicMock()
-        mock_product.__str__ = mock.MagicMock(return_value="P1")
-        mock_product.size = 10
-
-        with (
-            mock.patch("eumdac_fetch.pipeline.SearchService") as mock_search_cls,
-            mock.patch("eumdac_fetch.pipeline.Session", return_value=mock_session),
-            mock.patch("eumdac_fetch.pipeline.add_session_log_handler") as mock_log,
-            mock.patch("eumdac_fetch.pipeline.DownloadService") as mock_dl_cls,
-        ):
-            mock_search = mock_search_cls.return_value
-            mock_search.iter_products.return_value = [mock_product]
-            mock_log.return_value = mock.MagicMock()
-            mock_dl = mock_dl_cls.return_value
-            mock_dl.download_all = mock.AsyncMock()
-
-            asyncio.run(pipeline.run())
-
-            # Verify DownloadService was created with session download_dir
-            call_kwargs = mock_dl_cls.call_args
-            assert call_kwargs.kwargs["download_dir"] == mock_session.download_dir
-
-    def test_run_with_post_processing(self, mock_token, post_process_config, mock_session):
-        mock_post_processor = mock.MagicMock()
-        pipeline = Pipeline(token=mock_token, config=post_process_config, post_processor=mock_post_processor)
-
-        mock_product = mock.MagicMock()
-        mock_product.__str__ = mock.MagicMock(return_value="P1")
-
-        with (
-            mock.patch("eumdac_fetch.pipeline.SearchService") as mock_search_cls,
-            mock.patch("eumdac_fetch.pipeline.Session", return_value=mock_session),
-            mock.patch("eumdac_fetch.pipeline.add_session_log_handler") as mock_log,
-            mock.patch("eumdac_fetch.pipeline.DownloadService") as mock_dl_cls,
-            mock.patch("eumdac_fetch.pipeline.StateDB") as mock_state_cls,
-        ):
-            mock_search = mock_search_cls.return_value
-            mock_search.iter_products.return_value = [mock_product]
-            mock_log.return_value = mock.MagicMock()
-            mock_dl = mock_dl_cls.return_value
-            mock_dl.download_all = mock.AsyncMock()
-            mock_state = mock_state_cls.return_value
-            mock_state.get_by_status.return_value = []
-            mock_state.has_cached_search.return_value = False
-            mock_state.close = mock.MagicMock()
-
-            asyncio.run(pipeline.run())
-
-    def test_post_processor_called(self, mock_token, post_process_config, mock_session):
+    @pytest.mark.usefixtures("mock_dl_cls", "mock_state")
+    def test_run_with_post_processing(self, post_process_config, mock_product, run_pipeline):
+        run_pipeline(post_process_config, [mock_product], post_processor=mock.MagicMock())
+
+    @pytest.mark.usefixtures("mock_dl_cls")
+    def test_post_processor_called(self, post_process_config, mock_state, mock_product, verified_record, run_pipeline):
         mock_post_processor = mock.MagicMock()
-        pipeline = Pipeline(token=mock_token, config=post_process_config, post_processor=mock_post_processor)
+        mock_state.get_by_status.return_value = [verified_record]
 
-        record = ProductRecord(
-            product_id="P1",
-            job_name="test-job",
-            collection="COL1",
-            status=ProductStatus.VERIFIED,
-            download_path="/tmp/P1",
-        )
+        run_pipeline(post_process_config, [mock_product], post_processor=mock_post_processor)
+
+        mock_post_processor.assert_called_once_with(Path("/tmp/P1"), "P1")
+        mock_state.update_status_many.assert_called_once_with([("P1", "test-job", ProductStatus.PROCESSED, None)])
 
-        mock_product = mock.MagicMock()
-        mock_product.__str__ = mock.MagicMock(return_value="P1")
-
-        with (
-            mock.patch("eumdac_fetch.pipeline.SearchService") as mock_search_cls,
-            mock.patch("eumdac_fetch.pipeline.Session", return_value=mock_session),
-            mock.patch("eumdac_fetch.pipeline.add_session_log_handler") as mock_log,
-            mock.patch("eumdac_fetch.pipeline.DownloadService") as mock_dl_cls,
-            mock.patch("eumdac_fetch.pipeline.StateDB") as mock_state_cls,
-        ):
-            mock_search = mock_search_cls.return_value
-            mock_search.iter_products.return_value = [mock_product]
-            mock_log.return_value = mock.MagicMock()
-            mock_dl = mock_dl_cls.return_value
-            mock_dl.download_all = mock.AsyncMock()
-            mock_state = mock_state_cls.return_value
-            mock_state.get_by_status.return_value = [record]
-            mock_state.has_cached_search.return_value = False
-            mock_state.close = mock.MagicMock()
-
-            asyncio.run(pipeline.run())
-
-            mock_post_processor.assert_called_once_with(Path("/tmp/P1"), "P1")
-
-    def test_post_process_enabled_no_callable_downloads_only(self, mock_token, post_process_config, mock_session):
+    def test_post_process_enabled_no_callable_downloads_only(
+        self, post_process_config, download_calls, mock_product, run_pipeline, monkeypatch, caplog
+    ):
         """When post_process.enabled but no callable provided, should download only and warn."""
-        pipeline = Pipeline(token=mock_token, config=post_process_config, post_processor=None)
+        # No queue or consumer task is set up without a callable to feed
+        queued_run = mock.MagicMock()
+        monkeypatch.setattr(Pipeline, "_run_with_post_processing", queued_run)
+
+        run_pipeline(post_process_config, [mock_product], post_processor=None)
 
-        mock_product = mock.MagicMock()
-        mock_product.__str__ = mock.MagicMock(return_value="P1")
-        mock_product.size = 10
+        assert len(download_calls) == 1
+        queued_run.assert_not_called()
+        assert "no post_processor callable provided" in caplog.text
 
-        with (
-            mock.patch("eumdac_fetch.pipeline.SearchService") as mock_search_cls,
-            mock.patch("eumdac_fetch.pipeline.Session", return_value=mock_session),
-            mock.patch("eumdac_fetch.pipeline.add_session_log_handler") as mock_log,
-            mock.patch("eumdac_fetch.pipeline.DownloadService") as mock_dl_cls,
-        ):
-            mock_search = mock_search_cls.return_value
-            mock_search.iter_products.return_value = [mock_product]
-            mock_log.return_value = mock.MagicMock()
-            mock_dl = mock_dl_cls.return_value
-            mock_dl.download_all = mock.AsyncMock()
+    def test_shutdown_stops_pipeline(self, mock_token, basic_config, mock_search, run):
+        pipeline = Pipeline(token=mock_token, config=basic_config)
+        pipeline._shutdown.set()
 
-            asyncio.run(pipeline.run())
+        run(pipeline.run())
 
-            mock_dl.download_all.assert_called_once()
+        mock_search.iter_products.assert_not_called()
 
-    def test_shutdown_stops_pipeline(self, mock_token, basic_config):
+    @pytest.mark.usefixtures("mock_search")
+    def test_run_restores_signal_handlers(self, mock_token, basic_config, run):
+        """The shared test loop must not keep routing SIGINT to a finished pipeline."""
         pipeline = Pipeline(token=mock_token, config=basic_config)
         pipeline._shutdown.set()
 
-        with mock.patch("eumdac_fetch.pipeline.SearchService") as mock_search_cls:
-            asyncio.run(pipeline.run())
-            mock_search_cls.return_value.iter_products.assert_not_called()
+        run(pipeline.run())
+
+        assert signal.getsignal(signal.SIGINT) is signal.default_int_handler
 
-    def test_search_caching_on_fresh_search(self, mock_token, basic_config, mock_session):
+    @pytest.mark.usefixtures("mock_dl_cls")
+    def test_search_caching_on_fresh_search(self, basic_config, mock_state, mock_product, run_pipeline):
         """Fresh search caches results in state DB."""
-        pipeline = Pipeline(token=mock_token, config=basic_config)
+        run_pipeline(basic_config, [mock_product])
+        mock_state.cache_search_results.assert_called_once_with([mock_product], "COL1")
 
-        mock_product = mock.MagicMock()
-        mock_product.__str__ = mock.MagicMock(return_value="P1")
-        mock_product.size = 10
-
-        with (
-            mock.patch("eumdac_fetch.pipeline.SearchService") as mock_search_cls,
-            mock.patch("eumdac_fetch.pipeline.Session", return_value=mock_session),
-            mock.patch("eumdac_fetch.pipeline.add_session_log_handler") as mock_log,
-            mock.patch("eumdac_fetch.pipeline.StateDB") as mock_state_cls,
-            mock.patch("eumdac_fetch.pipeline.DownloadService") as mock_dl_cls,
-        ):
-            mock_search = mock_search_cls.return_value
-            mock_search.iter_products.return_value = [mock_product]
-            mock_log.return_value = mock.MagicMock()
-            mock_state = mock_state_cls.return_value
-            mock_state.has_cached_search.return_value = False
-            mock_state.close = mock.MagicMock()
-            mock_dl = mock_dl_cls.return_value
-            mock_dl.download_all = mock.AsyncMock()
-
-            asyncio.run(pipeline.run())
-
-            # Verify search results were cached
-            mock_state.cache_search_results.assert_called_once_with([mock_product], "COL1")
-
-    def test_stale_downloads_reset_on_resume(self, mock_token, basic_config, mock_session):
+    @pytest.mark.usefixtures("mock_search", "mock_dl_cls")
+    def test_stale_downloads_reset_on_resume(self, mock_token, basic_config, mock_session, mock_state, run):
         """Resumed sessions should reset stale DOWNLOADING products to PENDING."""
         mock_session.is_new = False
         pipeline = Pipeline(token=mock_token, config=basic_config)
+        mock_state.reset_stale_downloads.return_value = 3
+
+        run(pipeline.run())
+
+        mock_state.reset_stale_downloads.assert_called_once_with("test-job")
 
-        with (
-            mock.patch("eumdac_fetch.pipeline.SearchService") as mock_search_cls,
-            mock.patch("eumdac_fetch.pipeline.Session", return_value=mock_session),
-            mock.patch("eumdac_fetch.pipeline.add_session_log_handler") as mock_log,
-            mock.patch("eumdac_fetch.pipeline.StateDB") as mock_state_cls,
-            mock.patch("eumdac_fetch.pipeline.DownloadService"),
-        ):
-            mock_search = mock_search_cls.return_value
-            mock_search.iter_products.return_value = []
-            mock_log.return_value = mock.MagicMock()
-            mock_state = mock_state_cls.return_value
-            mock_state.has_cached_search.return_value = False
-            mock_state.reset_stale_downloads.return_value = 3
-            mock_state.close = mock.MagicMock()
-
-            asyncio.run(pipeline.run())
-
-            mock_state.reset_stale_downloads.assert_called_once_with("test-job")
-
-    def test_stale_downloads_not_reset_on_new_session(self, mock_token, basic_config, mock_session):
+    @pytest.mark.usefixtures("mock_search")
+    def test_stale_downloads_not_reset_on_new_session(self, mock_token, basic_config, mock_session, mock_state, run):
         """New sessions should NOT reset stale downloads (nothing to reset)."""
         mock_session.is_new = True
         pipeline = Pipeline(token=mock_token, config=basic_config)
 
-        with (
-            mock.patch("eumdac_fetch.pipeline.SearchService") as mock_search_cls,
-            mock.patch("eumdac_fetch.pipeline.Session", return_value=mock_session),
-            mock.patch("eumdac_fetch.pipeline.add_session_log_handler") as mock_log,
-            mock.patch("eumdac_fetch.pipeline.StateDB") as mock_state_cls,
-        ):
-            mock_search = mock_search_cls.return_value
-            mock_search.iter_products.return_value = []
-            mock_log.return_value = mock.MagicMock()
-            mock_state = mock_state_cls.return_value
-            mock_state.has_cached_search.return_value = False
-            mock_state.close = mock.MagicMock()
+        run(pipeline.run())
 
-            asyncio.run(pipeline.run())
+        mock_state.reset_stale_downloads.assert_not_called()
 
-            mock_state.reset_stale_downloads.assert_not_called()
-
-    def test_search_uses_cache_for_resumed_non_live(self, mock_token, basic_config, mock_session):
+    @pytest.mark.usefixtures("mock_dl_cls")
+    def test_search_uses_cache_for_resumed_non_live(
+        self, mock_token, basic_config, mock_session, mock_search, mock_state, mock_product, run
+    ):
         """Resumed non-live session reconstructs product objects from cache without re-searching."""
         mock_session.is_new = False
         mock_session.is_live = False
@@ -356,177 +272,215 @@ class TestPipeline:
             collection="COL1",
             status=ProductStatus.PENDING,
         )
+        mock_search.get_product.return_value = mock_product
+        mock_state.has_cached_search.return_value = True
+        mock_state.get_resumable.return_value = [resumable_record]
+
+        run(pipeline.run())
 
-        mock_product = mock.MagicMock()
-        mock_product.__str__ = mock.MagicMock(return_value="P1")
-        mock_product.size = 10
-
-        with (
-            mock.patch("eumdac_fetch.pipeline.SearchService") as mock_search_cls,
-            mock.patch("eumdac_fetch.pipeline.Session", return_value=mock_session),
-            mock.patch("eumdac_fetch.pipeline.add_session_log_handler") as mock_log,
-            mock.patch("eumdac_fetch.pipeline.StateDB") as mock_state_cls,
-            mock.patch("eumdac_fetch.pipeline.DownloadService") as mock_dl_cls,
-        ):
-            mock_search = mock_search_cls.return_value
-            mock_search.get_product.return_value = mock_product
-            mock_log.return_value = mock.MagicMock()
-            mock_state = mock_state_cls.return_value
-            mock_state.has_cached_search.return_value = True
-            mock_state.get_resumable.return_value = [resumable_record]
-            mock_state.close = mock.MagicMock()
-            mock_dl = mock_dl_cls.return_value
-            mock_dl.download_all = mock.AsyncMock()
-
-            asyncio.run(pipeline.run())
-
-            # Should not re-search or cache again
-            mock_search.iter_products.assert_not_called()
-            mock_state.cache_search_results.assert_not_called()
-            # Should reconstruct from stored collection + product_id
-            mock_search.get_product.assert_called_once_with("COL1", "P1")
-
-    def test_search_cache_all_processed(self, mock_token, basic_config, mock_session):
+        # Should not re-search or cache again
+        mock_search.iter_products.assert_not_called()
+        mock_state.cache_search_results.assert_not_called()
+        # Should reconstruct from stored collection + product_id
+        mock_search.get_product.assert_called_once_with("COL1", "P1")
+
+    @pytest.mark.usefixtures("mock_search")
+    def test_search_cache_all_processed(self, mock_token, basic_config, mock_session, mock_state, download_calls, run):
         """Resumed session with cache but no resumable products skips download."""
         mock_session.is_new = False
         mock_session.is_live = False
         pipeline = Pipeline(token=mock_token, config=basic_config)
+        mock_state.has_cached_search.return_value = True
+        mock_state.get_resumable.return_value = []  # All processed
+        mock_state.reset_stale_downloads.return_value = 0
+
+        run(pipeline.run())
+
+        # Download should never be called
+        assert download_calls == []
 
-        with (
-            mock.patch("eumdac_fetch.pipeline.SearchService"),
-            mock.patch("eumdac_fetch.pipeline.Session", return_value=mock_session),
-            mock.patch("eumdac_fetch.pipeline.add_session_log_handler") as mock_log,
-            mock.patch("eumdac_fetch.pipeline.StateDB") as mock_state_cls,
-            mock.patch("eumdac_fetch.pipeline.DownloadService") as mock_dl_cls,
-        ):
-            mock_log.return_value = mock.MagicMock()
-            mock_state = mock_state_cls.return_value
-            mock_state.has_cached_search.return_value = True
-            mock_state.get_resumable.return_value = []  # All processed
-            mock_state.reset_stale_downloads.return_value = 0
-            mock_state.close = mock.MagicMock()
-
-            asyncio.run(pipeline.run())
-
-            # Download should never be called
-            mock_dl_cls.return_value.download_all.assert_not_called()
-
-    def test_shutdown_between_jobs(self, mock_token, mock_session):
+    @pytest.mark.usefixtures("mock_state")
+    def test_shutdown_between_jobs(self, mock_token, mock_search, make_job, run):
         """Shutdown signal between jobs stops the pipeline."""
         two_job_config = AppConfig(
             jobs=[
-                JobConfig(name="job1", collection="COL1", filters=SearchFilters()),
-                JobConfig(name="job2", collection="COL2", filters=SearchFilters()),
+                make_job(name="job1", collection="COL1"),
+                make_job(name="job2", collection="COL2"),
             ],
+            parallel_jobs=1,
         )
         pipeline = Pipeline(token=mock_token, config=two_job_config)
 
         job_count = [0]
 
-        def count_jobs(*args, **kwargs):
+        def count_jobs(*_args, **_kwargs):
             job_count[0] += 1
             # Set shutdown after first job
             pipeline._shutdown.set()
             return []
 
-        with (
-            mock.patch("eumdac_fetch.pipeline.SearchService") as mock_search_cls,
-            mock.patch("eumdac_fetch.pipeline.Session", return_value=mock_session),
-            mock.patch("eumdac_fetch.pipeline.add_session_log_handler") as mock_log,
-            mock.patch("eumdac_fetch.pipeline.StateDB") as mock_state_cls,
-        ):
-            mock_search = mock_search_cls.return_value
-            mock_search.iter_products.side_effect = count_jobs
-            mock_log.return_value = mock.MagicMock()
-            mock_state = mock_state_cls.return_value
-            mock_state.has_cached_search.return_value = False
-            mock_state.close = mock.MagicMock()
-
-            asyncio.run(pipeline.run())
-
-            # Only first job should have been processed
-            assert job_count[0] == 1
-
-    def test_post_process_failure_marks_failed(self, mock_token, post_process_config, mock_session):
+        mock_search.iter_products.side_effect = count_jobs
+
+        run(pipeline.run())
+
+        # Only first job should have been processed
+        assert job_count[0] == 1
+
+    @pytest.fixture
+    def per_job_env(self, tmp_path, monkeypatch):
+        """Give each job its own mock session and StateDB, keyed by job name."""
+        sessions: dict[str, mock.MagicMock] = {}
+        states: dict[str, mock.MagicMock] = {}
+
+        def make_session(job):
+            session = mock.MagicMock(is_new=True, is_live=True)
+            session.state_db_path = job.name
+            session.log_path = tmp_path / job.name / "session.log"
+            sessions[job.name] = session
+            return session
+
+        def make_state(db_path):
+            state = mock.MagicMock()
+            state.has_cached_search.return_value = False
+            states[db_path] = state
+            return state
+
+        monkeypatch.setattr("eumdac_fetch.pipeline.Session", make_session)
+        monkeypatch.setattr("eumdac_fetch.pipeline.StateDB", make_state)
+        monkeypatch.setattr("eumdac_fetch.pipeline.add_session_log_handler", mock.MagicMock())
+        return SimpleNamespace(sessions=sessions, states=states)
+
+    def test_parallel_jobs_search_concurrently(self, mock_token, mock_search, per_job_env, make_job, run):
+        """With parallel_jobs=2 both jobs are searching at the same time, each on its own state."""
+        config = AppConfig(jobs=[make_job(name=f"job{i}") for i in (1, 2)], parallel_jobs=2)
+        pipeline = Pipeline(token=mock_token, config=config)
+        started = {"job1": threading.Event(), "job2": threading.Event()}
+        saw_other_searching = {}
+
+        def search(collection, *_args, **_kwargs):
+            name = _current_job.get()
+            started[name].set()
+            other = "job2" if name == "job1" else "job1"
+            # Run one at a time, the first search would time out here
+            saw_other_searching[name] = started[other].wait(timeout=5)
+            return [StubProduct(f"{name}-P1")]
+
+        mock_search.iter_products.side_effect = search
+
+        run(pipeline.run())
+
+        assert saw_other_searching == {"job1": True, "job2": True}
+        assert per_job_env.states.keys() == {"job1", "job2"}
+        for name, state in per_job_env.states.items():
+            cached, _collection = state.cache_search_results.call_args.args
+            assert cached == [StubProduct(f"{name}-P1")]
+            state.close.assert_called_once_with()
+
+    def test_parallel_jobs_keep_session_logs_apart(
+        self, mock_token, mock_search, per_job_env, make_job, monkeypatch, caplog, run
+    ):
+        config = AppConfig(jobs=[make_job(name=f"job{i}") for i in (1, 2)], parallel_jobs=2)
+        pipeline = Pipeline(token=mock_token, config=config)
+        session_logs: dict[str, list[str]] = {}
+        both_searching = threading.Barrier(2, timeout=5)
+
+        def search(*_args, **_kwargs):
+            # Hold both jobs mid-run so their log records interleave
+            both_searching.wait()
+            return []
+
+        class RecordingHandler(logging.Handler):
+            def emit(self, record):
+                self.messages.append(record.getMessage())
+
+        def add_handler(log_path):
+            handler = RecordingHandler()
+            handler.messages = session_logs[log_path.parent.name] = []
+            logging.getLogger("eumdac_fetch").addHandler(handler)
+            return handler
+
+        mock_search.iter_products.side_effect = search
+        monkeypatch.setattr("eumdac_fetch.pipeline.add_session_log_handler", add_handler)
+        caplog.set_level(logging.INFO, logger="eumdac_fetch")
+
+        run(pipeline.run())
+
+        for name, messages in session_logs.items():
+            assert [m for m in messages if m.startswith("Starting pipeline")] == [f"Starting pipeline for job: {name}"]
+            other = "job2" if name == "job1" else "job1"
+            assert not [m for m in messages if other in m]
+
+    @pytest.mark.usefixtures("mock_dl_cls")
+    def test_post_process_failure_marks_failed(
+        self, mock_token, post_process_config, mock_search, mock_state, mock_product, verified_record, run
+    ):
         """Post-processor failure marks product as FAILED."""
 
-        def failing_processor(path, pid):
+        def failing_processor(_path, _pid):
             raise RuntimeError("processing error")
 
         pipeline = Pipeline(token=mock_token, config=post_process_config, post_processor=failing_processor)
+        mock_search.iter_products.return_value = [mock_product]
+        mock_state.get_by_status.return_value = [verified_record]
 
-        record = ProductRecord(
-            product_id="P1",
-            job_name="test-job",
-            collection="COL1",
-            status=ProductStatus.VERIFIED,
-            download_path="/tmp/P1",
+        run(pipeline.run())
+
+        # Should have been marked FAILED
+        mock_state.update_status_many.assert_called_once_with(
+            [("P1", "test-job", ProductStatus.FAILED, "Post-processing failed: processing error")]
         )
 
-        mock_product = mock.MagicMock()
-        mock_product.__str__ = mock.MagicMock(return_value="P1")
-
-        with (
-            mock.patch("eumdac_fetch.pipeline.SearchService") as mock_search_cls,
-            mock.patch("eumdac_fetch.pipeline.Session", return_value=mock_session),
-            mock.patch("eumdac_fetch.pipeline.add_session_log_handler") as mock_log,
-            mock.patch("eumdac_fetch.pipeline.DownloadService") as mock_dl_cls,
-            mock.patch("eumdac_fetch.pipeline.StateDB") as mock_state_cls,
-        ):
-            mock_search = mock_search_cls.return_value
-            mock_search.iter_products.return_value = [mock_product]
-            mock_log.return_value = mock.MagicMock()
-            mock_dl = mock_dl_cls.return_value
-            mock_dl.download_all = mock.AsyncMock()
-            mock_state = mock_state_cls.return_value
-            mock_state.get_by_status.return_value = [record]
-            mock_state.has_cached_search.return_value = False
-            mock_state.close = mock.MagicMock()
-
-            asyncio.run(pipeline.run())
-
-            # Should have been marked FAILED
-            mock_state.update_status.assert_any_call(
-                "P1", "test-job", ProductStatus.FAILED, error_message="Post-processing failed: processing error"
-            )
-
-    def test_shutdown_during_post_processing(self, mock_token, post_process_config, mock_session):
+    def test_shutdown_during_post_processing(
+        self, mock_token, post_process_config, mock_search, mock_state, mock_dl_cls, mock_product, verified_record, run
+    ):
         """Shutdown during post-processing consumer stops the loop."""
         pipeline = Pipeline(token=mock_token, config=post_process_config, post_processor=mock.MagicMock())
+        mock_search.iter_products.return_value = [mock_product]
+        mock_state.get_by_status.return_value = [verified_record]
 
-        record = ProductRecord(
-            product_id="P1",
-            job_name="test-job",
-            collection="COL1",
-            status=ProductStatus.VERIFIED,
-            download_path="/tmp/P1",
+        # Set shutdown when download_all is called, before producer sends to queue
+        async def shutdown_on_download(*_args, **_kwargs):
+            pipeline._shutdown.set()
+
+        mock_dl_cls.return_value.download_all = shutdown_on_download
+
+        run(pipeline.run())
+
+        # Should complete without hanging
+
+
+class TestStatusBatch:
+    def test_failed_status_written_immediately(self):
+        state_db = mock.MagicMock()
+        statuses = _StatusBatch(state_db)
+        statuses.add("P1", "j", ProductStatus.PROCESSED)
+        state_db.update_status_many.assert_not_called()
+        statuses.add("P2", "j", ProductStatus.FAILED, "boom")
+        state_db.update_status_many.assert_called_once_with(
+            [("P1", "j", ProductStatus.PROCESSED, None), ("P2", "j", ProductStatus.FAILED, "boom")]
         )
 
-        mock_product = mock.MagicMock()
-        mock_product.__str__ = mock.MagicMock(return_value="P1")
-
-        with (
-            mock.patch("eumdac_fetch.pipeline.SearchService") as mock_search_cls,
-            mock.patch("eumdac_fetch.pipeline.Session", return_value=mock_session),
-            mock.patch("eumdac_fetch.pipeline.add_session_log_handler") as mock_log,
-            mock.patch("eumdac_fetch.pipeline.DownloadService") as mock_dl_cls,
-            mock.patch("eumdac_fetch.pipeline.StateDB") as mock_state_cls,
-        ):
-            mock_search = mock_search_cls.return_value
-            mock_search.iter_products.return_value = [mock_product]
-            mock_log.return_value = mock.MagicMock()
-
-            # Set shutdown when download_all is called, before producer sends to queue
-            async def shutdown_on_download(*a, **kw):
-                pipeline._shutdown.set()
-
-            mock_dl = mock_dl_cls.return_value
-            mock_dl.download_all = mock.AsyncMock(side_effect=shutdown_on_download)
-            mock_state = mock_state_cls.return_value
-            mock_state.get_by_status.return_value = [record]
-            mock_state.has_cached_search.return_value = False
-            mock_state.close = mock.MagicMock()
-
-            asyncio.run(pipeline.run())
-
-            # Should complete without hanging
+    async def test_idle_queue_flushes_when_due(self, monkeypatch):
+        """Queued statuses reach the database once due, even if no further item arrives."""
+        monkeypatch.setattr("eumdac_fetch.pipeline._STATUS_FLUSH_INTERVAL", 0.05)
+        state_db = mock.MagicMock()
+        statuses = _StatusBatch(state_db)
+        queue: asyncio.Queue = asyncio.Queue()
+        statuses.add("P1", "j", ProductStatus.PROCESSED)
+
+        getter = asyncio.create_task(statuses.get(queue))
+        await asyncio.sleep(0.2)
+        state_db.update_status_many.assert_called_once_with([("P1", "j", ProductStatus.PROCESSED, None)])
+        assert not getter.done()
+
+        await queue.put("next")
+        assert await getter == "next"
+
+    async def test_get_returns_queued_item_without_flushing(self):
+        state_db = mock.MagicMock()
+        statuses = _StatusBatch(state_db)
+        queue: asyncio.Queue = asyncio.Queue()
+        queue.put_nowait("next")
+        statuses.add("P1", "j", ProductStatus.PROCESSED)
+        assert await statuses.get(queue) == "next"
+        state_db.update_status_many.assert_not_called()
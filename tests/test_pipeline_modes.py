@@ -2,7 +2,6 @@
 
 from __future__ import annotations
 
-import asyncio
 from unittest import mock
 
 import pytest
@@ -103,7 +102,7 @@ jobs:
 
 
 class TestSearchOnlyMode:
-    def test_search_only_no_download(self, mock_token, tmp_path, mock_session, mock_product):
+    def test_search_only_no_download(self, mock_token, tmp_path, mock_session, mock_product, run):
         config = AppConfig(
             jobs=[
                 JobConfig(
@@ -132,7 +131,7 @@ class TestSearchOnlyMode:
             mock_state.close = mock.MagicMock()
             mock_dl_cls.return_value.download_all = mock.AsyncMock()
 
-            asyncio.run(pipeline.run())
+            run(pipeline.run())
 
             # download_all must never be called
             mock_dl_cls.return_value.download_all.assert_not_called()
@@ -142,7 +141,7 @@ class TestSearchOnlyMode:
             assert upsert_record.product_id == "P1"
             assert upsert_record.status == ProductStatus.PENDING
 
-    def test_search_only_skips_already_pending(self, mock_token, tmp_path, mock_session, mock_product):
+    def test_search_only_skips_already_pending(self, mock_token, tmp_path, mock_session, mock_product, run):
         """If product is already in DB, do not upsert again."""
         config = AppConfig(
             jobs=[
@@ -179,7 +178,7 @@ class TestSearchOnlyMode:
             mock_state.close = mock.MagicMock()
             mock_dl_cls.return_value.download_all = mock.AsyncMock()
 
-            asyncio.run(pipeline.run())
+            run(pipeline.run())
 
             mock_dl_cls.return_value.download_all.assert_not_called()
             mock_state.upsert.assert_not_called()
@@ -204,7 +203,7 @@ class TestRemoteMode:
             ],
         )
 
-    def test_remote_mode_calls_hook(self, mock_token, tmp_path, mock_session, mock_product):
+    def test_remote_mode_calls_hook(self, mock_token, tmp_path, mock_session, mock_product, run):
         config = self._remote_config(tmp_path)
         mock_remote_hook = mock.MagicMock()
         pipeline = Pipeline(token=mock_token, config=config, remote_post_processor=mock_remote_hook)
@@ -227,7 +226,7 @@ class TestRemoteMode:
             mock_state.close = mock.MagicMock()
             mock_dl_cls.return_value.download_all = mock.AsyncMock()
 
-            asyncio.run(pipeline.run())
+            run(pipeline.run())
 
             # build_remote_dataset must be called for the product
             mock_build.assert_called_once_with(mock_product, mock_token, None)
@@ -236,9 +235,9 @@ class TestRemoteMode:
             # no download
             mock_dl_cls.return_value.download_all.assert_not_called()
             # status updated to PROCESSED
-            mock_state.update_status.assert_any_call("P1", "test-job", ProductStatus.PROCESSED)
+            mock_state.update_status_many.assert_called_once_with([("P1", "test-job", ProductStatus.PROCESSED, None)])
 
-    def test_remote_mode_no_hook_falls_through_to_download(self, mock_token, tmp_path, mock_session, mock_product):
+    def test_remote_mode_no_hook_falls_through_to_download(self, mock_token, tmp_path, mock_session, mock_product, run):
         """mode=remote but no remote_post_processor: no remote processing, downloads normally."""
         config = self._remote_config(tmp_path)
         pipeline = Pipeline(token=mock_token, config=config, remote_post_processor=None)
@@ -259,12 +258,12 @@ class TestRemoteMode:
             mock_dl = mock_dl_cls.return_value
             mock_dl.download_all = mock.AsyncMock()
 
-            asyncio.run(pipeline.run())
+            run(pipeline.run())
 
             # Falls to download-only (post_process.enabled=True, no post_processor, download.enabled=True)
             mock_dl.download_all.assert_called_once()
 
-    def test_remote_mode_failure_marks_failed(self, mock_token, tmp_path, mock_session, mock_product):
+    def test_remote_mode_failure_marks_failed(self, mock_token, tmp_path, mock_session, mock_product, run):
         config = self._remote_config(tmp_path)
 
         def failing_hook(dataset, product_id):
@@ -289,10 +288,10 @@ class TestRemoteMode:
             mock_state.close = mock.MagicMock()
             mock_dl_cls.return_value.download_all = mock.AsyncMock()
 
-            asyncio.run(pipeline.run())
+            run(pipeline.run())
 
-            mock_state.update_status.assert_any_call(
-                "P1", "test-job", ProductStatus.FAILED, error_message="Remote processing failed: remote error"
+            mock_state.update_status_many.assert_called_once_with(
+                [("P1", "test-job", ProductStatus.FAILED, "Remote processing failed: remote error")]
             )
 
 
@@ -302,7 +301,7 @@ class TestRemoteMode:
 
 
 class TestRemoteModeResume:
-    def test_remote_mode_resume_skips_processed(self, mock_token, tmp_path, mock_session):
+    def test_remote_mode_resume_skips_processed(self, mock_token, tmp_path, mock_session, run):
         config = AppConfig(
             jobs=[
                 JobConfig(
@@ -352,7 +351,7 @@ class TestRemoteModeResume:
             mock_state.close = mock.MagicMock()
             mock_dl_cls.return_value.download_all = mock.AsyncMock()
 
-            asyncio.run(pipeline.run())
+            run(pipeline.run())
 
             # Hook called only for the PENDING product
             mock_remote_hook.assert_called_once_with(mock_dataset, "P_PENDING")
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import asyncio
+import os
 from unittest import mock
 
 import aiohttp
@@ -10,6 +11,7 @@ import pytest
 from fsspec.implementations.http import HTTPFileSystem
 
 from eumdac_fetch.remote import TokenRefreshingHTTPFileSystem
+from tests._stubs import StubbedHTTPFS
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -24,26 +26,30 @@ def _make_token(access_token_value: str = "tok-abc123"):
 
 
 def _make_fs(token, *, existing_token: str | None = None):
-    """Construct a TokenRefreshingHTTPFileSystem with the parent __init__ mocked out.
-
-    The parent HTTPFileSystem.__init__ is replaced with a minimal stub that
-    sets ``self.kwargs`` (the only attribute our class depends on at runtime).
-    """
-
-    def _stub_init(self, *args, **kwargs):
-        self.kwargs = kwargs  # HTTPFileSystem stores kwargs verbatim
-
-    with mock.patch.object(HTTPFileSystem, "__init__", _stub_init):
-        fs = TokenRefreshingHTTPFileSystem(token)
-
-    # Simulate a live (or absent) aiohttp session
-    fs._session = None
+    """Construct a TokenRefreshingHTTPFileSystem without the fsspec parent __init__."""
+    fs = StubbedHTTPFS(token)
     if existing_token:
         # Override the auth header to simulate a stale session
         fs.kwargs["headers"]["Authorization"] = f"Bearer {existing_token}"
     return fs
 
 
+def _enable_set_session(fs, client_kwargs: dict | None = None) -> list[dict]:
+    """Give a stubbed fs the attributes set_session needs; returns get_client call kwargs."""
+    calls: list[dict] = []
+
+    async def _get_client(**kwargs):
+        calls.append(kwargs)
+        return mock.AsyncMock()
+
+    fs.client_kwargs = client_kwargs or {}
+    fs.get_client = _get_client
+    fs.asynchronous = True
+    fs._loop = None
+    fs._pid = os.getpid()
+    return calls
+
+
 # ---------------------------------------------------------------------------
 # TokenRefreshingHTTPFileSystem — unit tests (no network)
 # ---------------------------------------------------------------------------
@@ -71,6 +77,13 @@ class TestTokenRefreshingHTTPFileSystem:
 
         assert captured["headers"]["Authorization"] == "Bearer first-token"
 
+    def test_real_init_sets_auth_header_and_encoded(self):
+        """The unstubbed fsspec constructor path still receives our defaults."""
+        fs = TokenRefreshingHTTPFileSystem(_make_token("real-init-token"), skip_instance_cache=True)
+        assert fs.kwargs["headers"]["Authorization"] == "Bearer real-init-token"
+        assert fs.encoded is True
+        assert fs._session is None
+
     def test_init_refresh_lock_created(self):
         token = _make_token()
         fs = _make_fs(token)
@@ -158,6 +171,82 @@ class TestTokenRefreshingHTTPFileSystem:
         assert close_count == 1
         assert fs.kwargs["headers"]["Authorization"] == "Bearer fresh-token"
 
+    async def test_update_auth_skips_token_read_when_already_refreshed(self):
+        """A waiter whose stale header was already replaced does not re-read access_token."""
+        token = _make_token("fresh-token")
+        fs = _make_fs(token, existing_token="stale-token")
+
+        await asyncio.gather(*(fs._update_auth("Bearer stale-token") for _ in range(5)))
+
+        assert vars(type(token))["access_token"].call_count == 2  # __init__ + one refresh
+        assert fs.kwargs["headers"]["Authorization"] == "Bearer fresh-token"
+
+    async def test_run_with_refresh_burst_of_401s_reads_token_once(self):
+        token = _make_token("fresh-tok")
+        fs = _make_fs(token, existing_token="stale-tok")
+
+        async def coro():
+            if fs.kwargs["headers"]["Authorization"] == "Bearer stale-tok":
+                await asyncio.sleep(0)
+                raise aiohttp.ClientResponseError(request_info=mock.MagicMock(), history=(), status=401)
+            return "ok"
+
+        results = await asyncio.gather(*(fs._run_with_refresh(coro) for _ in range(4)))
+
+        assert results == ["ok"] * 4
+        assert vars(type(token))["access_token"].call_count == 2  # __init__ + one refresh
+
+    # --- set_session / shared connector ---
+
+    async def test_session_is_reused_across_calls(self):
+        fs = _make_fs(_make_token())
+        calls = _enable_set_session(fs)
+
+        first = await fs.set_session()
+        second = await fs.set_session()
+
+        assert first is second
+        assert len(calls) == 1
+        assert isinstance(calls[0]["connector"], aiohttp.TCPConnector)
+        assert calls[0]["connector_owner"] is False
+        await fs._connector.close()
+
+    async def test_connector_survives_token_refresh(self):
+        fs = _make_fs(_make_token("fresh-token"), existing_token="stale-token")
+        calls = _enable_set_session(fs)
+
+        old_session = await fs.set_session()
+        await fs._update_auth()
+        new_session = await fs.set_session()
+
+        assert new_session is not old_session
+        assert len(calls) == 2
+        assert calls[0]["connector"] is calls[1]["connector"] is fs._connector
+        assert not fs._connector.closed
+        await fs._connector.close()
+
+    async def test_connector_uses_configured_pool_settings(self):
+        fs = StubbedHTTPFS(_make_token(), connection_limit=4, keepalive_timeout=30.0)
+        _enable_set_session(fs)
+
+        await fs.set_session()
+
+        assert "connection_limit" not in fs.kwargs
+        assert fs._connector.limit == 4
+        assert fs._connector._keepalive_timeout == 30.0
+        await fs._connector.close()
+
+    async def test_user_supplied_connector_is_respected(self):
+        fs = _make_fs(_make_token())
+        user_connector = object()
+        calls = _enable_set_session(fs, {"connector": user_connector})
+
+        await fs.set_session()
+
+        assert calls[0]["connector"] is user_connector
+        assert "connector_owner" not in calls[0]
+        assert fs._connector is None
+
     # --- _run_with_refresh ---
 
     async def test_run_with_refresh_passes_through_on_success(self):
@@ -248,6 +337,37 @@ class TestTokenRefreshingHTTPFileSystem:
             await fs._info("http://example.com/file.nc")
         m.assert_awaited_once()
 
+    async def test_info_cached_across_repeated_lookups(self):
+        fs = _make_fs(_make_token())
+        info = {"name": "http://example.com/file.nc", "size": 1024, "type": "file"}
+        with mock.patch.object(fs, "_run_with_refresh", new=mock.AsyncMock(return_value=info)) as m:
+            first = await fs._info("http://example.com/file.nc")
+            second = await fs._info("http://example.com/file.nc")
+        m.assert_awaited_once()
+        assert first == second == info
+        assert second is not info
+
+    async def test_info_cache_expires(self):
+        fs = _make_fs(_make_token())
+        info = {"name": "http://example.com/file.nc", "size": 1024, "type": "file"}
+        with (
+            mock.patch.object(fs, "_run_with_refresh", new=mock.AsyncMock(return_value=info)) as m,
+            mock.patch("eumdac_fetch.remote.time.monotonic", side_effect=[0.0, 301.0, 301.0]),
+        ):
+            await fs._info("http://example.com/file.nc")
+            await fs._info("http://example.com/file.nc")
+        assert m.await_count == 2
+
+    async def test_info_not_cached_without_size_or_with_kwargs(self):
+        fs = _make_fs(_make_token())
+        with mock.patch.object(fs, "_run_with_refresh", new=mock.AsyncMock(return_value={"size": None})) as m:
+            await fs._info("http://example.com/a.nc")
+            await fs._info("http://example.com/a.nc")
+            m.return_value = {"size": 10}
+            await fs._info("http://example.com/b.nc", headers={"X": "1"})
+            await fs._info("http://example.com/b.nc", headers={"X": "1"})
+        assert m.await_count == 4
+
     async def test_exists_delegates_to_run_with_refresh(self):
         token = _make_token()
         fs = _make_fs(token)
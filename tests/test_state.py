@@ -2,6 +2,9 @@
 
 from __future__ import annotations
 
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from unittest import mock
 
 import pytest
@@ -32,6 +35,19 @@ class TestStateDB:
         assert got.size_kb == 5000.0
         assert got.status == ProductStatus.PENDING
 
+    def test_connection_pragmas(self, state_db):
+        conn = state_db._conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == 5000
+        assert conn.isolation_level == "IMMEDIATE"
+
+    def test_job_status_queries_use_index(self, state_db):
+        plan = state_db._conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM products WHERE job_name = ? AND status = ?", ("j", "pending")
+        ).fetchall()
+        assert any("idx_products_job_status" in row["detail"] for row in plan)
+
     def test_get_nonexistent(self, state_db):
         assert state_db.get("NOPE", "job1") is None
 
@@ -57,6 +73,24 @@ class TestStateDB:
         assert got.bytes_downloaded == 50000
         assert got.download_path == "/tmp/P1.zip"
 
+    def test_update_status_many(self, state_db):
+        state_db.upsert_many(ProductRecord(product_id=f"P{i}", job_name="j", collection="C") for i in range(3))
+        state_db.update_status("P1", "j", ProductStatus.FAILED, error_message="download failed")
+        state_db.update_status_many(
+            [
+                ("P0", "j", ProductStatus.PROCESSING, None),
+                ("P0", "j", ProductStatus.PROCESSED, None),
+                ("P1", "j", ProductStatus.PROCESSED, None),
+                ("P2", "j", ProductStatus.FAILED, "boom"),
+            ]
+        )
+        records = state_db.get_many(["P0", "P1", "P2"], "j")
+        assert records["P0"].status == ProductStatus.PROCESSED
+        assert records["P1"].status == ProductStatus.PROCESSED
+        assert records["P1"].error_message == "download failed"
+        assert records["P2"].status == ProductStatus.FAILED
+        assert records["P2"].error_message == "boom"
+
     def test_upsert_updates_existing(self, state_db):
         record = ProductRecord(product_id="P1", job_name="job1", collection="COL1", size_kb=100)
         state_db.upsert(record)
@@ -89,6 +123,110 @@ class TestStateDB:
         all_job1 = state_db.get_all("job1")
         assert len(all_job1) == 3
 
+    def test_get_many(self, state_db):
+        for i in range(3):
+            state_db.upsert(ProductRecord(product_id=f"P{i}", job_name="job1", collection="COL1"))
+        state_db.upsert(ProductRecord(product_id="P0", job_name="job2", collection="COL2"))
+
+        records = state_db.get_many(["P0", "P2", "P2", "missing"], "job1")
+        assert set(records) == {"P0", "P2"}
+        assert records["P0"].collection == "COL1"
+
+    def test_upsert_many(self, state_db):
+        state_db.upsert(ProductRecord(product_id="P0", job_name="j", collection="C", size_kb=1.0))
+        created = state_db.get("P0", "j").created_at
+        state_db.upsert_many(
+            [
+                ProductRecord(product_id="P0", job_name="j", collection="C", size_kb=2.0, created_at=created),
+                ProductRecord(product_id="P1", job_name="j", collection="C", size_kb=3.0),
+            ]
+        )
+        records = state_db.get_many(["P0", "P1"], "j")
+        assert {pid: r.size_kb for pid, r in records.items()} == {"P0": 2.0, "P1": 3.0}
+        assert records["P0"].created_at == created
+        state_db.upsert_many([])
+
+    def test_get_many_batches_large_id_lists(self, state_db):
+        ids = [f"P{i}" for i in range(2000)]
+        for pid in ids[::500]:
+            state_db.upsert(ProductRecord(product_id=pid, job_name="j", collection="C"))
+        assert set(state_db.get_many(ids, "j")) == set(ids[::500])
+        assert state_db.get_many([], "j") == {}
+
+    def test_failed_write_rolls_back_and_releases_lock(self, state_db):
+        """A write that fails mid-batch leaves nothing behind and doesn't block other writers."""
+        state_db.upsert_many(ProductRecord(product_id=f"P{i}", job_name="j", collection="C") for i in range(2))
+        with pytest.raises(sqlite3.Error):
+            state_db.update_status_many(
+                [
+                    ("P0", "j", ProductStatus.PROCESSED, None),
+                    ("P1", "j", ProductStatus.FAILED, object()),  # unbindable parameter
+                ]
+            )
+        assert not state_db._conn.in_transaction
+        assert state_db.get("P0", "j").status == ProductStatus.PENDING
+
+        def write_from_other_thread():
+            state_db.update_status("P1", "j", ProductStatus.VERIFIED)
+            state_db.close()
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            pool.submit(write_from_other_thread).result(timeout=2)
+        assert state_db.get("P1", "j").status == ProductStatus.VERIFIED
+
+    def test_concurrent_writers_from_threads(self, state_db):
+        """Writers on separate thread-local connections all land without SQLITE_BUSY."""
+
+        def write(worker: int) -> None:
+            for i in range(25):
+                pid = f"W{worker}-{i}"
+                state_db.upsert(ProductRecord(product_id=pid, job_name="j", collection="C"))
+                state_db.update_status(pid, "j", ProductStatus.VERIFIED)
+            state_db.close()
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(write, range(4)))
+        assert len(state_db.get_by_status("j", ProductStatus.VERIFIED)) == 100
+
+    def test_aupdate_status_commits_from_worker_thread(self, state_db, run):
+        state_db.upsert(ProductRecord(product_id="P1", job_name="j", collection="C"))
+        main_thread = threading.get_ident()
+        threads = []
+        update_status = state_db.update_status
+
+        def recording_update_status(*args, **kwargs):
+            threads.append(threading.get_ident())
+            update_status(*args, **kwargs)
+
+        with mock.patch.object(state_db, "update_status", recording_update_status):
+            run(state_db.aupdate_status("P1", "j", ProductStatus.DOWNLOADED, bytes_downloaded=7))
+            run(state_db.aupdate_status("P1", "j", ProductStatus.DOWNLOADED, bytes_downloaded=9))
+        assert len(threads) == 2 and threads[0] == threads[1] != main_thread
+        record = state_db.get("P1", "j")
+        assert (record.status, record.bytes_downloaded) == (ProductStatus.DOWNLOADED, 9)
+
+    def test_close_closes_writer_connection(self, state_db, run):
+        state_db.upsert(ProductRecord(product_id="P1", job_name="j", collection="C"))
+        run(state_db.aupdate_status("P1", "j", ProductStatus.VERIFIED))
+        writer = state_db._writer
+        # The writer thread's own thread-local namespace
+        writer_locals = writer.submit(lambda: state_db._local.__dict__).result()
+        assert writer_locals["conn"] is not None
+
+        state_db.close()
+
+        assert state_db._writer is None
+        assert writer_locals["conn"] is None
+        with pytest.raises(RuntimeError):
+            writer.submit(lambda: None)
+
+    def test_aupdate_status_in_memory_stays_on_calling_thread(self, run):
+        db = StateDB(":memory:")
+        db.upsert(ProductRecord(product_id="P1", job_name="j", collection="C"))
+        run(db.aupdate_status("P1", "j", ProductStatus.VERIFIED))
+        assert db.get("P1", "j").status == ProductStatus.VERIFIED
+        db.close()
+
     def test_get_resumable(self, state_db):
         state_db.upsert(ProductRecord(product_id="P0", job_name="j", collection="C"))
         state_db.upsert(ProductRecord(product_id="P1", job_name="j", collection="C"))
@@ -127,6 +265,17 @@ class TestStateDB:
         assert got.created_at != ""
         assert got.updated_at != ""
 
+    def test_timestamps_are_utc_iso_seconds(self, state_db, monkeypatch):
+        monkeypatch.setattr("eumdac_fetch.state.time.time_ns", lambda: 1_735_689_600_250_000_000)
+        state_db.upsert(ProductRecord(product_id="P1", job_name="j", collection="C"))
+        assert state_db.get("P1", "j").updated_at == "2025-01-01T00:00:00+00:00"
+
+        monkeypatch.setattr("eumdac_fetch.state.time.time_ns", lambda: 1_735_689_601_000_000_000)
+        state_db.update_status("P1", "j", ProductStatus.VERIFIED)
+        got = state_db.get("P1", "j")
+        assert got.created_at == "2025-01-01T00:00:00+00:00"
+        assert got.updated_at == "2025-01-01T00:00:01+00:00"
+
     def test_reset_stale_downloads(self, state_db):
         """DOWNLOADING products should be reset to PENDING."""
         state_db.upsert(ProductRecord(product_id="P0", job_name="j", collection="C"))